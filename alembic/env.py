@@ -31,7 +31,8 @@ from src.infra.models.friend import Friend
 from src.infra.models.friend import FriendRequest
 from src.infra.models.friend import SuggestionSkip
 from src.infra.models.follow import Follow
-from src.infra.models.messenger import Message, Chat
+from src.infra.models.counter import UserCounter
+from src.infra.models.messenger import Message, Chat, ChatMember
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
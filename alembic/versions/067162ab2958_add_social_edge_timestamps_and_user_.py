@@ -0,0 +1,54 @@
+"""add social edge timestamps and user counters
+
+Revision ID: 067162ab2958
+Revises: 4bb766ee52ef
+Create Date: 2026-10-19 07:48:56.742205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '067162ab2958'
+down_revision: Union[str, Sequence[str], None] = '4bb766ee52ef'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('follows', sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()))
+    op.add_column('friends', sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()))
+    op.create_index('ix_follows_following_created', 'follows', ['following_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_follows_follower_created', 'follows', ['follower_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_friends_user_created', 'friends', ['user_id', 'created_at', 'id'], unique=False)
+
+    op.create_table('user_counters',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('followers', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('following', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('friends', sa.Integer(), nullable=False, server_default='0'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute("""
+        INSERT INTO user_counters (user_id, followers, following, friends)
+        SELECT u.id,
+               (SELECT count(*) FROM follows f WHERE f.following_id = u.id),
+               (SELECT count(*) FROM follows f WHERE f.follower_id = u.id),
+               (SELECT count(*) FROM friends fr WHERE fr.user_id = u.id)
+        FROM users u
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_counters')
+    op.drop_index('ix_friends_user_created', table_name='friends')
+    op.drop_index('ix_follows_follower_created', table_name='follows')
+    op.drop_index('ix_follows_following_created', table_name='follows')
+    op.drop_column('friends', 'created_at')
+    op.drop_column('follows', 'created_at')
@@ -0,0 +1,43 @@
+"""add unread counters to chats
+
+Revision ID: 1e16a4bf2996
+Revises: 5c4329141f86
+Create Date: 2026-10-19 08:14:08.844333
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1e16a4bf2996'
+down_revision: Union[str, Sequence[str], None] = '5c4329141f86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chats', sa.Column('unread_a', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('chats', sa.Column('unread_b', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE chats c
+        SET unread_a = (
+                SELECT count(*) FROM messages m
+                WHERE m.chat_id = c.id AND m.sender_id <> c.user_a_id
+                  AND m.seen_at_user_a IS NULL
+            ),
+            unread_b = (
+                SELECT count(*) FROM messages m
+                WHERE m.chat_id = c.id AND m.sender_id <> c.user_b_id
+                  AND m.seen_at_user_b IS NULL
+            )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('chats', 'unread_b')
+    op.drop_column('chats', 'unread_a')
@@ -0,0 +1,28 @@
+"""index messages by chat and created_at
+
+Revision ID: 30d852fe6fbc
+Revises: 57247e18a8ba
+Create Date: 2026-10-19 08:42:06.437456
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '30d852fe6fbc'
+down_revision: Union[str, Sequence[str], None] = '57247e18a8ba'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_messages_chat_created', 'messages', ['chat_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_messages_chat_created', table_name='messages')
@@ -0,0 +1,31 @@
+"""full text search on messages
+
+Revision ID: 31e836739c1e
+Revises: 56182d9665ae
+Create Date: 2026-10-19 08:49:25.994273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '31e836739c1e'
+down_revision: Union[str, Sequence[str], None] = '56182d9665ae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('messages', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('simple', body)", persisted=True), nullable=True))
+    op.create_index('ix_messages_search', 'messages', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_messages_search', table_name='messages', postgresql_using='gin')
+    op.drop_column('messages', 'search_vector')
@@ -0,0 +1,41 @@
+"""denormalize last message preview onto chats
+
+Revision ID: 35df6ce5ed31
+Revises: 1e16a4bf2996
+Create Date: 2026-10-19 08:17:03.122519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '35df6ce5ed31'
+down_revision: Union[str, Sequence[str], None] = '1e16a4bf2996'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chats', sa.Column('last_message_preview', sa.String(), nullable=True))
+    op.add_column('chats', sa.Column('last_message_sender_id', sa.Uuid(), nullable=True))
+    op.execute("""
+        UPDATE chats c
+        SET last_message_preview = left(m.body, 120),
+            last_message_sender_id = m.sender_id
+        FROM messages m
+        WHERE m.id = c.last_message_id
+    """)
+    op.create_index('ix_chats_user_a_last_message', 'chats', ['user_a_id', sa.text('last_message_at DESC NULLS LAST')], unique=False)
+    op.create_index('ix_chats_user_b_last_message', 'chats', ['user_b_id', sa.text('last_message_at DESC NULLS LAST')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chats_user_b_last_message', table_name='chats')
+    op.drop_index('ix_chats_user_a_last_message', table_name='chats')
+    op.drop_column('chats', 'last_message_sender_id')
+    op.drop_column('chats', 'last_message_preview')
@@ -0,0 +1,28 @@
+"""index suggestion skips by expiry
+
+Revision ID: 382c52fa077c
+Revises: d0eea100957d
+Create Date: 2026-10-19 07:55:17.596929
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '382c52fa077c'
+down_revision: Union[str, Sequence[str], None] = 'd0eea100957d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_suggestion_skips_user_expires', 'suggestion_skips', ['user_id', 'expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_suggestion_skips_user_expires', table_name='suggestion_skips')
@@ -0,0 +1,28 @@
+"""index tokens by expiry
+
+Revision ID: 43ffb5df71fe
+Revises: 31e836739c1e
+Create Date: 2026-10-19 09:04:44.707362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '43ffb5df71fe'
+down_revision: Union[str, Sequence[str], None] = '31e836739c1e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tokens_expires_at', 'tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tokens_expires_at', table_name='tokens')
@@ -0,0 +1,61 @@
+"""project chats into per-user chat members
+
+Revision ID: 4e4c23d787cc
+Revises: 35df6ce5ed31
+Create Date: 2026-10-19 08:21:32.133657
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e4c23d787cc'
+down_revision: Union[str, Sequence[str], None] = '35df6ce5ed31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('chat_members',
+    sa.Column('chat_id', sa.Uuid(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('last_message_at', sa.DateTime(), nullable=True),
+    sa.Column('unread', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('muted', sa.Boolean(), server_default='false', nullable=False),
+    sa.ForeignKeyConstraint(['chat_id'], ['chats.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('chat_id', 'user_id')
+    )
+    op.execute("""
+        INSERT INTO chat_members (chat_id, user_id, last_message_at, unread)
+        SELECT id, user_a_id, last_message_at, unread_a FROM chats
+        UNION ALL
+        SELECT id, user_b_id, last_message_at, unread_b FROM chats
+        WHERE user_b_id <> user_a_id
+    """)
+    op.create_index('ix_chat_members_inbox', 'chat_members', ['user_id', sa.text('last_message_at DESC'), sa.text('chat_id DESC')], unique=False)
+    op.drop_index('ix_chats_user_b_last_message', table_name='chats')
+    op.drop_index('ix_chats_user_a_last_message', table_name='chats')
+    op.drop_column('chats', 'unread_b')
+    op.drop_column('chats', 'unread_a')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('chats', sa.Column('unread_a', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('chats', sa.Column('unread_b', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE chats c
+        SET unread_a = a.unread, unread_b = b.unread
+        FROM chat_members a, chat_members b
+        WHERE a.chat_id = c.id AND a.user_id = c.user_a_id
+          AND b.chat_id = c.id AND b.user_id = c.user_b_id
+    """)
+    op.create_index('ix_chats_user_a_last_message', 'chats', ['user_a_id', sa.text('last_message_at DESC NULLS LAST')], unique=False)
+    op.create_index('ix_chats_user_b_last_message', 'chats', ['user_b_id', sa.text('last_message_at DESC NULLS LAST')], unique=False)
+    op.drop_index('ix_chat_members_inbox', table_name='chat_members')
+    op.drop_table('chat_members')
@@ -0,0 +1,95 @@
+"""partition messages by month
+
+Revision ID: 56182d9665ae
+Revises: 30d852fe6fbc
+Create Date: 2026-10-19 08:45:46.960016
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '56182d9665ae'
+down_revision: Union[str, Sequence[str], None] = '30d852fe6fbc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Months created ahead of the current one; the scheduled maintenance job keeps
+# extending this window.
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('ALTER TABLE messages RENAME TO messages_legacy')
+    op.execute('ALTER INDEX messages_pkey RENAME TO messages_legacy_pkey')
+    op.execute('ALTER INDEX ix_messages_chat_created RENAME TO ix_messages_legacy_chat_created')
+
+    op.execute("""
+        CREATE TABLE messages (
+            id UUID NOT NULL,
+            chat_id UUID NOT NULL REFERENCES chats (id) ON DELETE CASCADE,
+            sender_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            body VARCHAR NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT messages_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.create_index('ix_messages_chat_created', 'messages', ['chat_id', 'created_at', 'id'], unique=False)
+
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month DATE := COALESCE(
+                (SELECT date_trunc('month', MIN(created_at)) FROM messages_legacy),
+                date_trunc('month', now())
+            );
+            last DATE := date_trunc('month', now()) + interval '{MONTHS_AHEAD} months';
+        BEGIN
+            WHILE month <= last LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF messages FOR VALUES FROM (%L) TO (%L)',
+                    'messages_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+                    month,
+                    month + interval '1 month'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+    # catches rows past the prepared window if the maintenance job stalls
+    op.execute('CREATE TABLE messages_default PARTITION OF messages DEFAULT')
+
+    op.execute("""
+        INSERT INTO messages (id, chat_id, sender_id, body, created_at)
+        SELECT id, chat_id, sender_id, body, created_at FROM messages_legacy
+    """)
+    op.execute('DROP TABLE messages_legacy')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER TABLE messages RENAME TO messages_partitioned')
+    op.execute('ALTER INDEX messages_pkey RENAME TO messages_partitioned_pkey')
+    op.execute('ALTER INDEX ix_messages_chat_created RENAME TO ix_messages_partitioned_chat_created')
+
+    op.create_table('messages',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('chat_id', sa.UUID(), nullable=False),
+    sa.Column('sender_id', sa.UUID(), nullable=False),
+    sa.Column('body', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['chat_id'], ['chats.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_messages_chat_created', 'messages', ['chat_id', 'created_at', 'id'], unique=False)
+    op.execute("""
+        INSERT INTO messages (id, chat_id, sender_id, body, created_at)
+        SELECT id, chat_id, sender_id, body, created_at FROM messages_partitioned
+    """)
+    op.execute('DROP TABLE messages_partitioned CASCADE')
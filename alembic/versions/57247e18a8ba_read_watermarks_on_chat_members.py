@@ -0,0 +1,65 @@
+"""read watermarks on chat members
+
+Revision ID: 57247e18a8ba
+Revises: 4e4c23d787cc
+Create Date: 2026-10-19 08:26:11.106593
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '57247e18a8ba'
+down_revision: Union[str, Sequence[str], None] = '4e4c23d787cc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chat_members', sa.Column('last_read_message_at', sa.DateTime(), nullable=True))
+    op.add_column('chat_members', sa.Column('last_read_message_id', sa.Uuid(), nullable=True))
+    op.add_column('chat_members', sa.Column('read_at', sa.DateTime(), nullable=True))
+    op.execute("""
+        UPDATE chat_members cm
+        SET last_read_message_at = w.created_at,
+            last_read_message_id = w.id,
+            read_at = w.seen_at
+        FROM (
+            SELECT DISTINCT ON (m.chat_id, reader.user_id)
+                   m.chat_id, reader.user_id, m.created_at, m.id,
+                   reader.seen_at
+            FROM messages m
+            JOIN chats c ON c.id = m.chat_id
+            CROSS JOIN LATERAL (
+                VALUES (c.user_a_id, m.seen_at_user_a),
+                       (c.user_b_id, m.seen_at_user_b)
+            ) AS reader(user_id, seen_at)
+            WHERE reader.seen_at IS NOT NULL AND m.sender_id <> reader.user_id
+            ORDER BY m.chat_id, reader.user_id, m.created_at DESC, m.id DESC
+        ) w
+        WHERE cm.chat_id = w.chat_id AND cm.user_id = w.user_id
+    """)
+    op.drop_column('messages', 'seen_at_user_b')
+    op.drop_column('messages', 'seen_at_user_a')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('messages', sa.Column('seen_at_user_a', sa.DateTime(), nullable=True))
+    op.add_column('messages', sa.Column('seen_at_user_b', sa.DateTime(), nullable=True))
+    op.execute("""
+        UPDATE messages m
+        SET seen_at_user_a = CASE WHEN cm.user_id = c.user_a_id THEN cm.read_at ELSE m.seen_at_user_a END,
+            seen_at_user_b = CASE WHEN cm.user_id = c.user_b_id THEN cm.read_at ELSE m.seen_at_user_b END
+        FROM chats c, chat_members cm
+        WHERE c.id = m.chat_id AND cm.chat_id = m.chat_id
+          AND m.sender_id <> cm.user_id
+          AND (m.created_at, m.id) <= (cm.last_read_message_at, cm.last_read_message_id)
+    """)
+    op.drop_column('chat_members', 'read_at')
+    op.drop_column('chat_members', 'last_read_message_id')
+    op.drop_column('chat_members', 'last_read_message_at')
@@ -0,0 +1,47 @@
+"""rename garbled message body column
+
+Revision ID: 5c4329141f86
+Revises: 382c52fa077c
+Create Date: 2026-10-19 08:06:19.876921
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c4329141f86'
+down_revision: Union[str, Sequence[str], None] = '382c52fa077c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The model used tokenize.String instead of sqlalchemy.String, so the body
+# column was created under that regex as its name, cut to Postgres' 63 bytes.
+# The regex opens with its alternation of string prefixes, built from a set,
+# so their order differs between databases: "((|R|Br|B|Rb|fr|..."
+GARBLED_NAME = re.compile(r"\(\(\|[BbRrUuFf|]+")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    names = [c['name'] for c in sa.inspect(op.get_bind()).get_columns('messages')]
+    garbled = [name for name in names if GARBLED_NAME.match(name)]
+    if not garbled and 'body' in names:
+        # created from the fixed model
+        return
+    if len(garbled) != 1 or 'body' in names:
+        raise RuntimeError(
+            'Expected one garbled message body column and no body column,'
+            f' found messages columns {names}'
+        )
+    op.alter_column('messages', garbled[0], new_column_name='body')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The original column name was never meaningful; keep ``body``.
+    pass
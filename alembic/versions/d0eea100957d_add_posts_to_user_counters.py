@@ -0,0 +1,33 @@
+"""add posts to user counters
+
+Revision ID: d0eea100957d
+Revises: 067162ab2958
+Create Date: 2026-10-19 07:53:02.968592
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0eea100957d'
+down_revision: Union[str, Sequence[str], None] = '067162ab2958'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user_counters', sa.Column('posts', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE user_counters c
+        SET posts = (SELECT count(*) FROM personal_posts p WHERE p.user_id = c.user_id)
+                  + (SELECT count(*) FROM creator_posts p WHERE p.user_id = c.user_id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('user_counters', 'posts')
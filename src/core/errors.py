@@ -8,3 +8,13 @@ class DoesNotExistError(Exception):
 
 class ForbiddenError(Exception):
     pass
+
+
+class OverloadedError(Exception):
+    pass
+
+
+class RateLimitedError(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Too many requests.")
+        self.retry_after = retry_after
@@ -11,6 +11,8 @@ class Chat:
     user_b_id: UUID = field(default_factory=uuid4)
     last_message_at: datetime | None = None
     last_message_id: UUID | None = None
+    last_message_preview: str | None = None
+    last_message_sender_id: UUID | None = None
 
 
 @dataclass
@@ -24,12 +26,62 @@ class Message:
     seen_at_user_b: datetime | None = None
 
 
+@dataclass
+class OutgoingMessage:
+    sender_id: UUID
+    peer_id: UUID
+    body: str
+    id: UUID = field(default_factory=uuid4)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
 @dataclass
 class ChatSummary:
     chat: Chat
     peer_id: UUID
     unread_count: int
     last_body: str | None
+    muted: bool = False
+
+
+@dataclass
+class ReadReceipt:
+    chat_id: UUID
+    user_id: UUID
+    peer_id: UUID
+    last_read_message_id: UUID
+    last_read_message_at: datetime
+    read_at: datetime
+    updated: int
+
+
+@dataclass
+class MessagePage:
+    """Messages oldest first; ``next_cursor`` continues in the requested direction."""
+
+    messages: list[Message]
+    next_cursor: tuple[datetime, UUID] | None = None
+
+
+@dataclass
+class MessageHit:
+    message: Message
+    rank: float
+    snippet: str
+
+
+@dataclass
+class MessageSearchPage:
+    """Hits best match first; ``next_cursor`` is the (rank, created_at, id) key."""
+
+    hits: list[MessageHit]
+    next_cursor: tuple[float, datetime, UUID] | None = None
+
+
+@dataclass
+class InboxPage:
+    chats: list[ChatSummary]
+    next_cursor: tuple[datetime, UUID] | None = None
 
 
 class MessengerService(Protocol):
@@ -37,13 +89,19 @@ class MessengerService(Protocol):
 
     def send_message(self, sender_id: UUID, peer_id: UUID, body: str) -> Message: ...
 
+    def send_messages(self, batch: list[OutgoingMessage]) -> list[Message]: ...
+
+    def get_member_chat(self, user_id: UUID, chat_id: UUID) -> Chat: ...
+
+    def get_chat_peers(self, user_id: UUID, among: list[UUID]) -> set[UUID]: ...
+
     def get_inbox(
         self,
         user_id: UUID,
         *,
         limit: int = 30,
-        before: datetime | None = None,
-    ) -> list[ChatSummary]: ...
+        after: tuple[datetime, UUID] | None = None,
+    ) -> InboxPage: ...
 
     def get_messages(
         self,
@@ -52,8 +110,26 @@ class MessengerService(Protocol):
         chat_id: UUID | None = None,
         *,
         limit: int = 50,
-        before: datetime | None = None,
+        before: tuple[datetime, UUID] | None = None,
+        after: tuple[datetime, UUID] | None = None,
         mark_seen: bool = True,
-    ) -> list[Message]: ...
+    ) -> MessagePage: ...
+
+    def mark_chat_seen(
+        self,
+        user_id: UUID,
+        chat_id: UUID,
+        up_to: tuple[datetime, UUID] | None = None,
+    ) -> ReadReceipt | None: ...
+
+    def search_messages(
+        self,
+        user_id: UUID,
+        query: str,
+        *,
+        chat_id: UUID | None = None,
+        limit: int = 20,
+        after: tuple[float, datetime, UUID] | None = None,
+    ) -> MessageSearchPage: ...
 
-    def mark_chat_seen(self, user_id: UUID, chat_id: UUID) -> int: ...
+    def get_unread_total(self, user_id: UUID) -> int: ...
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import datetime
 from enum import Enum
 from typing import Protocol
 from uuid import UUID
@@ -13,6 +14,27 @@ class FriendStatus(str, Enum):
     FRIENDS = "friends"
 
 
+@dataclass
+class Relationship:
+    friend_status: FriendStatus = FriendStatus.NOT_FRIENDS
+    is_following: bool = False
+    mutual_friend_count: int = 0
+
+
+@dataclass
+class UserCounts:
+    followers: int = 0
+    following: int = 0
+    friends: int = 0
+    posts: int = 0
+
+
+@dataclass
+class UserPage:
+    users: list[User] = field(default_factory=list)
+    next_cursor: tuple[datetime, UUID] | None = None
+
+
 @dataclass
 class SocialUser:
     user: User
@@ -23,6 +45,12 @@ class SocialUser:
     overlap_categories: list[str]
 
 
+@dataclass
+class SuggestionDeck:
+    token: str
+    cards: list[SocialUser]
+
+
 class SocialService(Protocol):
     def follow(self, user_id: UUID, target_id: UUID) -> None: ...
 
@@ -40,20 +68,61 @@ class SocialService(Protocol):
         self, user_id: UUID, target_id: UUID, ttl_days: int | None = None
     ) -> None: ...
 
-    def get_followers(self, user_id: UUID) -> list[User]: ...
-
-    def get_following(self, user_id: UUID) -> list[User]: ...
+    def get_followers(
+        self,
+        user_id: UUID,
+        *,
+        limit: int = 50,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> UserPage: ...
+
+    def get_following(
+        self,
+        user_id: UUID,
+        *,
+        limit: int = 50,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> UserPage: ...
 
     def get_incoming_friend_requests(self, user_id: UUID) -> list[User]: ...
 
-    def get_friends(self, user_id: UUID) -> list[User]: ...
+    def get_friends(
+        self,
+        user_id: UUID,
+        *,
+        limit: int = 50,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> UserPage: ...
+
+    def get_counts(self, user_id: UUID) -> UserCounts: ...
 
     def get_friend_status(self, user_id: UUID, other_id: UUID) -> FriendStatus: ...
 
     def is_following(self, user_id: UUID, other_id: UUID) -> bool: ...
 
+    def get_relationships(
+        self, user_id: UUID, other_ids: list[UUID]
+    ) -> dict[UUID, Relationship]: ...
+
     def calculate_match_rate(self, user_id: UUID, other_id: UUID) -> int: ...
 
     def overlap_categories(self, user_id: UUID, other_id: UUID) -> list[str]: ...
 
-    def get_friend_suggestions(self, user_id: UUID, limit: int) -> list[SocialUser]: ...
+    def get_friend_suggestions(
+        self, user_id: UUID, limit: int, exclude: set[UUID] | None = None
+    ) -> list[SocialUser]: ...
+
+    def get_suggestion_deck(self, user_id: UUID, size: int) -> SuggestionDeck: ...
+
+    def prefetch_suggestion_deck(
+        self, user_id: UUID, size: int, exclude: list[UUID]
+    ) -> None: ...
+
+    def skip_suggestions(
+        self,
+        user_id: UUID,
+        target_ids: list[UUID],
+        *,
+        deck_token: str | None = None,
+        ttl_days: int | None = None,
+    ) -> int: ...
@@ -9,3 +9,5 @@ class TokenRepository(Protocol):
     def exists(self, jti: UUID) -> bool: ...
 
     def delete(self, jti: UUID) -> None: ...
+
+    def consume(self, jti: UUID) -> bool: ...
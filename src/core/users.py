@@ -26,6 +26,8 @@ class UserRepository(Protocol):
         username: str | None = None,
     ) -> User | None: ...
 
+    def read_by_login(self, login: str) -> User | None: ...
+
     def find_by_username(self, username: str) -> User | None: ...
 
     def update(self, user_id: UUID, updates: dict[str, Any]) -> None: ...
@@ -14,19 +14,27 @@ class UserDecorator:
         user_id: UUID,
         user: User,
     ) -> SocialUser:
-        # Fetch once; avoid re-calling service
-        user_friends = self.social.get_friends(user_id)  # list[User] (assumed)
-        other_friends = self.social.get_friends(user.id)  # list[User] (assumed)
+        return self.decorate_list(user_id=user_id, users=[user])[0]
 
-        # Use IDs to build sets (hashable)
-        user_friend_ids = {u.id for u in user_friends}
-        other_friend_ids = {u.id for u in other_friends}
+    def decorate_list(
+        self,
+        user_id: UUID,
+        users: list[User],
+    ) -> list[SocialUser]:
+        if not users:
+            return []
+
+        # Resolve friend/follow state for the whole list at once
+        relationships = self.social.get_relationships(user_id, [u.id for u in users])
 
-        return SocialUser(
-            user=user,
-            friend_status=self.social.get_friend_status(user_id, user.id),
-            is_following=self.social.is_following(user_id, user.id),
-            mutual_friend_count=len(user_friend_ids & other_friend_ids),
-            match_rate=self.social.calculate_match_rate(user_id, user.id),
-            overlap_categories=self.social.overlap_categories(user_id, user.id),
-        )
+        return [
+            SocialUser(
+                user=user,
+                friend_status=relationships[user.id].friend_status,
+                is_following=relationships[user.id].is_following,
+                mutual_friend_count=relationships[user.id].mutual_friend_count,
+                match_rate=self.social.calculate_match_rate(user_id, user.id),
+                overlap_categories=self.social.overlap_categories(user_id, user.id),
+            )
+            for user in users
+        ]
@@ -1,19 +1,22 @@
 from typing import Any
 
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from starlette.responses import JSONResponse
 
-from src.core.errors import DoesNotExistError
+from src.core.errors import DoesNotExistError, OverloadedError, RateLimitedError
 from src.core.users import User
 from src.infra.fastapi.dependables import (
+    RateLimiterDependable,
     TokenRepositoryDependable,
     UserRepositoryDependable,
     get_current_user,
     get_refresh_token,
 )
+from src.infra.fastapi.utils import client_ip, exception_response
 from src.infra.services.auth import AuthService
+from src.infra.services.rate_limit import LOGIN, REFRESH
 from src.runner.config import settings
 
 auth_api = APIRouter(tags=["Authentication"])
@@ -28,36 +31,49 @@ class AccessTokenResponse(BaseModel):
     access_token: str
 
 
+def set_refresh_cookie(response: Response, refresh_token: str) -> None:
+    response.set_cookie(
+        key="refresh_token",
+        value=refresh_token,
+        httponly=True,
+        secure=True,
+        samesite="lax",
+        max_age=settings.reftesh_token_expire_days * 24 * 60 * 60,
+    )
+
+
 @auth_api.post(
     "/auth",
     status_code=200,
     response_model=TokenResponse,
 )
 def login(
+    request: Request,
     response: Response,
     users: UserRepositoryDependable,
     tokens: TokenRepositoryDependable,
+    limiter: RateLimiterDependable,
     form_data: OAuth2PasswordRequestForm = Depends(),  # noqa: B008
 ) -> dict[str, str] | JSONResponse:
     auth = AuthService(users, tokens)
     try:
+        # before any password work, so a flood cannot pin workers on bcrypt
+        if limiter:
+            limiter.check(
+                LOGIN, ip=client_ip(request), account=form_data.username.lower()
+            )
         access_token, refresh_token = auth.authenticate(
             form_data.username, form_data.password
         )
-        response.set_cookie(
-            key="refresh_token",
-            value=refresh_token,
-            httponly=True,
-            secure=True,
-            samesite="lax",
-            max_age=settings.reftesh_token_expire_days * 24 * 60 * 60,
-        )
+        set_refresh_cookie(response, refresh_token)
         return {"access_token": access_token, "token_type": "bearer"}
     except DoesNotExistError:
         return JSONResponse(
             status_code=401,
             content={"message": "Invalid credentials."},
         )
+    except (OverloadedError, RateLimitedError) as e:
+        return exception_response(e)
 
 
 @auth_api.post(
@@ -92,15 +108,23 @@ def logout(
     response_model=AccessTokenResponse,
 )
 def refresh_token(
+    request: Request,
+    response: Response,
     users: UserRepositoryDependable,
     tokens: TokenRepositoryDependable,
+    limiter: RateLimiterDependable,
     token: str = Depends(get_refresh_token),
-    _: User = Depends(get_current_user),  # noqa: B008
+    user: User = Depends(get_current_user),  # noqa: B008
 ) -> dict[str, Any] | JSONResponse:
     auth = AuthService(users, tokens)
     try:
-        new_access_token = auth.refresh_access_token(token)
+        if limiter:
+            limiter.check(REFRESH, ip=client_ip(request), account=str(user.id))
+        new_access_token, new_refresh_token = auth.refresh_access_token(token)
+        set_refresh_cookie(response, new_refresh_token)
         return {"access_token": new_access_token}
+    except RateLimitedError as e:
+        return exception_response(e)
     except Exception as e:
         return JSONResponse(
             status_code=401,
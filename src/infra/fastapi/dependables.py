@@ -1,7 +1,10 @@
+from collections.abc import Callable
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.orm import Session
+from starlette.requests import HTTPConnection
 
 from src.core.creator_post.posts import CreatorPostService
 from src.core.creator_post.references import ReferenceService
@@ -13,6 +16,8 @@ from src.core.social import SocialService
 from src.core.tokens import TokenRepository
 from src.core.users import User, UserRepository, UserService
 from src.infra.services.auth import AuthService
+from src.infra.services.message_buffer import MessageWriteBuffer
+from src.infra.services.rate_limit import RateLimiter
 
 
 def get_user_repository(request: Request) -> UserRepository:
@@ -82,12 +87,38 @@ def get_search_service(request: Request) -> SearchService:
 SearchServiceDependable = Annotated[SearchService, Depends(get_search_service)]
 
 
-def get_messenger_service(request: Request) -> MessengerService:
-    return request.app.state.messenger  # type: ignore
+def get_messenger_service(conn: HTTPConnection) -> MessengerService:
+    # HTTPConnection so the dependable also resolves on the /ws route
+    return conn.app.state.messenger  # type: ignore
 
 
 MessengerServiceDependable = Annotated[MessengerService, Depends(get_messenger_service)]
 
+
+def get_session_factory(request: Request) -> Callable[[], Session]:
+    return request.app.state.session_factory  # type: ignore
+
+
+SessionFactoryDependable = Annotated[
+    Callable[[], Session], Depends(get_session_factory)
+]
+
+
+def get_message_buffer(conn: HTTPConnection) -> MessageWriteBuffer | None:
+    return getattr(conn.app.state, "message_buffer", None)
+
+
+MessageBufferDependable = Annotated[
+    MessageWriteBuffer | None, Depends(get_message_buffer)
+]
+
+
+def get_rate_limiter(request: Request) -> RateLimiter | None:
+    return getattr(request.app.state, "rate_limiter", None)
+
+
+RateLimiterDependable = Annotated[RateLimiter | None, Depends(get_rate_limiter)]
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth")
 
 
@@ -1,21 +1,111 @@
 import contextlib
+import json
+from collections.abc import Callable, Iterator
 from datetime import datetime
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-
-from src.core.messenger import ChatSummary, Message
+from sqlalchemy.orm import Session
+
+from src.core.errors import DoesNotExistError, OverloadedError
+from src.core.messenger import (
+    ChatSummary,
+    Message,
+    MessageHit,
+    MessengerService,
+    ReadReceipt,
+)
 from src.core.users import User
-from src.infra.fastapi.dependables import MessengerServiceDependable, get_current_user
-from src.infra.fastapi.utils import exception_response
-from src.infra.fastapi.ws_auth import ws_get_current_user
-from src.infra.fastapi.ws_manager import manager
+from src.infra.fastapi.dependables import (
+    MessageBufferDependable,
+    MessengerServiceDependable,
+    SessionFactoryDependable,
+    TokenRepositoryDependable,
+    UserRepositoryDependable,
+    get_current_user,
+)
+from src.infra.fastapi.utils import (
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+    exception_response,
+)
+from src.infra.fastapi.ws_auth import ws_get_current_user_id
+from src.infra.fastapi.ws_manager import PROTOCOL_VERSION, manager
+from src.infra.fastapi.ws_presence import presence
+from src.infra.repositories.messenger import MessageRepository
+from src.infra.services.auth import AuthService
+from src.infra.services.message_buffer import MessageWriteBuffer
+from src.infra.services.offload import db_offload
+from src.runner.config import settings
 
 messenger_api = APIRouter(tags=["Messenger"])
 
+# Rows fetched per round trip, and written per chunk, by the history export
+EXPORT_BATCH_SIZE = 1000
+
+# Users one presence lookup or subscription may cover
+MAX_PRESENCE_USERS = 200
+
+
+def read_event(receipt: ReadReceipt) -> dict[str, Any]:
+    return {
+        "type": "chat.read",
+        "chat_id": str(receipt.chat_id),
+        "user_id": str(receipt.user_id),
+        "last_read_message_id": str(receipt.last_read_message_id),
+        "read_at": receipt.read_at.isoformat(),
+    }
+
+
+async def announce_read(receipt: ReadReceipt) -> None:
+    # the reader's other devices clear their badge, the peer sees the receipt;
+    # best effort, the watermark is already committed
+    with contextlib.suppress(Exception):
+        await manager.send_to_users(
+            [receipt.user_id, receipt.peer_id], read_event(receipt)
+        )
+
+
+def export_lines(
+    session_factory: Callable[[], Session],
+    chat_id: UUID,
+    after: tuple[datetime, UUID] | None,
+) -> Iterator[str]:
+    db = session_factory()
+    try:
+        batches = MessageRepository(db).stream_by_chat(
+            chat_id, after=after, batch_size=EXPORT_BATCH_SIZE
+        )
+        for batch in batches:
+            yield "".join(
+                json.dumps(
+                    {
+                        "id": str(m.id),
+                        "chat_id": str(m.chat_id),
+                        "sender_id": str(m.sender_id),
+                        "body": m.body,
+                        "created_at": m.created_at.isoformat(),
+                    },
+                    ensure_ascii=False,
+                )
+                + "\n"
+                for m in batch
+            )
+    finally:
+        db.close()
+
 
 class MessageItem(BaseModel):
     id: UUID
@@ -45,7 +135,9 @@ class ChatSummaryItem(BaseModel):
     last_message_at: datetime | None
     last_message_id: UUID | None
     last_body: str | None
+    last_sender_id: UUID | None
     unread_count: int
+    muted: bool
 
     @classmethod
     def from_summary(cls, s: ChatSummary) -> "ChatSummaryItem":
@@ -55,16 +147,39 @@ class ChatSummaryItem(BaseModel):
             last_message_at=s.chat.last_message_at,
             last_message_id=s.chat.last_message_id,
             last_body=s.last_body,
+            last_sender_id=s.chat.last_message_sender_id,
             unread_count=s.unread_count,
+            muted=s.muted,
         )
 
 
 class InboxResponse(BaseModel):
     chats: list[ChatSummaryItem]
+    next_cursor: str | None = None
 
 
 class MessagesResponse(BaseModel):
     messages: list[MessageItem]
+    next_cursor: str | None = None
+
+
+class MessageHitItem(BaseModel):
+    message: MessageItem
+    rank: float
+    snippet: str
+
+    @classmethod
+    def from_hit(cls, h: MessageHit) -> "MessageHitItem":
+        return cls(
+            message=MessageItem.from_message(h.message),
+            rank=h.rank,
+            snippet=h.snippet,
+        )
+
+
+class MessageSearchResponse(BaseModel):
+    hits: list[MessageHitItem]
+    next_cursor: str | None = None
 
 
 class SendMessageResponse(BaseModel):
@@ -75,56 +190,184 @@ class MarkSeenResponse(BaseModel):
     updated: int
 
 
-@messenger_api.websocket("/ws")
-async def messenger_ws(
+class UnreadTotalResponse(BaseModel):
+    unread: int
+
+
+class PresenceItem(BaseModel):
+    user_id: UUID
+    online: bool
+    last_seen: datetime | None
+
+
+class PresenceResponse(BaseModel):
+    users: list[PresenceItem]
+
+
+class WSTicketResponse(BaseModel):
+    ticket: str
+    expires_in: int
+
+
+@messenger_api.post("/ws/ticket", response_model=WSTicketResponse, status_code=201)
+def create_ws_ticket(
+    users: UserRepositoryDependable,
+    tokens: TokenRepositoryDependable,
+    user: User = Depends(get_current_user),  # noqa: B008
+) -> dict[str, Any]:
+    ticket = AuthService(users, tokens).create_ws_ticket(str(user.id))
+    return {"ticket": ticket, "expires_in": settings.ws_ticket_ttl_seconds}
+
+
+async def handle_ws_event(
     ws: WebSocket,
-    service: MessengerServiceDependable,
-    user: User = Depends(ws_get_current_user),  # noqa: B008
+    service: MessengerService,
+    buffer: MessageWriteBuffer | None,
+    user_id: UUID,
+    payload: dict[str, Any],
+    contacts: set[UUID],
 ) -> None:
-    await manager.connect(user.id, ws)
-    try:
-        await ws.send_json({"type": "ws.hello", "user_id": str(user.id)})
+    evt_type = payload.get("type")
 
-        while True:
-            payload = await ws.receive_json()
-            evt_type = payload.get("type")
-
-            if evt_type == "message.send":
-                peer_id = UUID(payload["peer_id"])
-                body = (payload.get("body") or "").strip()
-                if not body:
-                    await ws.send_json({"type": "error", "error": "empty_body"})
-                    continue
-
-                # persist
-                msg = service.send_message(
-                    sender_id=user.id, peer_id=peer_id, body=body
+    if evt_type == "message.send":
+        peer_id = UUID(payload["peer_id"])
+        body = (payload.get("body") or "").strip()
+        if not body:
+            await ws.send_json({"type": "error", "error": "empty_body"})
+            return
+
+        # persist off the event loop; shed load when the DB lags
+        try:
+            if buffer is not None:
+                msg = await buffer.submit(user_id, peer_id, body)
+            else:
+                msg = await db_offload.run(
+                    service.send_message,
+                    sender_id=user_id,
+                    peer_id=peer_id,
+                    body=body,
                 )
+        except OverloadedError:
+            await ws.send_json({"type": "error", "error": "busy"})
+            return
+        except Exception:
+            # e.g. an unknown peer; the socket and its session survive
+            await ws.send_json(
+                {"type": "error", "error": "send_failed", "peer_id": str(peer_id)}
+            )
+            return
+        contacts.add(peer_id)
+
+        # wire payload
+        event = {
+            "type": "message.new",
+            "message": {
+                "id": str(msg.id),
+                "chat_id": str(msg.chat_id),
+                "sender_id": str(msg.sender_id),
+                "body": msg.body,
+                "created_at": msg.created_at.isoformat(),
+            },
+        }
+
+        # broadcast to both sides (no need to load chat)
+        await manager.send_to_users([user_id, peer_id], event)
+
+    elif evt_type == "presence.subscribe":
+        requested = list(dict.fromkeys(UUID(u) for u in payload.get("user_ids", [])))
+        try:
+            allowed = await chat_peers(service, user_id, requested, contacts)
+        except OverloadedError:
+            await ws.send_json({"type": "error", "error": "busy"})
+            return
+        states = await presence.watch(user_id, allowed)
+        await ws.send_json(
+            {"type": "presence", "users": [s.to_event_item() for s in states]}
+        )
 
-                # wire payload
-                event = {
-                    "type": "message.new",
-                    "message": {
-                        "id": str(msg.id),
-                        "chat_id": str(msg.chat_id),
-                        "sender_id": str(msg.sender_id),
-                        "body": msg.body,
-                        "created_at": msg.created_at.isoformat(),
-                    },
-                }
+    elif evt_type == "typing":
+        peer_id = UUID(payload["peer_id"])
+        # ephemeral, so dropped rather than reported when the DB is busy
+        with contextlib.suppress(OverloadedError):
+            if await chat_peers(service, user_id, [peer_id], contacts):
+                await presence.typing(user_id, peer_id)
 
-                # broadcast to both sides (no need to load chat)
-                await manager.send_to_users([user.id, peer_id], event)
+    elif evt_type == "ack":
+        manager.ack(user_id, ws, int(payload["seq"]))
+
+    elif evt_type == "chat.read":
+        try:
+            receipt = await db_offload.run(
+                service.mark_chat_seen,
+                user_id=user_id,
+                chat_id=UUID(payload["chat_id"]),
+            )
+        except OverloadedError:
+            await ws.send_json({"type": "error", "error": "busy"})
+            return
+        except DoesNotExistError:
+            await ws.send_json({"type": "error", "error": "chat_not_found"})
+            return
+
+        if receipt:
+            await announce_read(receipt)
+
+    else:
+        await ws.send_json({"type": "error", "error": f"unknown_type: {evt_type}"})
+
+
+async def chat_peers(
+    service: MessengerService,
+    user_id: UUID,
+    user_ids: list[UUID],
+    known: set[UUID] | None = None,
+) -> list[UUID]:
+    """``user_ids`` reduced to people ``user_id`` has a chat with, in order.
+
+    Presence and typing are only shared between chat peers. ``known`` holds
+    peers already confirmed on this connection and is extended in place.
+    """
+    user_ids = user_ids[:MAX_PRESENCE_USERS]
+    known = set() if known is None else known
+    unknown = [u for u in user_ids if u not in known]
+    if unknown:
+        known |= await db_offload.run(service.get_chat_peers, user_id, unknown)
+    return [u for u in user_ids if u in known]
 
-            else:
-                await ws.send_json(
-                    {"type": "error", "error": f"unknown_type: {evt_type}"}
-                )
 
+@messenger_api.websocket("/ws")
+async def messenger_ws(
+    ws: WebSocket,
+    service: MessengerServiceDependable,
+    buffer: MessageBufferDependable,
+    user_id: UUID = Depends(ws_get_current_user_id),  # noqa: B008
+    version: int = Query(1, alias="v", ge=1, le=PROTOCOL_VERSION),
+    since: int | None = Query(None, ge=0),
+) -> None:
+    session = await manager.connect(
+        user_id, ws, version=version, resuming=since is not None
+    )
+    try:
+        hello: dict[str, Any] = {"type": "ws.hello", "user_id": str(user_id)}
+        if version >= 2:
+            hello |= {"v": version, "seq": await manager.head(user_id)}
+        await ws.send_json(hello)
+        if version >= 2 and since is not None:
+            await manager.resume(user_id, session, since)
+
+        # peers this user shares a chat with, checked once per connection
+        contacts: set[UUID] = set()
+        while True:
+            payload = await ws.receive_json()
+            try:
+                await handle_ws_event(ws, service, buffer, user_id, payload, contacts)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                # malformed ids or fields; the socket stays open
+                await ws.send_json({"type": "error", "error": "bad_request"})
     except WebSocketDisconnect:
-        manager.disconnect(user.id, ws)
+        await manager.disconnect(user_id, ws)
     except Exception:
-        manager.disconnect(user.id, ws)
+        await manager.disconnect(user_id, ws)
         try:
             await ws.close()
         except Exception:
@@ -137,34 +380,149 @@ def get_inbox(
     user: User = Depends(get_current_user),  # noqa: B008
     limit: int = Query(30, ge=1, le=100),
     before: datetime | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any] | JSONResponse:
+    # a bare `before` timestamp is still accepted for older clients
+    after = decode_cursor(cursor) if cursor else None
+    if after is None and before is not None:
+        after = (before, UUID(int=0))
+    try:
+        page = service.get_inbox(user_id=user.id, limit=limit, after=after)
+        next_cursor = encode_cursor(*page.next_cursor) if page.next_cursor else None
+        return {
+            "chats": [ChatSummaryItem.from_summary(s) for s in page.chats],
+            "next_cursor": next_cursor,
+        }
+    except Exception as e:
+        return exception_response(e)
+
+
+@messenger_api.get("/inbox/unread", response_model=UnreadTotalResponse, status_code=200)
+def get_unread_total(
+    service: MessengerServiceDependable,
+    user: User = Depends(get_current_user),  # noqa: B008
+) -> dict[str, Any] | JSONResponse:
+    try:
+        return {"unread": service.get_unread_total(user_id=user.id)}
+    except Exception as e:
+        return exception_response(e)
+
+
+@messenger_api.get("/presence", response_model=PresenceResponse, status_code=200)
+async def get_presence(
+    service: MessengerServiceDependable,
+    user_ids: list[UUID] = Query(..., max_length=MAX_PRESENCE_USERS),  # noqa: B008
+    user: User = Depends(get_current_user),  # noqa: B008
 ) -> dict[str, Any] | JSONResponse:
     try:
-        items = service.get_inbox(user_id=user.id, limit=limit, before=before)
-        return {"chats": [ChatSummaryItem.from_summary(s) for s in items]}
+        # users outside the caller's chats are left out, not reported offline
+        peers = await chat_peers(service, user.id, list(dict.fromkeys(user_ids)))
+        states = await presence.snapshot(peers)
+        return {
+            "users": [
+                {"user_id": s.user_id, "online": s.online, "last_seen": s.last_seen}
+                for s in states
+            ]
+        }
     except Exception as e:
         return exception_response(e)
 
 
 @messenger_api.get("/messages", response_model=MessagesResponse, status_code=200)
 def get_messages(
+    background_tasks: BackgroundTasks,
     service: MessengerServiceDependable,
     user: User = Depends(get_current_user),  # noqa: B008
     peer_id: UUID | None = None,
     chat_id: UUID | None = None,
     limit: int = Query(50, ge=1, le=200),
     before: datetime | None = None,
+    cursor: str | None = None,
+    after: str | None = None,
 ) -> dict[str, Any] | JSONResponse:
+    # `cursor` pages back through older messages, `after` catches up on newer
+    # ones; a bare `before` timestamp is still accepted for older clients
+    older = decode_cursor(cursor) if cursor else None
+    if older is None and before is not None:
+        older = (before, UUID(int=0))
+    newer = decode_cursor(after) if after else None
     try:
-        msgs = service.get_messages(
+        page = service.get_messages(
             user_id=user.id,
             peer_id=peer_id,
             chat_id=chat_id,
             limit=limit,
-            before=before,
+            before=older,
+            after=newer,
+            mark_seen=False,
         )
-        return {"messages": [MessageItem.from_message(m) for m in msgs]}
+        msgs = page.messages
+        if msgs:
+            receipt = service.mark_chat_seen(
+                user_id=user.id,
+                chat_id=msgs[-1].chat_id,
+                up_to=(msgs[-1].created_at, msgs[-1].id),
+            )
+            if receipt:
+                background_tasks.add_task(announce_read, receipt)
+        next_cursor = encode_cursor(*page.next_cursor) if page.next_cursor else None
+        return {
+            "messages": [MessageItem.from_message(m) for m in msgs],
+            "next_cursor": next_cursor,
+        }
+    except Exception as e:
+        return exception_response(e)
+
+
+@messenger_api.get(
+    "/messages/search", response_model=MessageSearchResponse, status_code=200
+)
+def search_messages(
+    query: str,
+    service: MessengerServiceDependable,
+    user: User = Depends(get_current_user),  # noqa: B008
+    chat_id: UUID | None = None,
+    limit: int = Query(20, ge=1, le=50),
+    cursor: str | None = None,
+) -> dict[str, Any] | JSONResponse:
+    after = decode_rank_cursor(cursor) if cursor else None
+    try:
+        page = service.search_messages(
+            user_id=user.id, query=query, chat_id=chat_id, limit=limit, after=after
+        )
+        next_cursor = (
+            encode_rank_cursor(*page.next_cursor) if page.next_cursor else None
+        )
+        return {
+            "hits": [MessageHitItem.from_hit(h) for h in page.hits],
+            "next_cursor": next_cursor,
+        }
+    except Exception as e:
+        return exception_response(e)
+
+
+@messenger_api.get("/chats/{chat_id}/export", response_model=None, status_code=200)
+def export_chat(
+    chat_id: UUID,
+    service: MessengerServiceDependable,
+    session_factory: SessionFactoryDependable,
+    user: User = Depends(get_current_user),  # noqa: B008
+    after: str | None = None,
+) -> StreamingResponse | JSONResponse:
+    # one JSON message per line, oldest first; `after` is the cursor of the
+    # newest message the client already holds, so only newer ones stream
+    since = decode_cursor(after) if after else None
+    try:
+        service.get_member_chat(user.id, chat_id)
     except Exception as e:
         return exception_response(e)
+    return StreamingResponse(
+        export_lines(session_factory, chat_id, since),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="chat-{chat_id}.ndjson"'
+        },
+    )
 
 
 @messenger_api.post(
@@ -191,11 +549,15 @@ def send_message(
 )
 def mark_seen(
     chat_id: UUID,
+    background_tasks: BackgroundTasks,
     service: MessengerServiceDependable,
     user: User = Depends(get_current_user),  # noqa: B008
 ) -> dict[str, Any] | JSONResponse:
     try:
-        updated = service.mark_chat_seen(user_id=user.id, chat_id=chat_id)
-        return {"updated": updated}
+        receipt = service.mark_chat_seen(user_id=user.id, chat_id=chat_id)
+        if not receipt:
+            return {"updated": 0}
+        background_tasks.add_task(announce_read, receipt)
+        return {"updated": receipt.updated}
     except Exception as e:
         return exception_response(e)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.infra.services.metrics import metrics
+
+metrics_api = APIRouter(tags=["Metrics"])
+
+
+@metrics_api.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> str:
+    # rendered on the event loop: the ws gauges read state the loop mutates
+    return metrics.render()
@@ -54,15 +54,9 @@ def search_users(
 ) -> dict[str, Any] | JSONResponse:
     try:
         found = service.search_users(query, limit=limit)
-        result = []
-        for user in found:
-            result.append(
-                UserItem.from_user(
-                    UserDecorator(social).decorate_entity(
-                        user_id=current_user.id, user=user
-                    )
-                )
-            )
-        return {"users": result}
+        users = UserDecorator(social).decorate_list(
+            user_id=current_user.id, users=found
+        )
+        return {"users": [UserItem.from_user(u) for u in users]}
     except Exception as e:
         return exception_response(e)
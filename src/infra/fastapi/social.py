@@ -1,9 +1,9 @@
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from src.core.users import User
 from src.infra.decorators.user import UserDecorator
@@ -12,7 +12,7 @@ from src.infra.fastapi.dependables import (
     get_current_user,
 )
 from src.infra.fastapi.users import UserItem
-from src.infra.fastapi.utils import exception_response
+from src.infra.fastapi.utils import decode_cursor, encode_cursor, exception_response
 
 social_api = APIRouter(tags=["Social"])
 
@@ -29,6 +29,22 @@ class UserListEnvelope(BaseModel):
     users: list[UserItem]
 
 
+class UserPageEnvelope(BaseModel):
+    users: list[UserItem]
+    next_cursor: str | None = None
+    total: int
+
+
+class SuggestionDeckEnvelope(BaseModel):
+    token: str
+    cards: list[UserItem]
+
+
+class SwipeBatchRequest(BaseModel):
+    deck_token: str | None = None
+    skipped: list[UUID] = Field(default_factory=list, max_length=100)
+
+
 @social_api.post(
     "/follow",
     status_code=200,
@@ -152,21 +168,24 @@ def skip_suggestion(
 
 @social_api.get(
     "/followers",
-    response_model=UserListEnvelope,
+    response_model=UserPageEnvelope,
     status_code=200,
 )
 def get_followers(
     service: SocialServiceDependable,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
     user: User = Depends(get_current_user),  # noqa: B008
 ) -> dict[str, Any] | JSONResponse:
+    after = decode_cursor(cursor) if cursor else None
     try:
+        page = service.get_followers(user.id, limit=limit, after=after)
+        users = UserDecorator(service).decorate_list(user_id=user.id, users=page.users)
+        next_cursor = encode_cursor(*page.next_cursor) if page.next_cursor else None
         return {
-            "users": [
-                UserItem.from_user(
-                    UserDecorator(service).decorate_entity(user_id=user.id, user=u)
-                )
-                for u in service.get_followers(user.id)
-            ]
+            "users": [UserItem.from_user(u) for u in users],
+            "next_cursor": next_cursor,
+            "total": service.get_counts(user.id).followers,
         }
     except Exception as e:
         return exception_response(e)
@@ -174,21 +193,24 @@ def get_followers(
 
 @social_api.get(
     "/following",
-    response_model=UserListEnvelope,
+    response_model=UserPageEnvelope,
     status_code=200,
 )
 def get_following(
     service: SocialServiceDependable,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
     user: User = Depends(get_current_user),  # noqa: B008
 ) -> dict[str, Any] | JSONResponse:
+    after = decode_cursor(cursor) if cursor else None
     try:
+        page = service.get_following(user.id, limit=limit, after=after)
+        users = UserDecorator(service).decorate_list(user_id=user.id, users=page.users)
+        next_cursor = encode_cursor(*page.next_cursor) if page.next_cursor else None
         return {
-            "users": [
-                UserItem.from_user(
-                    UserDecorator(service).decorate_entity(user_id=user.id, user=u)
-                )
-                for u in service.get_following(user.id)
-            ]
+            "users": [UserItem.from_user(u) for u in users],
+            "next_cursor": next_cursor,
+            "total": service.get_counts(user.id).following,
         }
     except Exception as e:
         return exception_response(e)
@@ -196,21 +218,24 @@ def get_following(
 
 @social_api.get(
     "/friends",
-    response_model=UserListEnvelope,
+    response_model=UserPageEnvelope,
     status_code=200,
 )
 def get_friends(
     service: SocialServiceDependable,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
     user: User = Depends(get_current_user),  # noqa: B008
 ) -> dict[str, Any] | JSONResponse:
+    after = decode_cursor(cursor) if cursor else None
     try:
+        page = service.get_friends(user.id, limit=limit, after=after)
+        users = UserDecorator(service).decorate_list(user_id=user.id, users=page.users)
+        next_cursor = encode_cursor(*page.next_cursor) if page.next_cursor else None
         return {
-            "users": [
-                UserItem.from_user(
-                    UserDecorator(service).decorate_entity(user_id=user.id, user=u)
-                )
-                for u in service.get_friends(user.id)
-            ]
+            "users": [UserItem.from_user(u) for u in users],
+            "next_cursor": next_cursor,
+            "total": service.get_counts(user.id).friends,
         }
     except Exception as e:
         return exception_response(e)
@@ -226,14 +251,10 @@ def get_incoming_friend_requests(
     user: User = Depends(get_current_user),  # noqa: B008
 ) -> dict[str, Any] | JSONResponse:
     try:
-        return {
-            "users": [
-                UserItem.from_user(
-                    UserDecorator(service).decorate_entity(user_id=user.id, user=u)
-                )
-                for u in service.get_incoming_friend_requests(user.id)
-            ]
-        }
+        users = UserDecorator(service).decorate_list(
+            user_id=user.id, users=service.get_incoming_friend_requests(user.id)
+        )
+        return {"users": [UserItem.from_user(u) for u in users]}
     except Exception as e:
         return exception_response(e)
 
@@ -253,3 +274,45 @@ def get_friend_suggestions(
         return {"users": [UserItem.from_user(user) for user in suggestions]}
     except Exception as e:
         return exception_response(e)
+
+
+@social_api.get(
+    "/suggestions/deck",
+    response_model=SuggestionDeckEnvelope,
+    status_code=200,
+)
+def get_suggestion_deck(
+    background_tasks: BackgroundTasks,
+    service: SocialServiceDependable,
+    size: int = Query(20, ge=1, le=50),
+    user: User = Depends(get_current_user),  # noqa: B008
+) -> dict[str, Any] | JSONResponse:
+    try:
+        deck = service.get_suggestion_deck(user.id, size=size)
+        background_tasks.add_task(
+            service.prefetch_suggestion_deck,
+            user.id,
+            size,
+            [card.user.id for card in deck.cards],
+        )
+        return {
+            "token": deck.token,
+            "cards": [UserItem.from_user(card) for card in deck.cards],
+        }
+    except Exception as e:
+        return exception_response(e)
+
+
+@social_api.post("/suggestions/swipes", status_code=200)
+def report_swipes(
+    body: SwipeBatchRequest,
+    service: SocialServiceDependable,
+    user: User = Depends(get_current_user),  # noqa: B008
+) -> JSONResponse:
+    try:
+        skipped = service.skip_suggestions(
+            user.id, body.skipped, deck_token=body.deck_token, ttl_days=30
+        )
+        return JSONResponse(status_code=200, content={"skipped": skipped})
+    except Exception as e:
+        return exception_response(e)
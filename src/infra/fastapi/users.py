@@ -2,20 +2,28 @@ import re
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from pydantic import BaseModel, field_validator
 from starlette.responses import JSONResponse
 
-from src.core.errors import DoesNotExistError, ExistsError
-from src.core.social import FriendStatus, SocialUser
+from src.core.errors import (
+    DoesNotExistError,
+    ExistsError,
+    OverloadedError,
+    RateLimitedError,
+)
+from src.core.social import FriendStatus, SocialUser, UserCounts
 from src.core.users import User
 from src.infra.decorators.user import UserDecorator
 from src.infra.fastapi.dependables import (
     FeedServiceDependable,
+    RateLimiterDependable,
     SocialServiceDependable,
     UserServiceDependable,
     get_current_user,
 )
+from src.infra.fastapi.utils import client_ip, exception_response
+from src.infra.services.rate_limit import REGISTER
 
 user_api = APIRouter(tags=["Users"])
 
@@ -56,8 +64,25 @@ class UserItem(BaseModel):
         )
 
 
+class CountsItem(BaseModel):
+    followers: int
+    following: int
+    friends: int
+    posts: int
+
+    @classmethod
+    def from_counts(cls, counts: UserCounts) -> "CountsItem":
+        return cls(
+            followers=counts.followers,
+            following=counts.following,
+            friends=counts.friends,
+            posts=counts.posts,
+        )
+
+
 class UserItemEnvelope(BaseModel):
     user: UserItem
+    counts: CountsItem
 
 
 class MeItem(BaseModel):
@@ -82,6 +107,7 @@ class MeItem(BaseModel):
 
 class MeItemEnvelope(BaseModel):
     user: MeItem
+    counts: CountsItem | None = None
 
 
 class UserUpdateRequest(BaseModel):
@@ -148,10 +174,14 @@ class UserUpdateRequest(BaseModel):
 )
 def register(
     request: CreateUserRequest,
+    http: Request,
     users: UserServiceDependable,
     feed: FeedServiceDependable,
+    limiter: RateLimiterDependable,
 ) -> dict[str, Any] | JSONResponse:
     try:
+        if limiter:
+            limiter.check(REGISTER, ip=client_ip(http), account=request.mail.lower())
         user = users.register(request.mail, request.password)
         feed.init_preferences(user.id)
         return {"user": MeItem.from_user(user)}
@@ -161,6 +191,8 @@ def register(
             status_code=409,
             content={"message": "User already exists."},
         )
+    except (OverloadedError, RateLimitedError) as e:
+        return exception_response(e)
 
 
 @user_api.get(
@@ -181,7 +213,8 @@ def get_user(
                 UserDecorator(social).decorate_entity(
                     user_id=current_user.id, user=user
                 )
-            )
+            ),
+            "counts": CountsItem.from_counts(social.get_counts(user.id)),
         }
     except DoesNotExistError:
         return JSONResponse(
@@ -195,8 +228,14 @@ def get_user(
     status_code=200,
     response_model=MeItemEnvelope,
 )
-def get_me(user: User = Depends(get_current_user)) -> dict[str, Any]:  # noqa: B008
-    return {"user": MeItem.from_user(user)}
+def get_me(
+    social: SocialServiceDependable,
+    user: User = Depends(get_current_user),  # noqa: B008
+) -> dict[str, Any]:
+    return {
+        "user": MeItem.from_user(user),
+        "counts": CountsItem.from_counts(social.get_counts(user.id)),
+    }
 
 
 @user_api.patch(
@@ -1,6 +1,18 @@
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 
-from src.core.errors import DoesNotExistError, ExistsError
+from src.core.errors import (
+    DoesNotExistError,
+    ExistsError,
+    OverloadedError,
+    RateLimitedError,
+)
+from src.runner.config import settings
 
 
 def exception_response(e: Exception) -> JSONResponse:
@@ -10,4 +22,61 @@ def exception_response(e: Exception) -> JSONResponse:
         return JSONResponse(
             status_code=409, content={"message": "Conflict: Already exists."}
         )
+    if isinstance(e, RateLimitedError):
+        return JSONResponse(
+            status_code=429,
+            content={"message": "Too many requests."},
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    if isinstance(e, OverloadedError):
+        return JSONResponse(
+            status_code=503, content={"message": "Busy, try again shortly."}
+        )
     return JSONResponse(status_code=500, content={"message": str(e)})
+
+
+def client_ip(request: Request, proxy_hops: int | None = None) -> str:
+    """The caller's address as recorded by the outermost trusted proxy.
+
+    Every proxy appends the address it was connected from to X-Forwarded-For,
+    so with ``proxy_hops`` trusted proxies the entry that many places from the
+    right is the first one the client did not write itself.
+    """
+    hops = settings.trusted_proxy_hops if proxy_hops is None else proxy_hops
+    if hops > 0:
+        forwarded = [
+            address.strip()
+            for address in request.headers.get("x-forwarded-for", "").split(",")
+            if address.strip()
+        ]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{item_id}"
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(item_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.") from None
+
+
+def encode_rank_cursor(rank: float, created_at: datetime, item_id: UUID) -> str:
+    raw = f"{rank!r}|{created_at.isoformat()}|{item_id}"
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, created_at, item_id = urlsafe_b64decode(padded).decode().split("|")
+        return float(rank), datetime.fromisoformat(created_at), UUID(item_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.") from None
@@ -1,10 +1,90 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from uuid import UUID
+
 from fastapi import WebSocket, status
 
+from src.core.errors import OverloadedError
 from src.core.users import User
 from src.infra.services.auth import AuthService
+from src.infra.services.offload import db_offload
+from src.runner.config import settings
+
+
+class PrincipalCache:
+    """Users seen by recent WebSocket handshakes, kept for ``ttl`` seconds.
+
+    Lives on the event loop: concurrent handshakes for the same user share
+    one in-flight lookup, so a reconnect storm costs one query per user
+    rather than one per socket.
+    """
+
+    def __init__(self, ttl: float = 60.0, size: int = 10_000) -> None:
+        self._ttl = ttl
+        self._size = size
+        self._users: OrderedDict[UUID, tuple[float, User]] = OrderedDict()
+        self._inflight: dict[UUID, asyncio.Future[User | None]] = {}
+
+    async def get(
+        self, user_id: UUID, load: Callable[[], Awaitable[User | None]]
+    ) -> User | None:
+        cached = self._users.get(user_id)
+        if cached is not None and cached[0] > time.monotonic():
+            self._users.move_to_end(user_id)
+            return cached[1]
+
+        pending = self._inflight.get(user_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future[User | None] = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        try:
+            user = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            future.exception()  # retrieved here when nobody else is waiting
+            raise
+        finally:
+            del self._inflight[user_id]
+
+        future.set_result(user)
+        if user is not None:
+            self._users[user_id] = (time.monotonic() + self._ttl, user)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self._size:
+                self._users.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id: UUID) -> None:
+        self._users.pop(user_id, None)
 
 
-async def ws_get_current_user(ws: WebSocket) -> User:
+principals = PrincipalCache(ttl=settings.ws_principal_ttl_seconds)
+
+
+async def ws_get_current_user_id(ws: WebSocket) -> UUID:
+    """Authenticate the handshake with a connection ticket or an access token.
+
+    A ticket from ``POST /ws/ticket`` is checked by signature alone. An
+    access token is verified the same way and its user is then confirmed
+    through ``principals``, with misses read off the event loop.
+    """
+    auth_service = AuthService(ws.app.state.user, ws.app.state.tokens)
+
+    ticket = ws.query_params.get("ticket")
+    if ticket:
+        try:
+            return UUID(auth_service.decode_token(ticket, expected_type="ws")["sub"])
+        except Exception:
+            await ws.close(code=status.WS_1008_POLICY_VIOLATION)
+            raise RuntimeError("Invalid ticket") from None
+
     token = ws.query_params.get("token") or ""
     if not token:
         auth = ws.headers.get("authorization", "")
@@ -15,12 +95,20 @@ async def ws_get_current_user(ws: WebSocket) -> User:
         await ws.close(code=status.WS_1008_POLICY_VIOLATION)
         raise RuntimeError("No token")
 
-    user_repo = ws.app.state.user
-    token_repo = ws.app.state.tokens
-    auth_service = AuthService(user_repo, token_repo)
-
     try:
-        return auth_service.get_user_from_token(token)
+        user_id = UUID(auth_service.decode_token(token)["sub"])
     except Exception:
         await ws.close(code=status.WS_1008_POLICY_VIOLATION)
         raise RuntimeError("Invalid token") from None
+
+    try:
+        user = await principals.get(
+            user_id, lambda: db_offload.run(ws.app.state.user.read_by, user_id=user_id)
+        )
+    except OverloadedError:
+        await ws.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        raise RuntimeError("Busy") from None
+    if user is None:
+        await ws.close(code=status.WS_1008_POLICY_VIOLATION)
+        raise RuntimeError("User not found")
+    return user_id
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from typing import Any, Protocol
+from uuid import UUID, uuid4
+
+import redis.asyncio as aioredis
+
+from src.runner.config import settings
+
+Handler = Callable[[UUID, dict[str, Any]], Awaitable[None]]
+
+# How long a user's last-seen time is kept after their last heartbeat
+LAST_SEEN_TTL = 30 * 24 * 3600
+
+
+class WSBroker(Protocol):
+    """Fans user-addressed events out to whichever worker holds the sockets."""
+
+    async def start(self, handler: Handler) -> None: ...
+
+    async def close(self) -> None: ...
+
+    async def publish(self, user_id: UUID, payload: dict[str, Any]) -> None: ...
+
+    async def subscribe(self, user_id: UUID) -> None: ...
+
+    async def unsubscribe(self, user_id: UUID) -> None: ...
+
+    async def heartbeat(self, user_ids: list[UUID]) -> None: ...
+
+    async def clear_presence(self, user_id: UUID) -> None: ...
+
+    async def online(self, user_ids: list[UUID]) -> set[UUID]: ...
+
+    async def last_seen(self, user_ids: list[UUID]) -> dict[UUID, float]: ...
+
+    async def watch(self, watcher_id: UUID, user_ids: list[UUID], ttl: int) -> None: ...
+
+    async def watchers(self, user_ids: list[UUID]) -> dict[UUID, set[UUID]]: ...
+
+
+class LocalHub:
+    """In-process stand-in for the Redis server shared by several brokers."""
+
+    def __init__(self) -> None:
+        self.channels: dict[UUID, set[LocalBroker]] = defaultdict(set)
+        self.presence: dict[UUID, dict[str, float]] = defaultdict(dict)
+        self.last_seen: dict[UUID, float] = {}
+        self.watchers: dict[UUID, dict[UUID, float]] = defaultdict(dict)
+
+
+class LocalBroker:
+    def __init__(self, hub: LocalHub | None = None, presence_ttl: int = 60) -> None:
+        self._hub = hub or LocalHub()
+        self._presence_ttl = presence_ttl
+        self._worker_id = uuid4().hex
+        self._handler: Handler | None = None
+
+    async def start(self, handler: Handler) -> None:
+        self._handler = handler
+
+    async def close(self) -> None:
+        for brokers in self._hub.channels.values():
+            brokers.discard(self)
+        self._handler = None
+
+    async def publish(self, user_id: UUID, payload: dict[str, Any]) -> None:
+        for broker in list(self._hub.channels.get(user_id, ())):
+            if broker._handler is not None:
+                await broker._handler(user_id, payload)
+
+    async def subscribe(self, user_id: UUID) -> None:
+        self._hub.channels[user_id].add(self)
+
+    async def unsubscribe(self, user_id: UUID) -> None:
+        brokers = self._hub.channels.get(user_id)
+        if brokers is None:
+            return
+        brokers.discard(self)
+        if not brokers:
+            self._hub.channels.pop(user_id, None)
+
+    async def heartbeat(self, user_ids: list[UUID]) -> None:
+        expires_at = time.monotonic() + self._presence_ttl
+        for user_id in user_ids:
+            self._hub.presence[user_id][self._worker_id] = expires_at
+            self._hub.last_seen[user_id] = time.time()
+
+    async def clear_presence(self, user_id: UUID) -> None:
+        self._hub.presence.get(user_id, {}).pop(self._worker_id, None)
+        self._hub.last_seen[user_id] = time.time()
+
+    async def online(self, user_ids: list[UUID]) -> set[UUID]:
+        now = time.monotonic()
+        return {
+            user_id
+            for user_id in user_ids
+            if any(exp > now for exp in self._hub.presence.get(user_id, {}).values())
+        }
+
+    async def last_seen(self, user_ids: list[UUID]) -> dict[UUID, float]:
+        return {u: self._hub.last_seen[u] for u in user_ids if u in self._hub.last_seen}
+
+    async def watch(self, watcher_id: UUID, user_ids: list[UUID], ttl: int) -> None:
+        expires_at = time.monotonic() + ttl
+        for user_id in user_ids:
+            self._hub.watchers[user_id][watcher_id] = expires_at
+
+    async def watchers(self, user_ids: list[UUID]) -> dict[UUID, set[UUID]]:
+        now = time.monotonic()
+        return {
+            user_id: {
+                w for w, exp in self._hub.watchers.get(user_id, {}).items() if exp > now
+            }
+            for user_id in user_ids
+        }
+
+
+class RedisBroker:
+    """Redis pub/sub with one channel per user and TTL-scored presence sets.
+
+    Presence is a sorted set per user whose members are worker ids scored by
+    their heartbeat expiry, so a user stays online while any worker still
+    holds one of their sockets and drops off on their own if a worker dies.
+    Presence watchers use the same shape, scored by subscription expiry.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        presence_ttl: int = 60,
+        namespace: str = "swipe:ws",
+    ) -> None:
+        self._redis = aioredis.Redis.from_url(redis_url)
+        self._pubsub = self._redis.pubsub()
+        self._presence_ttl = presence_ttl
+        self._namespace = namespace
+        self._worker_id = uuid4().hex
+        self._handler: Handler | None = None
+        self._listener: asyncio.Task[None] | None = None
+
+    async def start(self, handler: Handler) -> None:
+        self._handler = handler
+        self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+        with contextlib.suppress(Exception):
+            await self._pubsub.aclose()
+        await self._redis.aclose()
+
+    async def publish(self, user_id: UUID, payload: dict[str, Any]) -> None:
+        await self._redis.publish(self.channel(user_id), json.dumps(payload))
+
+    async def subscribe(self, user_id: UUID) -> None:
+        await self._pubsub.subscribe(self.channel(user_id))
+
+    async def unsubscribe(self, user_id: UUID) -> None:
+        await self._pubsub.unsubscribe(self.channel(user_id))
+
+    async def heartbeat(self, user_ids: list[UUID]) -> None:
+        if not user_ids:
+            return
+        expires_at = time.time() + self._presence_ttl
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                key = self._presence_key(user_id)
+                pipe.zadd(key, {self._worker_id: expires_at})
+                pipe.expire(key, self._presence_ttl)
+                pipe.set(self._last_seen_key(user_id), time.time(), ex=LAST_SEEN_TTL)
+            await pipe.execute()
+
+    async def clear_presence(self, user_id: UUID) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.zrem(self._presence_key(user_id), self._worker_id)
+            pipe.set(self._last_seen_key(user_id), time.time(), ex=LAST_SEEN_TTL)
+            await pipe.execute()
+
+    async def online(self, user_ids: list[UUID]) -> set[UUID]:
+        if not user_ids:
+            return set()
+        now = time.time()
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.zcount(self._presence_key(user_id), now, "+inf")
+            counts = await pipe.execute()
+        return {user_id for user_id, n in zip(user_ids, counts, strict=True) if n}
+
+    async def last_seen(self, user_ids: list[UUID]) -> dict[UUID, float]:
+        if not user_ids:
+            return {}
+        values = await self._redis.mget([self._last_seen_key(u) for u in user_ids])
+        return {
+            user_id: float(value)
+            for user_id, value in zip(user_ids, values, strict=True)
+            if value is not None
+        }
+
+    async def watch(self, watcher_id: UUID, user_ids: list[UUID], ttl: int) -> None:
+        if not user_ids:
+            return
+        now = time.time()
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                key = self._watchers_key(user_id)
+                pipe.zadd(key, {str(watcher_id): now + ttl})
+                pipe.zremrangebyscore(key, "-inf", now)
+                pipe.expire(key, ttl)
+            await pipe.execute()
+
+    async def watchers(self, user_ids: list[UUID]) -> dict[UUID, set[UUID]]:
+        if not user_ids:
+            return {}
+        now = time.time()
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.zrangebyscore(self._watchers_key(user_id), now, "+inf")
+            results = await pipe.execute()
+        return {
+            user_id: {UUID(w.decode()) for w in members}
+            for user_id, members in zip(user_ids, results, strict=True)
+        }
+
+    async def _listen(self) -> None:
+        while True:
+            if not self._pubsub.subscribed:
+                await asyncio.sleep(0.1)
+                continue
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except aioredis.ConnectionError:
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or self._handler is None:
+                continue
+
+            channel = message["channel"].decode()
+            user_id = UUID(channel.rsplit(":", 1)[1])
+            with contextlib.suppress(Exception):
+                await self._handler(user_id, json.loads(message["data"]))
+
+    def channel(self, user_id: UUID) -> str:
+        return f"{self._namespace}:user:{user_id}"
+
+    def _presence_key(self, user_id: UUID) -> str:
+        return f"{self._namespace}:presence:{user_id}"
+
+    def _last_seen_key(self, user_id: UUID) -> str:
+        return f"{self._namespace}:last_seen:{user_id}"
+
+    def _watchers_key(self, user_id: UUID) -> str:
+        return f"{self._namespace}:watchers:{user_id}"
+
+
+def make_broker() -> WSBroker:
+    if settings.ws_broker == "local":
+        return LocalBroker(presence_ttl=settings.ws_presence_ttl_seconds)
+    return RedisBroker(
+        settings.redis_url, presence_ttl=settings.ws_presence_ttl_seconds
+    )
@@ -1,38 +1,363 @@
-from collections import defaultdict
-from typing import Any
+import asyncio
+import contextlib
+from collections import defaultdict, deque
+from collections.abc import AsyncIterator, Callable
+from typing import Any, Literal
 from uuid import UUID
 
-from fastapi import WebSocket
+from fastapi import WebSocket, status
+
+from src.infra.fastapi.ws_broker import WSBroker, make_broker
+from src.infra.fastapi.ws_replay import LocalReplayLog, ReplayLog, make_replay_log
+from src.infra.services.metrics import metrics
+from src.runner.config import settings
+
+PROTOCOL_VERSION = 2
+
+SlowConsumerPolicy = Literal["disconnect", "drop"]
+PresenceListener = Callable[[UUID, bool], None]
+
+
+class WSSession:
+    """One connected socket and its delivery state.
+
+    Every socket has a bounded outbound queue drained by its own writer task,
+    so a slow client only delays itself. When the queue is full the event is
+    dropped and, under the "disconnect" policy, the socket is closed so the
+    client reconnects and resumes; a frame that does not go out within
+    ``send_timeout`` closes the socket as well.
+
+    Version 1 sockets get every event as its own frame, without ``seq``.
+    Version 2 sockets get ``seq``-stamped events; whatever piles up while a
+    frame is being written goes out next as a single ``batch`` frame. While
+    a resume is replaying, live events are held and deduplicated by ``seq``.
+    Clients ack the highest ``seq`` they have processed; ``lag`` is how many
+    written events they have not acked yet.
+    """
+
+    def __init__(
+        self,
+        ws: WebSocket,
+        version: int = 1,
+        *,
+        max_queue: int = 256,
+        send_timeout: float = 10.0,
+        slow_consumer: SlowConsumerPolicy = "disconnect",
+    ) -> None:
+        self.ws = ws
+        self.version = version
+        self.delivered = 0
+        self.acked = 0
+        self.dropped = 0
+        self.broken = False
+        self._max_queue = max_queue
+        self._send_timeout = send_timeout
+        self._slow_consumer = slow_consumer
+        self._pending: deque[dict[str, Any]] = deque()
+        self._writer: asyncio.Task[None] | None = None
+        self._closer: asyncio.Task[None] | None = None
+        self._held = False
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    @property
+    def lag(self) -> int:
+        return self.delivered - self.acked
+
+    def ack(self, seq: int) -> None:
+        # acks past what was written would hide real lag
+        self.acked = max(self.acked, min(seq, self.delivered))
+
+    def offer(self, event: dict[str, Any]) -> bool:
+        """Queue ``event`` without waiting; False when it was not queued."""
+        if self.broken:
+            return False
+        if len(self._pending) >= self._max_queue:
+            self.dropped += 1
+            metrics.inc("ws_events_dropped_total", policy=self._slow_consumer)
+            if self._slow_consumer == "disconnect":
+                metrics.inc("ws_slow_consumers_total")
+                self._abort(status.WS_1013_TRY_AGAIN_LATER)
+            return False
+
+        if self.version < 2:
+            event = {k: v for k, v in event.items() if k != "seq"}
+        self._pending.append(event)
+        if not self._held:
+            self._kick()
+        return True
+
+    def hold(self) -> None:
+        self._held = True
+
+    async def release(self, events: list[dict[str, Any]], after: int) -> None:
+        """Send replayed ``events``, then live events newer than ``after``."""
+        if events:
+            await self._send(events)
+            after = max(after, events[-1]["seq"])
+        self._pending = deque(
+            e for e in self._pending if e.get("seq", after + 1) > after
+        )
+        self._held = False
+        if self._pending:
+            self._kick()
+
+    async def close(self) -> None:
+        if self._writer is not None and not self._writer.done():
+            self._writer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._writer
+
+    def _kick(self) -> None:
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        try:
+            while self._pending:
+                if self.version < 2:
+                    events = [self._pending.popleft()]
+                else:
+                    events = list(self._pending)
+                    self._pending.clear()
+                await asyncio.wait_for(self._send(events), self._send_timeout)
+        except TimeoutError:
+            metrics.inc("ws_send_timeouts_total")
+            self._abort(status.WS_1013_TRY_AGAIN_LATER)
+        except Exception:
+            self._abort(status.WS_1011_INTERNAL_ERROR)
+
+    async def _send(self, events: list[dict[str, Any]]) -> None:
+        if len(events) == 1:
+            await self.ws.send_json(events[0])
+        else:
+            await self.ws.send_json({"type": "batch", "events": events})
+        metrics.inc("ws_frames_sent_total")
+        self.delivered = max(
+            self.delivered, max((e.get("seq", 0) for e in events), default=0)
+        )
+
+    def _abort(self, code: int) -> None:
+        """Stop writing and close the socket; the handler then disconnects it."""
+        self.broken = True
+        self._pending.clear()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        self._closer = asyncio.create_task(self._close_socket(code))
+
+    async def _close_socket(self, code: int) -> None:
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(self.ws.close(code=code), self._send_timeout)
 
 
 class WSManager:
-    def __init__(self) -> None:
-        self._user_sockets: dict[UUID, set[WebSocket]] = defaultdict(set)
+    def __init__(
+        self,
+        broker: WSBroker,
+        heartbeat_seconds: int = 20,
+        *,
+        replay: ReplayLog | None = None,
+        queue_size: int = 256,
+        send_timeout: float = 10.0,
+        slow_consumer: SlowConsumerPolicy = "disconnect",
+    ) -> None:
+        self._broker = broker
+        self._replay = replay or LocalReplayLog()
+        self._queue_size = queue_size
+        self._send_timeout = send_timeout
+        self._slow_consumer: SlowConsumerPolicy = slow_consumer
+        self._heartbeat_seconds = heartbeat_seconds
+        self._user_sockets: dict[UUID, dict[WebSocket, WSSession]] = defaultdict(dict)
+        self._heartbeat: asyncio.Task[None] | None = None
+        self._presence_listeners: list[PresenceListener] = []
+        # per-user send locks and how many sends hold or wait on each
+        self._send_locks: dict[UUID, tuple[asyncio.Lock, int]] = {}
+
+    @property
+    def broker(self) -> WSBroker:
+        return self._broker
+
+    def on_presence(self, listener: PresenceListener) -> None:
+        """Call ``listener(user_id, online)`` when this worker gains a user's
+        first socket or loses their last one."""
+        self._presence_listeners.append(listener)
 
-    async def connect(self, user_id: UUID, ws: WebSocket) -> None:
+    async def start(self) -> None:
+        await self._broker.start(self._deliver)
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+    async def stop(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._heartbeat
+        await self._broker.close()
+        await self._replay.close()
+
+    async def connect(
+        self,
+        user_id: UUID,
+        ws: WebSocket,
+        *,
+        version: int = 1,
+        resuming: bool = False,
+    ) -> WSSession:
         await ws.accept()
-        self._user_sockets[user_id].add(ws)
+        session = WSSession(
+            ws,
+            version=version,
+            max_queue=self._queue_size,
+            send_timeout=self._send_timeout,
+            slow_consumer=self._slow_consumer,
+        )
+        if resuming and version >= 2:
+            # hold live events until resume() has replayed the gap
+            session.hold()
+        first = user_id not in self._user_sockets
+        self._user_sockets[user_id][ws] = session
+        if first:
+            await self._broker.subscribe(user_id)
+        await self._broker.heartbeat([user_id])
+        if first:
+            self._notify_presence(user_id, True)
+        return session
+
+    async def resume(self, user_id: UUID, session: WSSession, since: int) -> None:
+        """Replay events after ``since`` or tell the client to resync over REST."""
+        events = await self._replay.since(user_id, since)
+        if events is None:
+            head = await self._replay.head(user_id)
+            await session.ws.send_json({"type": "resync", "seq": head})
+            await session.release([], after=head)
+        else:
+            await session.release(events, after=since)
 
-    def disconnect(self, user_id: UUID, ws: WebSocket) -> None:
+    async def head(self, user_id: UUID) -> int:
+        return await self._replay.head(user_id)
+
+    def ack(self, user_id: UUID, ws: WebSocket, seq: int) -> None:
+        session = self._user_sockets.get(user_id, {}).get(ws)
+        if session is not None:
+            session.ack(seq)
+
+    async def disconnect(self, user_id: UUID, ws: WebSocket) -> None:
         group = self._user_sockets.get(user_id)
         if group is None:
             return
-        group.discard(ws)
+        session = group.pop(ws, None)
+        if session is not None:
+            await session.close()
         if not group:
             self._user_sockets.pop(user_id, None)
+            await self._broker.unsubscribe(user_id)
+            await self._broker.clear_presence(user_id)
+            self._notify_presence(user_id, False)
 
-    async def send_to_user(self, user_id: UUID, payload: dict[str, Any]) -> None:
-        for ws in list(self._user_sockets.get(user_id, ())):
-            try:
-                await ws.send_json(payload)
-            except Exception:
-                self.disconnect(user_id, ws)
+    async def send_to_user(
+        self, user_id: UUID, payload: dict[str, Any], *, ephemeral: bool = False
+    ) -> None:
+        """Publish to every socket of the user.
+
+        Ephemeral events (presence, typing) skip the replay log and carry no
+        ``seq``, so they are neither replayed nor counted in resume gaps.
+        Sequenced events are published in ``seq`` order: a client resuming
+        from the highest ``seq`` it saw must not skip one still in flight.
+        """
+        if ephemeral:
+            await self._broker.publish(user_id, payload)
+            return
+        if self._replay.publishes:
+            await self._replay.append(user_id, payload)
+            return
+        async with self._sending(user_id):
+            seq = await self._replay.append(user_id, payload)
+            await self._broker.publish(user_id, {**payload, "seq": seq})
 
     async def send_to_users(
-        self, user_ids: list[UUID], payload: dict[str, Any]
+        self, user_ids: list[UUID], payload: dict[str, Any], *, ephemeral: bool = False
     ) -> None:
-        for uid in user_ids:
-            await self.send_to_user(uid, payload)
+        await asyncio.gather(
+            *(
+                self.send_to_user(uid, payload, ephemeral=ephemeral)
+                for uid in dict.fromkeys(user_ids)
+            )
+        )
+
+    async def online(self, user_ids: list[UUID]) -> set[UUID]:
+        return await self._broker.online(user_ids)
+
+    def queue_depth(self) -> int:
+        return sum(
+            session.depth
+            for group in self._user_sockets.values()
+            for session in group.values()
+        )
+
+    def max_queue_depth(self) -> int:
+        return max(
+            (
+                session.depth
+                for group in self._user_sockets.values()
+                for session in group.values()
+            ),
+            default=0,
+        )
+
+    @contextlib.asynccontextmanager
+    async def _sending(self, user_id: UUID) -> AsyncIterator[None]:
+        lock, users = self._send_locks.get(user_id, (asyncio.Lock(), 0))
+        self._send_locks[user_id] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._send_locks[user_id]
+            if users == 1:
+                del self._send_locks[user_id]
+            else:
+                self._send_locks[user_id] = (lock, users - 1)
+
+    def max_ack_lag(self) -> int:
+        return max(
+            (
+                session.lag
+                for group in self._user_sockets.values()
+                for session in group.values()
+            ),
+            default=0,
+        )
+
+    def _notify_presence(self, user_id: UUID, online: bool) -> None:
+        for listener in self._presence_listeners:
+            listener(user_id, online)
+
+    def session_count(self) -> int:
+        return sum(len(group) for group in self._user_sockets.values())
+
+    async def _deliver(self, user_id: UUID, payload: dict[str, Any]) -> None:
+        # offer() never waits, so one slow socket cannot hold up the others
+        for session in list(self._user_sockets.get(user_id, {}).values()):
+            session.offer(payload)
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_seconds)
+            with contextlib.suppress(Exception):
+                await self._broker.heartbeat(list(self._user_sockets))
 
 
-manager = WSManager()
+_broker = make_broker()
+manager = WSManager(
+    _broker,
+    heartbeat_seconds=max(1, settings.ws_presence_ttl_seconds // 3),
+    replay=make_replay_log(_broker),
+    queue_size=settings.ws_send_queue_size,
+    send_timeout=settings.ws_send_timeout_seconds,
+    slow_consumer="drop" if settings.ws_slow_consumer == "drop" else "disconnect",
+)
+metrics.gauge("ws_sessions", manager.session_count)
+metrics.gauge("ws_send_queue_depth", manager.queue_depth)
+metrics.gauge("ws_send_queue_depth_max", manager.max_queue_depth)
+metrics.gauge("ws_ack_lag_max", manager.max_ack_lag)
@@ -0,0 +1,171 @@
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from src.infra.fastapi.ws_manager import WSManager, manager
+from src.runner.config import settings
+
+
+@dataclass
+class PresenceState:
+    user_id: UUID
+    online: bool
+    last_seen: datetime | None = None
+
+    def to_event_item(self) -> dict[str, Any]:
+        return {
+            "user_id": str(self.user_id),
+            "online": self.online,
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+        }
+
+
+class PresenceService:
+    """Cross-worker presence and typing indicators on top of ``WSManager``.
+
+    Online state and last-seen times come from the broker's TTL heartbeats.
+    Changes are not pushed as they happen: they collect for ``window``
+    seconds and are re-checked against the broker, so a reconnect inside the
+    window sends nothing, and each watcher then gets at most one ``presence``
+    frame listing every change. Typing indicators are forwarded at most once
+    per ``typing_interval`` for each sender and peer.
+    """
+
+    def __init__(
+        self,
+        ws: WSManager,
+        *,
+        window: float = 2.0,
+        typing_interval: float = 3.0,
+        watch_ttl: int = 120,
+        max_watch: int = 200,
+    ) -> None:
+        self._ws = ws
+        self._window = window
+        self._typing_interval = typing_interval
+        self._watch_ttl = watch_ttl
+        self._max_watch = max_watch
+
+        self._changed: set[UUID] = set()
+        self._online: set[UUID] = set()
+        self._watching: dict[UUID, list[UUID]] = {}
+        self._typing: dict[tuple[UUID, UUID], float] = {}
+        self._loop: asyncio.Task[None] | None = None
+        ws.on_presence(self._on_presence)
+
+    async def start(self) -> None:
+        self._loop = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._loop
+
+    async def snapshot(self, user_ids: list[UUID]) -> list[PresenceState]:
+        user_ids = list(dict.fromkeys(user_ids))
+        online = await self._ws.broker.online(user_ids)
+        seen = await self._ws.broker.last_seen(user_ids)
+        return [
+            PresenceState(
+                user_id=user_id,
+                online=user_id in online,
+                last_seen=(
+                    datetime.fromtimestamp(seen[user_id]) if user_id in seen else None
+                ),
+            )
+            for user_id in user_ids
+        ]
+
+    async def watch(
+        self, watcher_id: UUID, user_ids: list[UUID]
+    ) -> list[PresenceState]:
+        """Subscribe ``watcher_id`` to changes of ``user_ids``, replacing any
+        earlier subscription, and return their current state."""
+        user_ids = list(dict.fromkeys(user_ids))[: self._max_watch]
+        self._watching[watcher_id] = user_ids
+        await self._ws.broker.watch(watcher_id, user_ids, self._watch_ttl)
+        return await self.snapshot(user_ids)
+
+    async def typing(self, sender_id: UUID, peer_id: UUID) -> bool:
+        now = time.monotonic()
+        last = self._typing.get((sender_id, peer_id))
+        if last is not None and now - last < self._typing_interval:
+            return False
+
+        self._typing[(sender_id, peer_id)] = now
+        if len(self._typing) > 10_000:
+            self._typing = {
+                k: t for k, t in self._typing.items() if now - t < self._typing_interval
+            }
+        await self._ws.send_to_user(
+            peer_id,
+            {"type": "typing", "user_id": str(sender_id)},
+            ephemeral=True,
+        )
+        return True
+
+    async def flush(self) -> None:
+        """Announce the state changes collected since the last flush."""
+        changed, self._changed = self._changed, set()
+        if not changed:
+            return
+
+        moved = [
+            state
+            for state in await self.snapshot(list(changed))
+            if state.online != (state.user_id in self._online)
+        ]
+        if not moved:
+            return
+        for state in moved:
+            if state.online:
+                self._online.add(state.user_id)
+            else:
+                self._online.discard(state.user_id)
+
+        watchers = await self._ws.broker.watchers([s.user_id for s in moved])
+        frames: dict[UUID, list[dict[str, Any]]] = {}
+        for state in moved:
+            for watcher_id in watchers.get(state.user_id, ()):
+                frames.setdefault(watcher_id, []).append(state.to_event_item())
+
+        await asyncio.gather(
+            *(
+                self._ws.send_to_user(
+                    watcher_id, {"type": "presence", "users": items}, ephemeral=True
+                )
+                for watcher_id, items in frames.items()
+            )
+        )
+
+    def _on_presence(self, user_id: UUID, online: bool) -> None:
+        self._changed.add(user_id)
+        if not online:
+            # the watcher's subscription lapses after watch_ttl
+            self._watching.pop(user_id, None)
+
+    async def _run(self) -> None:
+        refreshed = time.monotonic()
+        while True:
+            await asyncio.sleep(self._window)
+            with contextlib.suppress(Exception):
+                await self.flush()
+            if time.monotonic() - refreshed >= self._watch_ttl / 3:
+                refreshed = time.monotonic()
+                with contextlib.suppress(Exception):
+                    for watcher_id, user_ids in list(self._watching.items()):
+                        await self._ws.broker.watch(
+                            watcher_id, user_ids, self._watch_ttl
+                        )
+
+
+presence = PresenceService(
+    manager,
+    window=settings.ws_presence_window_seconds,
+    typing_interval=settings.ws_typing_interval_seconds,
+)
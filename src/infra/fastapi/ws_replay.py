@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from typing import Any, Protocol
+from uuid import UUID
+
+import redis.asyncio as aioredis
+
+from src.infra.fastapi.ws_broker import RedisBroker, WSBroker
+from src.runner.config import settings
+
+
+class ReplayLog(Protocol):
+    """Stamps user-addressed events with a per-user sequence and keeps the tail.
+
+    ``since`` returns the retained events after ``seq`` in order, or None when
+    some of them have already been evicted (or ``seq`` was never issued) and
+    the client has to resync.
+
+    A log that ``publishes`` also sends each stamped event to the user's
+    broker channel in the same step as stamping it, so events are published
+    in sequence order.
+    """
+
+    publishes: bool
+
+    async def append(self, user_id: UUID, payload: dict[str, Any]) -> int: ...
+
+    async def since(self, user_id: UUID, seq: int) -> list[dict[str, Any]] | None: ...
+
+    async def head(self, user_id: UUID) -> int: ...
+
+    async def close(self) -> None: ...
+
+
+class LocalReplayLog:
+    """Per-user tails kept in memory for at most ``max_users`` users.
+
+    The event tails of the users written to least recently are evicted
+    first; their clients get a resync when they resume. Sequence counters
+    are never dropped, so a user's ``seq`` keeps increasing.
+    """
+
+    publishes = False
+
+    def __init__(self, size: int = 256, max_users: int = 10_000) -> None:
+        self._size = size
+        self._max_users = max_users
+        self._seq: dict[UUID, int] = {}
+        self._events: OrderedDict[UUID, deque[dict[str, Any]]] = OrderedDict()
+
+    async def append(self, user_id: UUID, payload: dict[str, Any]) -> int:
+        seq = self._seq.get(user_id, 0) + 1
+        self._seq[user_id] = seq
+        events = self._events.get(user_id)
+        if events is None:
+            events = self._events[user_id] = deque(maxlen=self._size)
+            if len(self._events) > self._max_users:
+                self._events.popitem(last=False)
+        else:
+            self._events.move_to_end(user_id)
+        events.append({**payload, "seq": seq})
+        return seq
+
+    async def since(self, user_id: UUID, seq: int) -> list[dict[str, Any]] | None:
+        head = self._seq.get(user_id, 0)
+        if seq == head:
+            return []
+        events = self._events.get(user_id)
+        if seq > head or not events or seq < events[0]["seq"] - 1:
+            return None
+        return [e for e in events if e["seq"] > seq]
+
+    async def head(self, user_id: UUID) -> int:
+        return self._seq.get(user_id, 0)
+
+    async def close(self) -> None:
+        return None
+
+
+# KEYS: seq counter, events zset
+# ARGV: payload json without its opening brace, size, ttl seconds, channel to
+# publish the stamped event on or ''
+_APPEND = """
+local seq = redis.call('INCR', KEYS[1])
+-- counters written before they stopped expiring may still carry a TTL
+redis.call('PERSIST', KEYS[1])
+local sep = ARGV[1] == '}' and '' or ','
+local event = '{"seq":' .. seq .. sep .. ARGV[1]
+redis.call('ZADD', KEYS[2], seq, event)
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -tonumber(ARGV[2]) - 1)
+if ARGV[4] ~= '' then
+    redis.call('PUBLISH', ARGV[4], event)
+end
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return seq
+"""
+
+
+class RedisReplayLog:
+    """Sequence counter plus a capped sorted set of events scored by sequence.
+
+    The events expire after ``ttl`` seconds without traffic, so idle users
+    only hold their counter; a client resuming after that gets a resync. The
+    counter never expires: a restarted ``seq`` would make resume points from
+    before the restart look valid. Given a
+    ``channel`` naming function, the append script publishes the stamped
+    event too, so concurrent senders on any worker cannot reorder it.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        size: int = 256,
+        ttl: int = 3600,
+        namespace: str = "swipe:ws",
+        channel: Callable[[UUID], str] | None = None,
+    ) -> None:
+        self._redis = aioredis.Redis.from_url(redis_url)
+        self._append = self._redis.register_script(_APPEND)
+        self._size = size
+        self._ttl = ttl
+        self._namespace = namespace
+        self._channel = channel
+        self.publishes = channel is not None
+
+    async def append(self, user_id: UUID, payload: dict[str, Any]) -> int:
+        channel = self._channel(user_id) if self._channel is not None else ""
+        seq = await self._append(
+            keys=[self._seq_key(user_id), self._events_key(user_id)],
+            args=[json.dumps(payload)[1:], self._size, self._ttl, channel],
+        )
+        return int(seq)
+
+    async def since(self, user_id: UUID, seq: int) -> list[dict[str, Any]] | None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.get(self._seq_key(user_id))
+            pipe.zrange(self._events_key(user_id), 0, 0, withscores=True)
+            pipe.zrangebyscore(self._events_key(user_id), f"({seq}", "+inf")
+            head, oldest, events = await pipe.execute()
+
+        # a seq past the head was never issued
+        if seq == int(head or 0):
+            return []
+        if seq > int(head or 0) or not oldest or seq < int(oldest[0][1]) - 1:
+            return None
+        return [json.loads(e) for e in events]
+
+    async def head(self, user_id: UUID) -> int:
+        return int(await self._redis.get(self._seq_key(user_id)) or 0)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+    def _seq_key(self, user_id: UUID) -> str:
+        return f"{self._namespace}:seq:{user_id}"
+
+    def _events_key(self, user_id: UUID) -> str:
+        return f"{self._namespace}:replay:{user_id}"
+
+
+def make_replay_log(broker: WSBroker) -> ReplayLog:
+    if settings.ws_broker == "local":
+        return LocalReplayLog(size=settings.ws_replay_size)
+    return RedisReplayLog(
+        settings.redis_url,
+        size=settings.ws_replay_size,
+        ttl=settings.ws_replay_ttl_seconds,
+        channel=broker.channel if isinstance(broker, RedisBroker) else None,
+    )
@@ -0,0 +1,41 @@
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.social import UserCounts
+from src.runner.db import Base
+
+
+class UserCounter(Base):
+    __tablename__ = "user_counters"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    followers: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    following: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    friends: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    posts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    def __init__(
+        self,
+        user_id: UUID,
+        followers: int = 0,
+        following: int = 0,
+        friends: int = 0,
+        posts: int = 0,
+    ) -> None:
+        self.user_id = user_id
+        self.followers = followers
+        self.following = following
+        self.friends = friends
+        self.posts = posts
+
+    def to_object(self) -> UserCounts:
+        return UserCounts(
+            followers=self.followers,
+            following=self.following,
+            friends=self.friends,
+            posts=self.posts,
+        )
@@ -1,6 +1,7 @@
+from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.runner.db import Base
@@ -8,7 +9,11 @@ from src.runner.db import Base
 
 class Follow(Base):
     __tablename__ = "follows"
-    __table_args__ = (UniqueConstraint("follower_id", "following_id"),)
+    __table_args__ = (
+        UniqueConstraint("follower_id", "following_id"),
+        Index("ix_follows_following_created", "following_id", "created_at", "id"),
+        Index("ix_follows_follower_created", "follower_id", "created_at", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     follower_id: Mapped[UUID] = mapped_column(
@@ -17,6 +22,7 @@ class Follow(Base):
     following_id: Mapped[UUID] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE")
     )
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
 
     def __init__(self, follower_id: UUID, following_id: UUID):
         self.follower_id = follower_id
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.runner.db import Base
@@ -24,11 +24,15 @@ class FriendRequest(Base):
 
 class Friend(Base):
     __tablename__ = "friends"
-    __table_args__ = (UniqueConstraint("user_id", "friend_id"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "friend_id"),
+        Index("ix_friends_user_created", "user_id", "created_at", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     friend_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
 
     def __init__(self, user_id: UUID, friend_id: UUID):
         self.user_id = user_id
@@ -37,7 +41,10 @@ class Friend(Base):
 
 class SuggestionSkip(Base):
     __tablename__ = "suggestion_skips"
-    __table_args__ = (UniqueConstraint("user_id", "target_user_id"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "target_user_id"),
+        Index("ix_suggestion_skips_user_expires", "user_id", "expires_at"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
@@ -1,14 +1,27 @@
 from datetime import datetime
-from tokenize import String
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import (
+    Boolean,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.core.messenger import Chat as DomainChat
 from src.core.messenger import Message as DomainMessage
 from src.runner.db import Base
 
+# Text search configuration of messages.search_vector and its queries
+SEARCH_CONFIG = "simple"
+
 
 class Chat(Base):
     __tablename__ = "chats"
@@ -23,6 +36,8 @@ class Chat(Base):
 
     last_message_at: Mapped[datetime | None] = mapped_column(DateTime)
     last_message_id: Mapped[UUID | None] = mapped_column(nullable=True)
+    last_message_preview: Mapped[str | None] = mapped_column(String, nullable=True)
+    last_message_sender_id: Mapped[UUID | None] = mapped_column(nullable=True)
 
     __table_args__ = (UniqueConstraint("user_a_id", "user_b_id", name="uq_chat_pair"),)
 
@@ -45,11 +60,62 @@ class Chat(Base):
             user_b_id=self.user_b_id,
             last_message_at=self.last_message_at,
             last_message_id=self.last_message_id,
+            last_message_preview=self.last_message_preview,
+            last_message_sender_id=self.last_message_sender_id,
         )
 
 
+class ChatMember(Base):
+    """Per-user projection of a chat, ordered for inbox keyset scans."""
+
+    __tablename__ = "chat_members"
+    __table_args__ = (
+        Index(
+            "ix_chat_members_inbox",
+            "user_id",
+            text("last_message_at DESC"),
+            text("chat_id DESC"),
+        ),
+    )
+
+    chat_id: Mapped[UUID] = mapped_column(
+        ForeignKey("chats.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    last_message_at: Mapped[datetime | None] = mapped_column(DateTime)
+    unread: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    muted: Mapped[bool] = mapped_column(Boolean, default=False, server_default="false")
+
+    # Read watermark: every message up to (created_at, id) is read
+    last_read_message_at: Mapped[datetime | None] = mapped_column(DateTime)
+    last_read_message_id: Mapped[UUID | None] = mapped_column(nullable=True)
+    read_at: Mapped[datetime | None] = mapped_column(DateTime)
+
+    def __init__(
+        self,
+        chat_id: UUID,
+        user_id: UUID,
+        last_message_at: datetime | None = None,
+        unread: int = 0,
+        muted: bool = False,
+    ) -> None:
+        self.chat_id = chat_id
+        self.user_id = user_id
+        self.last_message_at = last_message_at
+        self.unread = unread
+        self.muted = muted
+
+
 class Message(Base):
+    # In migrated databases this is range-partitioned by month on created_at
+    # with a (id, created_at) primary key; see MessagePartitionRepository.
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_chat_created", "chat_id", "created_at", "id"),
+        Index("ix_messages_search", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     chat_id: Mapped[UUID] = mapped_column(
@@ -61,9 +127,12 @@ class Message(Base):
 
     body: Mapped[str] = mapped_column(String, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-
-    seen_at_user_a: Mapped[datetime | None] = mapped_column(DateTime)
-    seen_at_user_b: Mapped[datetime | None] = mapped_column(DateTime)
+    # 'simple' keeps every word unstemmed: chats mix languages and slang
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}', body)", persisted=True),
+        deferred=True,
+    )
 
     def __init__(
         self,
@@ -71,15 +140,11 @@ class Message(Base):
         sender_id: UUID,
         body: str,
         created_at: datetime | None = None,
-        seen_at_user_a: datetime | None = None,
-        seen_at_user_b: datetime | None = None,
     ) -> None:
         self.chat_id = chat_id
         self.sender_id = sender_id
         self.body = body
         self.created_at = created_at or datetime.utcnow()
-        self.seen_at_user_a = seen_at_user_a
-        self.seen_at_user_b = seen_at_user_b
 
     def to_object(self) -> DomainMessage:
         return DomainMessage(
@@ -88,6 +153,4 @@ class Message(Base):
             sender_id=self.sender_id,
             body=self.body,
             created_at=self.created_at,
-            seen_at_user_a=self.seen_at_user_a,
-            seen_at_user_b=self.seen_at_user_b,
         )
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import ScalarSelect, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from src.core.social import UserCounts
+from src.infra.models.counter import UserCounter
+from src.infra.models.creator_post.post import Post as CreatorPostModel
+from src.infra.models.follow import Follow
+from src.infra.models.friend import Friend
+from src.infra.models.personal_post.post import PersonalPost as PersonalPostModel
+from src.infra.models.user import User as UserModel
+
+COUNTER_COLUMNS = ("followers", "following", "friends", "posts")
+
+
+def bump_counters(db: Session, user_id: UUID, **deltas: int) -> None:
+    """Stage counter deltas in the caller's transaction; the caller commits."""
+    stmt = insert(UserCounter).values(
+        user_id=user_id, **{name: max(delta, 0) for name, delta in deltas.items()}
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserCounter.user_id],
+        set_={
+            name: func.greatest(getattr(UserCounter, name) + delta, 0)
+            for name, delta in deltas.items()
+        },
+    )
+    db.execute(stmt)
+
+
+def _count_for_user(column: InstrumentedAttribute[UUID]) -> ScalarSelect[int]:
+    return select(func.count()).where(column == UserModel.id).scalar_subquery()
+
+
+@dataclass
+class CounterRepository:
+    db: Session
+
+    def get(self, user_id: UUID) -> UserCounts:
+        counter = self.db.get(UserCounter, user_id)
+        return counter.to_object() if counter else UserCounts()
+
+    def get_many(self, user_ids: list[UUID]) -> dict[UUID, UserCounts]:
+        if not user_ids:
+            return {}
+        rows = self.db.execute(
+            select(UserCounter).where(UserCounter.user_id.in_(user_ids))
+        ).scalars()
+        counts = {row.user_id: row.to_object() for row in rows}
+        return {uid: counts.get(uid, UserCounts()) for uid in user_ids}
+
+    def reconcile(self, batch_size: int = 1000) -> int:
+        """Recount every user's counters from the source tables.
+
+        Users are processed in id order, one committed batch at a time, and
+        only rows that drifted are written. Returns the number of rows fixed.
+        """
+        fixed = 0
+        last_id: UUID | None = None
+        while True:
+            query = select(UserModel.id).order_by(UserModel.id).limit(batch_size)
+            if last_id:
+                query = query.where(UserModel.id > last_id)
+            user_ids = list(self.db.execute(query).scalars())
+            if not user_ids:
+                return fixed
+
+            fixed += self._reconcile_batch(user_ids)
+            self.db.commit()
+            last_id = user_ids[-1]
+
+    def _reconcile_batch(self, user_ids: list[UUID]) -> int:
+        source = select(
+            UserModel.id,
+            _count_for_user(Follow.following_id),
+            _count_for_user(Follow.follower_id),
+            _count_for_user(Friend.user_id),
+            _count_for_user(PersonalPostModel.user_id)
+            + _count_for_user(CreatorPostModel.user_id),
+        ).where(UserModel.id.in_(user_ids))
+
+        stmt = insert(UserCounter).from_select(["user_id", *COUNTER_COLUMNS], source)
+        stored = tuple_(*(getattr(UserCounter, c) for c in COUNTER_COLUMNS))
+        actual = tuple_(*(stmt.excluded[c] for c in COUNTER_COLUMNS))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserCounter.user_id],
+            set_={c: stmt.excluded[c] for c in COUNTER_COLUMNS},
+            where=stored.is_distinct_from(actual),
+        )
+        return int(self.db.execute(stmt).rowcount)
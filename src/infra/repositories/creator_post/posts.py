@@ -20,6 +20,7 @@ from src.infra.models.creator_post.post import Post as PostModel
 from src.infra.models.creator_post.reference import Reference
 from src.infra.models.creator_post.reference import Reference as ReferenceModel
 from src.infra.models.user import User
+from src.infra.repositories.counters import bump_counters
 
 
 @dataclass
@@ -93,6 +94,7 @@ class PostRepository:
             MediaModel(post_id=db_post.id, url=m.url, media_type=m.media_type.value)
             for m in post.media
         ]
+        bump_counters(self.db, post.user_id, posts=1)
 
         self.db.commit()
         refetched = (
@@ -193,6 +195,7 @@ class PostRepository:
 
         hashtags = list(post.hashtags)
         self.db.delete(post)
+        bump_counters(self.db, post.user_id, posts=-1)
         self.db.commit()
 
         for hashtag in hashtags:
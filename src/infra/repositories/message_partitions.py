@@ -0,0 +1,183 @@
+import gzip
+import logging
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+@dataclass
+class MessagePartitionRepository:
+    """Monthly ``created_at`` range partitions of the messages table.
+
+    Partitions are named ``<table>_yYYYYmMM`` and cover one calendar month.
+    Every operation is a no-op while the table is a plain heap, so the same
+    jobs run against databases that have not been migrated to partitioning.
+    """
+
+    db: Session
+    table: str = "messages"
+
+    def is_partitioned(self) -> bool:
+        return bool(
+            self.db.scalar(
+                text(
+                    "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table"
+                    " WHERE partrelid = to_regclass(:table))"
+                ),
+                {"table": self.table},
+            )
+        )
+
+    def partition_name(self, month: date) -> str:
+        return f"{self.table}_y{month:%Y}m{month:%m}"
+
+    def list_months(self) -> list[date]:
+        names = self.db.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i"
+                " JOIN pg_class c ON c.oid = i.inhrelid"
+                " WHERE i.inhparent = to_regclass(:table)"
+            ),
+            {"table": self.table},
+        ).all()
+        prefix = f"{self.table}_y"
+        return sorted(
+            date(int(name[-7:-3]), int(name[-2:]), 1)
+            for name in names
+            if name.startswith(prefix) and len(name) == len(prefix) + 7
+        )
+
+    def _default_partition(self) -> str | None:
+        name: str | None = self.db.scalar(
+            text(
+                "SELECT c.relname FROM pg_inherits i"
+                " JOIN pg_class c ON c.oid = i.inhrelid"
+                " WHERE i.inhparent = to_regclass(:table)"
+                " AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT'"
+            ),
+            {"table": self.table},
+        )
+        return name
+
+    def ensure_future(
+        self, months_ahead: int = 3, today: date | None = None
+    ) -> list[str]:
+        """Create the partitions for this month and ``months_ahead`` after it.
+
+        Each month is committed on its own, so one that fails is logged and
+        skipped without holding back the others; the next run retries it.
+        """
+        if not self.is_partitioned():
+            return []
+
+        existing = set(self.list_months())
+        current = month_start(today or date.today())
+        created = []
+        for n in range(months_ahead + 1):
+            month = add_months(current, n)
+            if month in existing:
+                continue
+            name = self.partition_name(month)
+            try:
+                with self.db.begin_nested():
+                    self._create_partition(name, month)
+                self.db.commit()
+            except SQLAlchemyError:
+                logger.exception("Could not create partition %s", name)
+                continue
+            created.append(name)
+        return created
+
+    def _create_partition(self, name: str, month: date) -> None:
+        """Create ``name`` for ``month``, moving in rows the default caught.
+
+        Postgres refuses a new range while the default partition holds rows
+        inside it, so those are moved over with the default detached.
+        """
+        bounds = {"start": month, "end": add_months(month, 1)}
+        create = text(
+            f'CREATE TABLE "{name}" PARTITION OF "{self.table}"'
+            f" FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+        )
+        default = self._default_partition()
+        in_month = "created_at >= :start AND created_at < :end"
+        if default is None or not self.db.scalar(
+            text(f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE {in_month})'),
+            bounds,
+        ):
+            self.db.execute(create)
+            return
+
+        # stored generated columns are recomputed rather than copied
+        columns = ", ".join(
+            f'"{column}"'
+            for column in self.db.scalars(
+                text(
+                    "SELECT attname FROM pg_attribute"
+                    " WHERE attrelid = to_regclass(:table) AND attnum > 0"
+                    " AND NOT attisdropped AND attgenerated = ''"
+                    " ORDER BY attnum"
+                ),
+                {"table": self.table},
+            )
+        )
+        self.db.execute(
+            text(f'ALTER TABLE "{self.table}" DETACH PARTITION "{default}"')
+        )
+        self.db.execute(create)
+        self.db.execute(
+            text(
+                f'WITH moved AS (DELETE FROM "{default}" WHERE {in_month}'
+                f" RETURNING {columns})"
+                f' INSERT INTO "{name}" ({columns}) SELECT {columns} FROM moved'
+            ),
+            bounds,
+        )
+        self.db.execute(
+            text(f'ALTER TABLE "{self.table}" ATTACH PARTITION "{default}" DEFAULT')
+        )
+
+    def archive(
+        self, before: date, directory: Path, *, drop: bool = True
+    ) -> list[Path]:
+        """Export partitions for months before ``before`` and detach them.
+
+        Each partition is written as gzipped CSV with a header, restorable
+        with ``COPY ... FROM``, then detached and, with ``drop``, dropped.
+        """
+        if not self.is_partitioned():
+            return []
+
+        directory.mkdir(parents=True, exist_ok=True)
+        cursor = self.db.connection().connection.cursor()
+        exported = []
+        for month in self.list_months():
+            if month >= month_start(before):
+                continue
+            name = self.partition_name(month)
+            path = directory / f"{name}.csv.gz"
+            with gzip.open(path, "wb") as out:
+                cursor.copy_expert(f'COPY "{name}" TO STDOUT WITH CSV HEADER', out)
+            self.db.execute(
+                text(f'ALTER TABLE "{self.table}" DETACH PARTITION "{name}"')
+            )
+            if drop:
+                self.db.execute(text(f'DROP TABLE "{name}"'))
+            exported.append(path)
+        self.db.commit()
+        return exported
@@ -1,18 +1,106 @@
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass
 from datetime import datetime
-from uuid import UUID
+from typing import Any
+from uuid import UUID, uuid4
 
-from sqlalchemy import and_, func, or_
+from sqlalchemy import (
+    Double,
+    case,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import Insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from src.core.errors import DoesNotExistError
 from src.core.messenger import Chat as DomainChat
-from src.core.messenger import ChatSummary
+from src.core.messenger import (
+    ChatSummary,
+    InboxPage,
+    MessageHit,
+    MessagePage,
+    MessageSearchPage,
+    OutgoingMessage,
+    ReadReceipt,
+)
 from src.core.messenger import Message as DomainMessage
+from src.infra.models.messenger import SEARCH_CONFIG, ChatMember
 from src.infra.models.messenger import Chat as ChatModel
 from src.infra.models.messenger import Message as MessageModel
 
+# Characters of the last message kept on the chat for the inbox preview
+PREVIEW_LENGTH = 120
+
+# ts_headline options for search snippets
+HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxWords=24, MinWords=8, MaxFragments=2"
+)
+
+# Escapes applied to bodies before highlighting, so snippets are safe HTML
+_HTML_ESCAPES = (
+    ("&", "&amp;"),
+    ("<", "&lt;"),
+    (">", "&gt;"),
+    ('"', "&quot;"),
+    ("'", "&#39;"),
+)
+
+
+def _html_escape(value: Any) -> Any:
+    for char, entity in _HTML_ESCAPES:
+        value = func.replace(value, char, entity)
+    return value
+
+
+def _chat_upsert(rows: list[dict[str, Any]]) -> Insert:
+    """Insert chats or move their last-message pointer forward on uq_chat_pair."""
+    upsert = pg_insert(ChatModel).values(rows)
+    newer = or_(
+        ChatModel.last_message_at.is_(None),
+        upsert.excluded.last_message_at >= ChatModel.last_message_at,
+    )
+    return upsert.on_conflict_do_update(
+        constraint="uq_chat_pair",
+        set_={
+            "last_message_at": case(
+                (newer, upsert.excluded.last_message_at),
+                else_=ChatModel.last_message_at,
+            ),
+            "last_message_id": case(
+                (newer, upsert.excluded.last_message_id),
+                else_=ChatModel.last_message_id,
+            ),
+            "last_message_preview": case(
+                (newer, upsert.excluded.last_message_preview),
+                else_=ChatModel.last_message_preview,
+            ),
+            "last_message_sender_id": case(
+                (newer, upsert.excluded.last_message_sender_id),
+                else_=ChatModel.last_message_sender_id,
+            ),
+        },
+    )
+
+
+def _member_upsert(upsert: Insert) -> Insert:
+    """Move members' inbox position forward and add their new unread messages."""
+    return upsert.on_conflict_do_update(
+        index_elements=[ChatMember.chat_id, ChatMember.user_id],
+        set_={
+            "last_message_at": func.greatest(
+                ChatMember.last_message_at, upsert.excluded.last_message_at
+            ),
+            "unread": ChatMember.unread + upsert.excluded.unread,
+        },
+    )
+
 
 @dataclass
 class ChatRepository:
@@ -25,6 +113,18 @@ class ChatRepository:
         db_chat = self.db.query(ChatModel).filter_by(id=chat_id).first()
         return db_chat.to_object() if db_chat else None
 
+    def peer_ids(self, user_id: UUID, among: list[UUID]) -> set[UUID]:
+        """The users in ``among`` that share a chat with ``user_id``."""
+        pairs = {self._normalize_pair(user_id, p) for p in among if p != user_id}
+        if not pairs:
+            return set()
+        rows = self.db.execute(
+            select(ChatModel.user_a_id, ChatModel.user_b_id).where(
+                tuple_(ChatModel.user_a_id, ChatModel.user_b_id).in_(pairs)
+            )
+        )
+        return {b if a == user_id else a for a, b in rows}
+
     def get_by_pair(self, user_id: UUID, peer_id: UUID) -> DomainChat | None:
         a, b = self._normalize_pair(user_id, peer_id)
         db_chat = (
@@ -46,10 +146,180 @@ class ChatRepository:
 
         db_chat = ChatModel(user_a_id=a, user_b_id=b)
         self.db.add(db_chat)
+        self.db.flush()
+        # a self-chat has a single member
+        self.db.add_all([ChatMember(db_chat.id, m) for m in dict.fromkeys((a, b))])
         self.db.commit()
         self.db.refresh(db_chat)
         return db_chat.to_object()
 
+    def append_message(
+        self, sender_id: UUID, peer_id: UUID, body: str
+    ) -> DomainMessage:
+        """Upsert the chat, insert the message and move the last-message pointer.
+
+        Runs as one statement: the chat upsert is a data-modifying CTE whose
+        RETURNING id feeds both the message insert and the upsert of the two
+        chat_members rows, followed by a single commit.
+        """
+        a, b = self._normalize_pair(sender_id, peer_id)
+        message_id = uuid4()
+        created_at = datetime.utcnow()
+
+        chat = (
+            _chat_upsert(
+                [
+                    {
+                        "id": uuid4(),
+                        "user_a_id": a,
+                        "user_b_id": b,
+                        "last_message_at": created_at,
+                        "last_message_id": message_id,
+                        "last_message_preview": body[:PREVIEW_LENGTH],
+                        "last_message_sender_id": sender_id,
+                    }
+                ]
+            )
+            .returning(ChatModel.id)
+            .cte("chat")
+        )
+        members = _member_upsert(
+            pg_insert(ChatMember).from_select(
+                ["chat_id", "user_id", "last_message_at", "unread"],
+                union_all(
+                    *(
+                        select(
+                            chat.c.id,
+                            literal(member_id),
+                            literal(created_at),
+                            literal(int(member_id != sender_id)),
+                        )
+                        for member_id in dict.fromkeys((a, b))
+                    )
+                ),
+                include_defaults=False,
+            )
+        ).cte("members")
+
+        stmt = (
+            insert(MessageModel)
+            .from_select(
+                ["id", "chat_id", "sender_id", "body", "created_at"],
+                select(
+                    literal(message_id),
+                    chat.c.id,
+                    literal(sender_id),
+                    literal(body),
+                    literal(created_at),
+                ),
+            )
+            .add_cte(chat, members)
+            .returning(MessageModel.chat_id)
+        )
+        try:
+            chat_id = self.db.execute(stmt).scalar_one()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return DomainMessage(
+            id=message_id,
+            chat_id=chat_id,
+            sender_id=sender_id,
+            body=body,
+            created_at=created_at,
+        )
+
+    def append_messages(self, batch: list[OutgoingMessage]) -> list[DomainMessage]:
+        """Group-commit a batch of messages spread over any number of chats.
+
+        Chats are upserted in one statement with their pointer set to the
+        newest message of the batch, the messages go in with one executemany,
+        and the batch is committed once.
+        """
+        if not batch:
+            return []
+
+        latest: dict[tuple[UUID, UUID], OutgoingMessage] = {}
+        unread: dict[tuple[UUID, UUID], int] = {}
+        for outgoing in batch:
+            pair = self._normalize_pair(outgoing.sender_id, outgoing.peer_id)
+            current = latest.get(pair)
+            if current is None or outgoing.created_at >= current.created_at:
+                latest[pair] = outgoing
+            if outgoing.peer_id != outgoing.sender_id:
+                recipient = (outgoing.peer_id, outgoing.sender_id)
+                unread[recipient] = unread.get(recipient, 0) + 1
+
+        try:
+            # Sorted pairs keep lock order stable between concurrent flushes
+            rows = self.db.execute(
+                _chat_upsert(
+                    [
+                        {
+                            "id": uuid4(),
+                            "user_a_id": a,
+                            "user_b_id": b,
+                            "last_message_at": m.created_at,
+                            "last_message_id": m.id,
+                            "last_message_preview": m.body[:PREVIEW_LENGTH],
+                            "last_message_sender_id": m.sender_id,
+                        }
+                        for (a, b), m in sorted(
+                            latest.items(), key=lambda item: str(item[0])
+                        )
+                    ]
+                ).returning(ChatModel.id, ChatModel.user_a_id, ChatModel.user_b_id)
+            )
+            chat_ids = {(row.user_a_id, row.user_b_id): row.id for row in rows}
+
+            messages = [
+                DomainMessage(
+                    id=m.id,
+                    chat_id=chat_ids[self._normalize_pair(m.sender_id, m.peer_id)],
+                    sender_id=m.sender_id,
+                    body=m.body,
+                    created_at=m.created_at,
+                )
+                for m in batch
+            ]
+            self.db.execute(
+                insert(MessageModel),
+                [
+                    {
+                        "id": m.id,
+                        "chat_id": m.chat_id,
+                        "sender_id": m.sender_id,
+                        "body": m.body,
+                        "created_at": m.created_at,
+                    }
+                    for m in messages
+                ],
+            )
+            self.db.execute(
+                _member_upsert(
+                    pg_insert(ChatMember).values(
+                        [
+                            {
+                                "chat_id": chat_ids[pair],
+                                "user_id": member_id,
+                                "last_message_at": m.created_at,
+                                "unread": unread.get((member_id, other_id), 0),
+                            }
+                            for pair, m in sorted(
+                                latest.items(), key=lambda item: str(item[0])
+                            )
+                            for member_id, other_id in dict.fromkeys((pair, pair[::-1]))
+                        ]
+                    )
+                )
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return messages
+
     def update_last_message(
         self, chat_id: UUID, message_id: UUID, created_at: datetime
     ) -> None:
@@ -61,78 +331,55 @@ class ChatRepository:
         self.db.commit()
         self.db.refresh(chat)
 
+    def total_unread(self, user_id: UUID) -> int:
+        total = self.db.execute(
+            select(func.coalesce(func.sum(ChatMember.unread), 0)).where(
+                ChatMember.user_id == user_id, ChatMember.muted.is_(False)
+            )
+        ).scalar_one()
+        return int(total)
+
     def list_for_user(
-        self, user_id: UUID, limit: int, before: datetime | None = None
-    ) -> list[ChatSummary]:
-        q = self.db.query(ChatModel).filter(
-            or_(ChatModel.user_a_id == user_id, ChatModel.user_b_id == user_id)
+        self,
+        user_id: UUID,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> InboxPage:
+        """Keyset page of the user's chats that have messages, newest first."""
+        stmt = (
+            select(ChatMember, ChatModel)
+            .join(ChatModel, ChatModel.id == ChatMember.chat_id)
+            .where(
+                ChatMember.user_id == user_id,
+                ChatMember.last_message_at.is_not(None),
+            )
         )
-
-        if before:
-            q = q.filter(
-                or_(
-                    ChatModel.last_message_at == None,  # noqa: E711
-                    ChatModel.last_message_at < before,
-                )
+        if after:
+            stmt = stmt.where(
+                tuple_(ChatMember.last_message_at, ChatMember.chat_id)
+                < tuple_(literal(after[0]), literal(after[1]))
             )
+        rows: Sequence[Any] = self.db.execute(
+            stmt.order_by(
+                ChatMember.last_message_at.desc(), ChatMember.chat_id.desc()
+            ).limit(limit + 1)
+        ).all()
 
-        q = q.order_by(ChatModel.last_message_at.desc().nullslast()).limit(limit)
-        chats: Sequence[ChatModel] = q.all()
-
-        chat_ids = [c.id for c in chats]
-        if not chat_ids:
-            return []
-
-        unread_q = (
-            self.db.query(
-                MessageModel.chat_id,
-                func.count(MessageModel.id).label("cnt"),
-            )
-            .filter(MessageModel.chat_id.in_(chat_ids))
-            .filter(MessageModel.sender_id != user_id)
-            .filter(
-                or_(
-                    and_(
-                        ChatModel.user_a_id == user_id,
-                        MessageModel.seen_at_user_a.is_(None),
-                    ),
-                    and_(
-                        ChatModel.user_b_id == user_id,
-                        MessageModel.seen_at_user_b.is_(None),
-                    ),
-                )
+        page, more = rows[:limit], len(rows) > limit
+        summaries = [
+            ChatSummary(
+                chat=chat.to_object(),
+                peer_id=chat.user_b_id if chat.user_a_id == user_id else chat.user_a_id,
+                unread_count=member.unread,
+                last_body=chat.last_message_preview,
+                muted=member.muted,
             )
-            .join(ChatModel, ChatModel.id == MessageModel.chat_id)
-            .group_by(MessageModel.chat_id)
-            .all()
+            for member, chat in page
+        ]
+        next_cursor = (
+            (page[-1][0].last_message_at, page[-1][0].chat_id) if more else None
         )
-        unread_map: dict[UUID, int] = {row.chat_id: row.cnt for row in unread_q}
-
-        last_ids = [c.last_message_id for c in chats if c.last_message_id]
-        last_bodies: dict[UUID, str] = {}
-        if last_ids:
-            rows = (
-                self.db.query(MessageModel.id, MessageModel.body)
-                .filter(MessageModel.id.in_(last_ids))
-                .all()
-            )
-            last_bodies = {r.id: r.body for r in rows}
-
-        summaries: list[ChatSummary] = []
-        for c in chats:
-            peer_id = c.user_b_id if c.user_a_id == user_id else c.user_a_id
-            last_body = (
-                last_bodies.get(c.last_message_id) if c.last_message_id else None
-            )
-            summaries.append(
-                ChatSummary(
-                    chat=c.to_object(),
-                    peer_id=peer_id,
-                    unread_count=unread_map.get(c.id, 0),
-                    last_body=last_body,
-                )
-            )
-        return summaries
+        return InboxPage(chats=summaries, next_cursor=next_cursor)
 
 
 @dataclass
@@ -147,62 +394,276 @@ class MessageRepository:
         return db_msg.to_object()
 
     def list_by_chat(
-        self, chat_id: UUID, limit: int, before: datetime | None = None
-    ) -> list[DomainMessage]:
-        q = self.db.query(MessageModel).filter(MessageModel.chat_id == chat_id)
-        if before:
-            q = q.filter(MessageModel.created_at < before)
-        q = q.order_by(MessageModel.created_at.desc()).limit(limit)
-        rows = q.all()
-        return [m.to_object() for m in rows][::-1]
+        self,
+        chat_id: UUID,
+        limit: int,
+        before: tuple[datetime, UUID] | None = None,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> MessagePage:
+        """Keyset page on (created_at, id), served from ix_messages_chat_created.
 
-    def mark_seen_for_user(
-        self, chat_id: UUID, user_id: UUID, up_to: datetime | None = None
-    ) -> int:
-        chat = self.db.query(ChatModel).filter_by(id=chat_id).first()
-        if not chat:
-            raise DoesNotExistError("Chat not found.")
+        Pages backwards from ``before`` (or the newest message), or forwards
+        from ``after`` to catch up after a reconnect. Rows are read as plain
+        tuples rather than ORM objects.
+        """
+        key = tuple_(MessageModel.created_at, MessageModel.id)
+        stmt = select(
+            MessageModel.id,
+            MessageModel.chat_id,
+            MessageModel.sender_id,
+            MessageModel.body,
+            MessageModel.created_at,
+        ).where(MessageModel.chat_id == chat_id)
 
-        is_a = chat.user_a_id == user_id
-        is_b = chat.user_b_id == user_id
-        if not (is_a or is_b):
-            raise DoesNotExistError("User not in chat.")
+        if after:
+            stmt = stmt.where(key > tuple_(literal(after[0]), literal(after[1])))
+            stmt = stmt.order_by(MessageModel.created_at, MessageModel.id)
+        else:
+            if before:
+                stmt = stmt.where(key < tuple_(literal(before[0]), literal(before[1])))
+            stmt = stmt.order_by(MessageModel.created_at.desc(), MessageModel.id.desc())
 
-        q = self.db.query(MessageModel).filter(
-            MessageModel.chat_id == chat_id,
-            MessageModel.sender_id != user_id,
+        rows = self.db.execute(stmt.limit(limit + 1)).all()
+        more = len(rows) > limit
+        messages = [
+            DomainMessage(
+                id=row.id,
+                chat_id=row.chat_id,
+                sender_id=row.sender_id,
+                body=row.body,
+                created_at=row.created_at,
+            )
+            for row in rows[:limit]
+        ]
+        if not after:
+            messages.reverse()
+        if not messages:
+            return MessagePage(messages=[])
+
+        self._apply_read_marks(chat_id, messages)
+        edge = messages[-1] if after else messages[0]
+        next_cursor = (edge.created_at, edge.id) if more else None
+        return MessagePage(messages=messages, next_cursor=next_cursor)
+
+    def stream_by_chat(
+        self,
+        chat_id: UUID,
+        after: tuple[datetime, UUID] | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[list[DomainMessage]]:
+        """The chat's history oldest first, in batches from a server-side cursor.
+
+        The cursor lives in the session's transaction until the iterator is
+        exhausted or closed, so give it a session of its own: a commit made
+        elsewhere on the session would close it mid-stream.
+        """
+        stmt = (
+            select(
+                MessageModel.id,
+                MessageModel.chat_id,
+                MessageModel.sender_id,
+                MessageModel.body,
+                MessageModel.created_at,
+            )
+            .where(MessageModel.chat_id == chat_id)
+            .order_by(MessageModel.created_at, MessageModel.id)
         )
-        if up_to:
-            q = q.filter(MessageModel.created_at <= up_to)
+        if after:
+            key = tuple_(MessageModel.created_at, MessageModel.id)
+            stmt = stmt.where(key > tuple_(literal(after[0]), literal(after[1])))
 
-        now = datetime.utcnow()
-        if is_a:
-            updated = q.filter(MessageModel.seen_at_user_a.is_(None)).update(
-                {MessageModel.seen_at_user_a: now}, synchronize_session=False
+        result = self.db.execute(stmt.execution_options(yield_per=batch_size))
+        try:
+            for rows in result.partitions():
+                yield [
+                    DomainMessage(
+                        id=row.id,
+                        chat_id=row.chat_id,
+                        sender_id=row.sender_id,
+                        body=row.body,
+                        created_at=row.created_at,
+                    )
+                    for row in rows
+                ]
+        finally:
+            result.close()
+
+    def search(
+        self,
+        user_id: UUID,
+        query: str,
+        limit: int,
+        chat_id: UUID | None = None,
+        after: tuple[float, datetime, UUID] | None = None,
+    ) -> MessageSearchPage:
+        """Full-text search over the chats ``user_id`` is a member of.
+
+        Matches come from the GIN index on ``search_vector``; ``query`` takes
+        web search syntax (quoted phrases, ``or``, ``-word``). Pages are keyed
+        on (rank, created_at, id), and snippets are only built for the page
+        being returned. Snippets are HTML: the body is escaped and matches are
+        wrapped in ``<mark>``.
+        """
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        rank = func.ts_rank(MessageModel.search_vector, ts_query).cast(Double)
+        stmt = (
+            select(
+                MessageModel.id,
+                MessageModel.chat_id,
+                MessageModel.sender_id,
+                MessageModel.body,
+                MessageModel.created_at,
+                rank.label("rank"),
             )
-        else:
-            updated = q.filter(MessageModel.seen_at_user_b.is_(None)).update(
-                {MessageModel.seen_at_user_b: now}, synchronize_session=False
+            .join(
+                ChatMember,
+                (ChatMember.chat_id == MessageModel.chat_id)
+                & (ChatMember.user_id == user_id),
             )
+            .where(MessageModel.search_vector.op("@@")(ts_query))
+        )
+        if chat_id:
+            stmt = stmt.where(MessageModel.chat_id == chat_id)
+        if after:
+            stmt = stmt.where(
+                tuple_(rank, MessageModel.created_at, MessageModel.id)
+                < tuple_(
+                    literal(after[0], Double), literal(after[1]), literal(after[2])
+                )
+            )
+        page = (
+            stmt.order_by(
+                rank.desc(), MessageModel.created_at.desc(), MessageModel.id.desc()
+            )
+            .limit(limit + 1)
+            .subquery()
+        )
 
-        self.db.commit()
-        return int(updated)
+        rows = self.db.execute(
+            select(
+                page,
+                func.ts_headline(
+                    SEARCH_CONFIG, _html_escape(page.c.body), ts_query, HEADLINE_OPTIONS
+                ).label("snippet"),
+            ).order_by(page.c.rank.desc(), page.c.created_at.desc(), page.c.id.desc())
+        ).all()
 
-    def unread_count(self, chat_id: UUID, user_id: UUID) -> int:
-        chat = self.db.query(ChatModel).filter_by(id=chat_id).first()
+        hits = [
+            MessageHit(
+                message=DomainMessage(
+                    id=row.id,
+                    chat_id=row.chat_id,
+                    sender_id=row.sender_id,
+                    body=row.body,
+                    created_at=row.created_at,
+                ),
+                rank=row.rank,
+                snippet=row.snippet,
+            )
+            for row in rows[:limit]
+        ]
+        if len(rows) <= limit:
+            return MessageSearchPage(hits=hits)
+        last = hits[-1]
+        return MessageSearchPage(
+            hits=hits,
+            next_cursor=(last.rank, last.message.created_at, last.message.id),
+        )
+
+    def _apply_read_marks(self, chat_id: UUID, messages: list[DomainMessage]) -> None:
+        """Derive per-message seen_at from both members' read watermarks."""
+        chat = self.db.get(ChatModel, chat_id)
         if not chat:
+            return
+        members = {
+            m.user_id: m
+            for m in self.db.scalars(
+                select(ChatMember).where(ChatMember.chat_id == chat_id)
+            )
+        }
+
+        def seen_at(message: DomainMessage, user_id: UUID) -> datetime | None:
+            member = members.get(user_id)
+            if (
+                member is None
+                or message.sender_id == user_id
+                or member.last_read_message_at is None
+                or member.last_read_message_id is None
+            ):
+                return None
+            mark = (member.last_read_message_at, member.last_read_message_id)
+            return member.read_at if (message.created_at, message.id) <= mark else None
+
+        for message in messages:
+            message.seen_at_user_a = seen_at(message, chat.user_a_id)
+            message.seen_at_user_b = seen_at(message, chat.user_b_id)
+
+    def mark_seen_for_user(
+        self,
+        chat_id: UUID,
+        user_id: UUID,
+        up_to: tuple[datetime, UUID] | None = None,
+    ) -> ReadReceipt | None:
+        """Move the user's read watermark forward to ``up_to`` or the newest message.
+
+        Touches only the member row, however many messages become read.
+        Returns None when the watermark is already at or past the target.
+        """
+        member = self.db.get(
+            ChatMember, (chat_id, user_id), with_for_update=True, populate_existing=True
+        )
+        if not member:
             raise DoesNotExistError("Chat not found.")
-        is_a = chat.user_a_id == user_id
-        is_b = chat.user_b_id == user_id
-        if not (is_a or is_b):
-            raise DoesNotExistError("User not in chat.")
 
-        q = self.db.query(func.count(MessageModel.id)).filter(
-            MessageModel.chat_id == chat_id,
-            MessageModel.sender_id != user_id,
+        # read after the member lock so committed appends are visible
+        chat = self.db.get(ChatModel, chat_id, populate_existing=True)
+        if not chat or chat.last_message_at is None or chat.last_message_id is None:
+            self.db.commit()  # release the member lock
+            return None
+
+        latest = (chat.last_message_at, chat.last_message_id)
+        mark = min(up_to, latest) if up_to else latest
+        if (
+            member.last_read_message_at is not None
+            and member.last_read_message_id is not None
+            and (member.last_read_message_at, member.last_read_message_id) >= mark
+        ):
+            self.db.commit()  # release the member lock
+            return None
+
+        unread = 0
+        if mark != latest:
+            unread = (
+                self.db.scalar(
+                    select(func.count())
+                    .select_from(MessageModel)
+                    .where(
+                        MessageModel.chat_id == chat_id,
+                        MessageModel.sender_id != user_id,
+                        tuple_(MessageModel.created_at, MessageModel.id)
+                        > tuple_(literal(mark[0]), literal(mark[1])),
+                    )
+                )
+                or 0
+            )
+
+        receipt = ReadReceipt(
+            chat_id=chat_id,
+            user_id=user_id,
+            peer_id=chat.user_b_id if chat.user_a_id == user_id else chat.user_a_id,
+            last_read_message_id=mark[1],
+            last_read_message_at=mark[0],
+            read_at=datetime.utcnow(),
+            updated=max(member.unread - unread, 0),
         )
-        if is_a:
-            q = q.filter(MessageModel.seen_at_user_a.is_(None))
-        else:
-            q = q.filter(MessageModel.seen_at_user_b.is_(None))
-        return int(q.scalar() or 0)
+        member.last_read_message_at, member.last_read_message_id = mark
+        member.read_at = receipt.read_at
+        member.unread = unread
+        self.db.commit()
+        return receipt
+
+    def unread_count(self, chat_id: UUID, user_id: UUID) -> int:
+        member = self.db.get(ChatMember, (chat_id, user_id))
+        if not member:
+            raise DoesNotExistError("User not in chat.")
+        return member.unread
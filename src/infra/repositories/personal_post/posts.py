@@ -8,6 +8,7 @@ from src.core.errors import DoesNotExistError
 from src.core.personal_post.posts import Post, Privacy
 from src.infra.models.personal_post.media import PersonalMedia as MediaModel
 from src.infra.models.personal_post.post import PersonalPost as PostModel
+from src.infra.repositories.counters import bump_counters
 
 
 @dataclass
@@ -27,6 +28,7 @@ class PostRepository:
             MediaModel(post_id=db_post.id, url=m.url, media_type=m.media_type.value)
             for m in post.media
         ]
+        bump_counters(self.db, post.user_id, posts=1)
         self.db.commit()
         self.db.refresh(db_post)
         return db_post.to_object()
@@ -101,4 +103,5 @@ class PostRepository:
         if not post:
             raise DoesNotExistError("Post not found.")
         self.db.delete(post)
+        bump_counters(self.db, post.user_id, posts=-1)
         self.db.commit()
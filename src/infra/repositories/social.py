@@ -1,11 +1,55 @@
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from uuid import UUID
+from typing import Any
+from uuid import UUID, uuid4
 
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    Select,
+    delete,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import InstrumentedAttribute, Session, aliased
 
+from src.core.social import FriendStatus, UserPage
 from src.infra.models.follow import Follow
 from src.infra.models.friend import Friend, FriendRequest, SuggestionSkip
+from src.infra.models.user import User as UserModel
+from src.infra.repositories.counters import bump_counters
+from src.infra.repositories.users import USER_CARD_COLUMNS, user_from_card
+
+_STATUS_RANK = {
+    FriendStatus.FRIENDS: 0,
+    FriendStatus.PENDING_OUTGOING: 1,
+    FriendStatus.PENDING_INCOMING: 2,
+}
+
+
+def _page_of_users(
+    db: Session,
+    stmt: Select[Any],
+    created_at: InstrumentedAttribute[datetime],
+    edge_id: InstrumentedAttribute[UUID],
+    limit: int,
+    after: tuple[datetime, UUID] | None,
+) -> UserPage:
+    if after:
+        cursor = tuple_(literal(after[0]), literal(after[1]))
+        stmt = stmt.where(tuple_(created_at, edge_id) < cursor)
+    stmt = stmt.order_by(created_at.desc(), edge_id.desc()).limit(limit + 1)
+    rows = db.execute(stmt).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1].edge_created_at, rows[-1].edge_id)
+    return UserPage(users=[user_from_card(r) for r in rows], next_cursor=next_cursor)
 
 
 @dataclass
@@ -21,14 +65,55 @@ class FollowRepository:
 
     def follow(self, follower_id: UUID, following_id: UUID) -> None:
         self.db.add(Follow(follower_id=follower_id, following_id=following_id))
+        bump_counters(self.db, follower_id, following=1)
+        bump_counters(self.db, following_id, followers=1)
         self.db.commit()
 
     def unfollow(self, follower_id: UUID, following_id: UUID) -> None:
-        self.db.query(Follow).filter_by(
-            follower_id=follower_id, following_id=following_id
-        ).delete()
+        deleted = (
+            self.db.query(Follow)
+            .filter_by(follower_id=follower_id, following_id=following_id)
+            .delete()
+        )
+        if deleted:
+            bump_counters(self.db, follower_id, following=-1)
+            bump_counters(self.db, following_id, followers=-1)
         self.db.commit()
 
+    def list_followers(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> UserPage:
+        stmt = (
+            select(
+                *USER_CARD_COLUMNS,
+                Follow.created_at.label("edge_created_at"),
+                Follow.id.label("edge_id"),
+            )
+            .join(UserModel, UserModel.id == Follow.follower_id)
+            .where(Follow.following_id == user_id)
+        )
+        return _page_of_users(self.db, stmt, Follow.created_at, Follow.id, limit, after)
+
+    def list_following(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> UserPage:
+        stmt = (
+            select(
+                *USER_CARD_COLUMNS,
+                Follow.created_at.label("edge_created_at"),
+                Follow.id.label("edge_id"),
+            )
+            .join(UserModel, UserModel.id == Follow.following_id)
+            .where(Follow.follower_id == user_id)
+        )
+        return _page_of_users(self.db, stmt, Follow.created_at, Follow.id, limit, after)
+
     def get_followers(self, user_id: UUID) -> list[UUID]:
         return [
             follow.follower_id
@@ -41,6 +126,16 @@ class FollowRepository:
             for follow in self.db.query(Follow).filter_by(follower_id=user_id).all()
         ]
 
+    def get_following_among(self, user_id: UUID, other_ids: list[UUID]) -> set[UUID]:
+        if not other_ids:
+            return set()
+        rows = self.db.execute(
+            select(Follow.following_id).where(
+                Follow.follower_id == user_id, Follow.following_id.in_(other_ids)
+            )
+        )
+        return set(rows.scalars())
+
 
 @dataclass
 class FriendRepository:
@@ -83,6 +178,8 @@ class FriendRepository:
 
         self.db.add(Friend(user_id=from_user_id, friend_id=to_user_id))
         self.db.add(Friend(user_id=to_user_id, friend_id=from_user_id))
+        bump_counters(self.db, from_user_id, friends=1)
+        bump_counters(self.db, to_user_id, friends=1)
 
         self.db.commit()
 
@@ -106,6 +203,122 @@ class FriendRepository:
             for friend in self.db.query(Friend).filter_by(user_id=user_id).all()
         ]
 
+    def list_friends(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> UserPage:
+        stmt = (
+            select(
+                *USER_CARD_COLUMNS,
+                Friend.created_at.label("edge_created_at"),
+                Friend.id.label("edge_id"),
+            )
+            .join(UserModel, UserModel.id == Friend.friend_id)
+            .where(Friend.user_id == user_id)
+        )
+        return _page_of_users(self.db, stmt, Friend.created_at, Friend.id, limit, after)
+
+    def get_suggestion_candidates(
+        self, user_id: UUID, limit: int | None
+    ) -> dict[UUID, int]:
+        """Friends of friends not yet related to the user, with mutual counts.
+
+        Existing friends, pending requests in either direction and unexpired
+        suggestion skips are excluded in SQL through anti-joins. ``limit``
+        keeps the candidates with the most mutual friends; ``None`` keeps all.
+        """
+        mine = aliased(Friend)
+        theirs = aliased(Friend)
+        candidate = theirs.friend_id
+
+        already_friends = exists().where(
+            Friend.user_id == user_id, Friend.friend_id == candidate
+        )
+        requested = exists().where(
+            or_(
+                (FriendRequest.from_user_id == user_id)
+                & (FriendRequest.to_user_id == candidate),
+                (FriendRequest.from_user_id == candidate)
+                & (FriendRequest.to_user_id == user_id),
+            )
+        )
+        skipped = exists().where(
+            SuggestionSkip.user_id == user_id,
+            SuggestionSkip.target_user_id == candidate,
+            or_(
+                SuggestionSkip.expires_at.is_(None),
+                SuggestionSkip.expires_at > datetime.now(),
+            ),
+        )
+
+        mutuals = func.count().label("mutuals")
+        rows = self.db.execute(
+            select(candidate, mutuals)
+            .join(mine, mine.friend_id == theirs.user_id)
+            .where(
+                mine.user_id == user_id,
+                candidate != user_id,
+                ~already_friends,
+                ~requested,
+                ~skipped,
+            )
+            .group_by(candidate)
+            .order_by(mutuals.desc(), candidate)
+            .limit(limit)
+        )
+        return {candidate_id: int(count) for candidate_id, count in rows}
+
+    def get_friend_statuses(
+        self, user_id: UUID, other_ids: list[UUID]
+    ) -> dict[UUID, FriendStatus]:
+        if not other_ids:
+            return {}
+
+        friends = select(
+            Friend.friend_id.label("other_id"),
+            literal(FriendStatus.FRIENDS.value).label("status"),
+        ).where(Friend.user_id == user_id, Friend.friend_id.in_(other_ids))
+        outgoing = select(
+            FriendRequest.to_user_id.label("other_id"),
+            literal(FriendStatus.PENDING_OUTGOING.value).label("status"),
+        ).where(
+            FriendRequest.from_user_id == user_id,
+            FriendRequest.to_user_id.in_(other_ids),
+        )
+        incoming = select(
+            FriendRequest.from_user_id.label("other_id"),
+            literal(FriendStatus.PENDING_INCOMING.value).label("status"),
+        ).where(
+            FriendRequest.to_user_id == user_id,
+            FriendRequest.from_user_id.in_(other_ids),
+        )
+
+        statuses: dict[UUID, FriendStatus] = {}
+        for other_id, raw in self.db.execute(union_all(friends, outgoing, incoming)):
+            status = FriendStatus(raw)
+            current = statuses.get(other_id)
+            if current is None or _STATUS_RANK[status] < _STATUS_RANK[current]:
+                statuses[other_id] = status
+        return statuses
+
+    def get_mutual_friend_counts(
+        self, user_id: UUID, other_ids: list[UUID]
+    ) -> dict[UUID, int]:
+        if not other_ids:
+            return {}
+
+        mine = aliased(Friend)
+        theirs = aliased(Friend)
+        rows = self.db.execute(
+            select(theirs.user_id, func.count())
+            .join(mine, mine.friend_id == theirs.friend_id)
+            .where(mine.user_id == user_id, theirs.user_id.in_(other_ids))
+            .group_by(theirs.user_id)
+        )
+        return {other_id: int(count) for other_id, count in rows}
+
 
 @dataclass
 class SuggestionSkipRepository:
@@ -135,15 +348,94 @@ class SuggestionSkipRepository:
             )
         self.db.commit()
 
-    def get_skipped_ids(self, user_id: UUID) -> set[UUID]:
+    def skip_many(
+        self, user_id: UUID, target_ids: list[UUID], *, ttl_days: int | None = None
+    ) -> int:
+        """Skip every target that is still a valid suggestion, in one upsert.
+
+        Targets that no longer exist, or that the user already follows, is
+        friends with or has a pending request with, are dropped by a single
+        existence query before the batch is written.
+        """
+        if not target_ids:
+            return 0
+
+        candidate = UserModel.id
+        valid_ids = list(
+            self.db.execute(
+                select(candidate).where(
+                    candidate.in_(set(target_ids)),
+                    candidate != user_id,
+                    ~exists().where(
+                        Follow.follower_id == user_id, Follow.following_id == candidate
+                    ),
+                    ~exists().where(
+                        Friend.user_id == user_id, Friend.friend_id == candidate
+                    ),
+                    ~exists().where(
+                        or_(
+                            (FriendRequest.from_user_id == user_id)
+                            & (FriendRequest.to_user_id == candidate),
+                            (FriendRequest.from_user_id == candidate)
+                            & (FriendRequest.to_user_id == user_id),
+                        )
+                    ),
+                )
+            ).scalars()
+        )
+        if not valid_ids:
+            return 0
+
         now = datetime.now()
-        rows = (
-            self.db.query(SuggestionSkip.target_user_id, SuggestionSkip.expires_at)
-            .filter(SuggestionSkip.user_id == user_id)
-            .all()
+        expires_at = now + timedelta(days=ttl_days or 90)
+        stmt = insert(SuggestionSkip).values(
+            [
+                {
+                    "id": uuid4(),
+                    "user_id": user_id,
+                    "target_user_id": target_id,
+                    "skipped_at": now,
+                    "expires_at": expires_at,
+                }
+                for target_id in valid_ids
+            ]
         )
-        return {
-            target_id
-            for (target_id, expires_at) in rows
-            if (expires_at is None or expires_at > now)
-        }
+        self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[SuggestionSkip.user_id, SuggestionSkip.target_user_id],
+                set_={
+                    "skipped_at": stmt.excluded.skipped_at,
+                    "expires_at": stmt.excluded.expires_at,
+                },
+            )
+        )
+        self.db.commit()
+        return len(valid_ids)
+
+    def get_skipped_ids(self, user_id: UUID) -> set[UUID]:
+        rows = self.db.execute(
+            select(SuggestionSkip.target_user_id).where(
+                SuggestionSkip.user_id == user_id,
+                or_(
+                    SuggestionSkip.expires_at.is_(None),
+                    SuggestionSkip.expires_at > datetime.now(),
+                ),
+            )
+        )
+        return set(rows.scalars())
+
+    def purge_expired(self, batch_size: int = 5000) -> int:
+        purged = 0
+        while True:
+            expired = (
+                select(SuggestionSkip.id)
+                .where(SuggestionSkip.expires_at <= datetime.now())
+                .limit(batch_size)
+            )
+            result = self.db.execute(
+                delete(SuggestionSkip).where(SuggestionSkip.id.in_(expired))
+            )
+            self.db.commit()
+            purged += int(result.rowcount)
+            if result.rowcount < batch_size:
+                return purged
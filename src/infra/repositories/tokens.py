@@ -2,9 +2,13 @@ from dataclasses import dataclass
 from datetime import datetime
 from uuid import UUID
 
+import redis
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
+from src.core.tokens import TokenRepository as TokenStore
 from src.infra.models.token import Token
+from src.runner.config import settings
 
 
 @dataclass
@@ -22,3 +26,79 @@ class TokenRepository:
     def delete(self, jti: UUID) -> None:
         self.db.query(Token).filter_by(jti=jti).delete()
         self.db.commit()
+
+    def consume(self, jti: UUID) -> bool:
+        result = self.db.execute(
+            delete(Token)
+            .where(Token.jti == jti, Token.expires_at > datetime.now())
+            .returning(Token.jti)
+        )
+        self.db.commit()
+        return result.first() is not None
+
+    def purge_expired(self, batch_size: int = 5000) -> int:
+        purged = 0
+        while True:
+            expired = (
+                select(Token.jti)
+                .where(Token.expires_at <= datetime.now())
+                .limit(batch_size)
+            )
+            result = self.db.execute(delete(Token).where(Token.jti.in_(expired)))
+            self.db.commit()
+            purged += int(result.rowcount)
+            if result.rowcount < batch_size:
+                return purged
+
+
+class RedisTokenRepository:
+    """Refresh tokens as Redis keys that expire with the token itself.
+
+    ``fallback`` is the Postgres store: tokens issued before the switch are
+    still found and consumed there, so turning Redis on logs nobody out, and
+    the table drains as those tokens are rotated or expire.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        fallback: TokenStore | None = None,
+        namespace: str = "swipe:rt",
+        *,
+        client: redis.Redis | None = None,
+    ) -> None:
+        self._redis = client if client is not None else redis.Redis.from_url(redis_url)
+        self._fallback = fallback
+        self._namespace = namespace
+
+    def save(self, jti: UUID, user_id: UUID, expires_at: datetime) -> None:
+        ttl_ms = int((expires_at - datetime.now()).total_seconds() * 1000)
+        if ttl_ms <= 0:
+            # stored nowhere, it could never be redeemed
+            raise ValueError("Refresh token expires before it is saved.")
+        self._redis.set(self._key(jti), str(user_id), px=ttl_ms)
+
+    def exists(self, jti: UUID) -> bool:
+        if self._redis.exists(self._key(jti)):
+            return True
+        return self._fallback is not None and self._fallback.exists(jti)
+
+    def delete(self, jti: UUID) -> None:
+        self._redis.delete(self._key(jti))
+        if self._fallback is not None:
+            self._fallback.delete(jti)
+
+    def consume(self, jti: UUID) -> bool:
+        if self._redis.getdel(self._key(jti)) is not None:
+            return True
+        return self._fallback is not None and self._fallback.consume(jti)
+
+    def _key(self, jti: UUID) -> str:
+        return f"{self._namespace}:{jti}"
+
+
+def make_token_repository(db: Session) -> TokenStore:
+    postgres = TokenRepository(db)
+    if settings.token_store == "redis":
+        return RedisTokenRepository(settings.redis_url, fallback=postgres)
+    return postgres
@@ -2,19 +2,41 @@ from dataclasses import dataclass
 from typing import Any
 from uuid import UUID
 
-import bcrypt
-from sqlalchemy import func, or_, select
+from sqlalchemy import Row, func, or_, select
 from sqlalchemy.orm import Session
 
 from src.core.errors import DoesNotExistError, ExistsError
 from src.core.users import User
 from src.infra.models.user import User as UserModel
 from src.infra.models.user import User as UserORM
+from src.infra.services.passwords import PasswordHasher, password_hasher
+
+# Columns shown in user listings; credentials are never part of the projection.
+USER_CARD_COLUMNS = (
+    UserModel.id,
+    UserModel.username,
+    UserModel.display_name,
+    UserModel.bio,
+    UserModel.profile_pic,
+)
+
+
+def user_from_card(row: Row[Any]) -> User:
+    return User(
+        id=row.id,
+        mail="",
+        password="",
+        username=row.username,
+        display_name=row.display_name,
+        bio=row.bio,
+        profile_pic=row.profile_pic,
+    )
 
 
 @dataclass
 class UserRepository:
     db: Session
+    hasher: PasswordHasher = password_hasher
 
     def create(self, user: User) -> User:
         if self.db.query(UserModel).filter_by(mail=user.mail).first():
@@ -22,9 +44,7 @@ class UserRepository:
 
         db_user = UserModel(
             mail=user.mail,
-            hashed_password=bcrypt.hashpw(
-                user.password.encode(), bcrypt.gensalt()
-            ).decode(),
+            hashed_password=self.hasher.hash(user.password),
             username=user.username,
             display_name=user.display_name,
             bio=user.bio,
@@ -55,6 +75,22 @@ class UserRepository:
 
         return user.to_object()
 
+    def read_by_login(self, login: str) -> User | None:
+        """One query for the user whose username or mail is ``login``.
+
+        A username match wins should one user's username equal another's mail.
+        """
+        stmt = (
+            select(UserORM)
+            .where(or_(UserORM.username == login, UserORM.mail == login.lower()))
+            .order_by((UserORM.username == login).desc())
+            .limit(1)
+        )
+        user = self.db.scalar(stmt)
+        if not user:
+            return None
+        return user.to_object()
+
     def read_many_by_ids(self, ids: list[UUID]) -> list[User]:
         if not ids:
             return []
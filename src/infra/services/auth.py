@@ -1,14 +1,13 @@
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Any, cast
+from datetime import UTC, datetime, timedelta
+from typing import Any
 from uuid import UUID, uuid4
 
-import bcrypt
-from jose import JWTError, jwt
-
 from src.core.errors import DoesNotExistError
 from src.core.tokens import TokenRepository
 from src.core.users import User, UserRepository
+from src.infra.services.passwords import PasswordHasher, password_hasher
+from src.infra.services.token_verifier import TokenVerifier, token_verifier
 from src.runner.config import settings
 
 
@@ -16,6 +15,8 @@ from src.runner.config import settings
 class AuthService:
     users: UserRepository
     tokens: TokenRepository
+    verifier: TokenVerifier = token_verifier
+    hasher: PasswordHasher = password_hasher
 
     def create_access_token(self, user_id: str) -> str:
         payload = {
@@ -24,9 +25,7 @@ class AuthService:
             "exp": datetime.now()
             + timedelta(minutes=settings.access_token_expire_minutes),
         }
-        return str(
-            jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
-        )
+        return self.verifier.encode(payload)
 
     def create_refresh_token(self, user_id: str) -> str:
         jti = uuid4()
@@ -38,37 +37,36 @@ class AuthService:
             "exp": datetime.now() + timedelta(days=settings.reftesh_token_expire_days),
         }
         self.tokens.save(jti, UUID(user_id), expires)
-        return str(
-            jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
-        )
+        return self.verifier.encode(payload)
+
+    def create_ws_ticket(self, user_id: str) -> str:
+        """Short-lived token that opens one WebSocket without a user lookup."""
+        payload = {
+            "sub": user_id,
+            "type": "ws",
+            "exp": datetime.now(UTC)
+            + timedelta(seconds=settings.ws_ticket_ttl_seconds),
+        }
+        return self.verifier.encode(payload)
 
     def authenticate(self, unique: str, password: str) -> tuple[str, str]:
-        user = self.users.read_by(username=unique)
-        if user and bcrypt.checkpw(password.encode(), user.password.encode()):
-            return (
-                self.create_access_token(str(user.id)),
-                self.create_refresh_token(str(user.id)),
-            )
-        user = self.users.read_by(mail=unique)
-        if user and bcrypt.checkpw(password.encode(), user.password.encode()):
-            return (
-                self.create_access_token(str(user.id)),
-                self.create_refresh_token(str(user.id)),
-            )
+        user = self.users.read_by_login(unique)
+        if not user or not self.hasher.check(password, user.password):
+            raise DoesNotExistError("Invalid credentials")
 
-        raise DoesNotExistError("Invalid credentials")
+        # upgrade hashes made at an older cost while the password is at hand
+        if self.hasher.needs_rehash(user.password):
+            self.users.update(user.id, {"hashed_password": self.hasher.hash(password)})
+        return (
+            self.create_access_token(str(user.id)),
+            self.create_refresh_token(str(user.id)),
+        )
 
     def decode_token(self, token: str, expected_type: str = "access") -> dict[str, Any]:
-        try:
-            payload = cast(
-                dict[str, Any],
-                jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm]),
-            )
-            if payload.get("type") != expected_type:
-                raise JWTError("Token type mismatch")
-            return payload
-        except JWTError as err:
-            raise DoesNotExistError("Invalid or expired token") from err
+        payload = self.verifier.verify(token)
+        if payload.get("type") != expected_type:
+            raise DoesNotExistError("Invalid or expired token")
+        return payload
 
     def get_user_from_token(self, token: str) -> User:
         user_id = self.decode_token(token, expected_type="access")["sub"]
@@ -77,15 +75,20 @@ class AuthService:
             raise DoesNotExistError("User not found")
         return user
 
-    def refresh_access_token(self, refresh_token: str) -> str:
+    def refresh_access_token(self, refresh_token: str) -> tuple[str, str]:
+        """Trade a refresh token for a new access and refresh token pair.
+
+        The old refresh token is consumed atomically, so of two concurrent
+        refreshes with the same token only one succeeds.
+        """
         payload = self.decode_token(refresh_token, expected_type="refresh")
-        jti = UUID(payload["jti"])
-        if not self.tokens.exists(jti):
+        if not self.tokens.consume(UUID(payload["jti"])):
             raise DoesNotExistError("Refresh token not recognized")
 
-        self.tokens.delete(jti)
-
-        return self.create_access_token(payload["sub"])
+        return (
+            self.create_access_token(payload["sub"]),
+            self.create_refresh_token(payload["sub"]),
+        )
 
     def logout(self, refresh_token: str) -> None:
         try:
@@ -46,6 +46,9 @@ class Cache:
         payload = self._dumps(value)
         self._r.setex(self._k(key), ttl_sec, payload)
 
+    def delete(self, key: str) -> None:
+        self._r.delete(self._k(key))
+
     def clear(self) -> None:
         pattern = f"{self.namespace}:*"
         batch: list[bytes] = []
@@ -81,6 +84,9 @@ class _UserScopedCache(Cache):
     def set(self, key: str, value: Any, ttl_sec: int) -> None:
         super().set(self._user_prefix + key, value, ttl_sec)
 
+    def delete(self, key: str) -> None:
+        super().delete(self._user_prefix + key)
+
     def clear(self) -> None:
         pattern = f"{self.namespace}:{self._user_prefix}*"
         batch: list[bytes] = []
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import Literal
+from uuid import UUID
+
+from src.core.errors import OverloadedError
+from src.core.messenger import Message, OutgoingMessage
+from src.infra.services.metrics import metrics
+from src.infra.services.offload import BlockingOffload
+
+logger = logging.getLogger(__name__)
+
+AckMode = Literal["queued", "flushed"]
+_Entry = tuple[OutgoingMessage, "asyncio.Future[Message] | None"]
+
+# Chat ids remembered per pair so queued acks can be answered without the DB
+CHAT_ID_MEMORY = 10_000
+
+
+def _pair_key(u1: UUID, u2: UUID) -> tuple[UUID, UUID]:
+    return (u1, u2) if str(u1) < str(u2) else (u2, u1)
+
+
+class MessageWriteBuffer:
+    """Write-behind buffer that group-commits chat messages.
+
+    The first message after a quiet period opens a ``window_ms`` batching
+    window (skipped when ``max_batch`` messages are already waiting) and the batch
+    is written with a single commit off the event loop. Messages are written
+    in submission order within a worker.
+
+    ``ack="flushed"`` answers ``submit`` once the batch holding the message has
+    committed, so batching costs at most the window in latency. ``ack="queued"``
+    answers as soon as the message is buffered when its chat id is already
+    known, which is faster but loses buffered messages if the worker dies.
+
+    A batch that fails to commit is rolled back and its messages retried one
+    by one, so a single bad message, e.g. one to an unknown peer, fails only
+    its own sender. Queued messages that still fail are logged and dropped.
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[list[OutgoingMessage]], list[Message]],
+        offload: BlockingOffload,
+        *,
+        window_ms: int = 10,
+        max_batch: int = 200,
+        max_pending: int = 1000,
+        ack: AckMode = "flushed",
+    ) -> None:
+        self._writer = writer
+        self._offload = offload
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        self._max_pending = max_pending
+        self._ack = ack
+
+        self._pending: list[_Entry] = []
+        self._chat_ids: dict[tuple[UUID, UUID], UUID] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._flusher: asyncio.Task[None] | None = None
+        self._closed = False
+
+    async def submit(self, sender_id: UUID, peer_id: UUID, body: str) -> Message:
+        if self._closed or len(self._pending) >= self._max_pending:
+            raise OverloadedError("Message buffer is full.")
+
+        wakeup = self._ensure_flusher()
+        outgoing = OutgoingMessage(sender_id=sender_id, peer_id=peer_id, body=body)
+        chat_id = self._chat_ids.get(_pair_key(sender_id, peer_id))
+
+        if self._ack == "queued" and chat_id is not None:
+            self._pending.append((outgoing, None))
+            wakeup.set()
+            return Message(
+                id=outgoing.id,
+                chat_id=chat_id,
+                sender_id=sender_id,
+                body=body,
+                created_at=outgoing.created_at,
+            )
+
+        future: asyncio.Future[Message] = asyncio.get_running_loop().create_future()
+        self._pending.append((outgoing, future))
+        wakeup.set()
+        return await future
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._flusher is not None and self._wakeup is not None:
+            self._wakeup.set()
+            await self._flusher
+            self._flusher = None
+        await self._flush()
+
+    def _ensure_flusher(self) -> asyncio.Event:
+        if self._flusher is None or self._flusher.done() or self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._flusher = asyncio.create_task(self._run(self._wakeup))
+        return self._wakeup
+
+    async def _run(self, wakeup: asyncio.Event) -> None:
+        while True:
+            await wakeup.wait()
+            if len(self._pending) < self._max_batch:
+                await asyncio.sleep(self._window)
+            wakeup.clear()
+            await self._flush()
+            if self._closed:
+                return
+
+    async def _flush(self) -> None:
+        while self._pending:
+            batch = self._pending[: self._max_batch]
+            del self._pending[: self._max_batch]
+
+            if len(batch) == 1:
+                await self._write_one(batch[0])
+                continue
+            try:
+                written = await self._offload.run(
+                    self._writer, [outgoing for outgoing, _ in batch]
+                )
+            except Exception:
+                logger.warning(
+                    "Batch of %d messages failed, retrying one by one",
+                    len(batch),
+                    exc_info=True,
+                )
+                for entry in batch:
+                    await self._write_one(entry)
+                continue
+            self._resolve(batch, written)
+
+    async def _write_one(self, entry: _Entry) -> None:
+        outgoing, future = entry
+        try:
+            written = await self._offload.run(self._writer, [outgoing])
+        except Exception as e:
+            metrics.inc("message_buffer_failed_total")
+            if future is None:
+                logger.error(
+                    "Dropped queued message %s from %s to %s",
+                    outgoing.id,
+                    outgoing.sender_id,
+                    outgoing.peer_id,
+                    exc_info=True,
+                )
+            elif not future.done():
+                future.set_exception(e)
+            return
+        self._resolve([entry], written)
+
+    def _resolve(self, batch: list[_Entry], written: list[Message]) -> None:
+        for (outgoing, future), message in zip(batch, written, strict=True):
+            self._remember(outgoing, message.chat_id)
+            if future is not None and not future.done():
+                future.set_result(message)
+
+    def _remember(self, outgoing: OutgoingMessage, chat_id: UUID) -> None:
+        key = _pair_key(outgoing.sender_id, outgoing.peer_id)
+        if key not in self._chat_ids and len(self._chat_ids) >= CHAT_ID_MEMORY:
+            self._chat_ids.pop(next(iter(self._chat_ids)))
+        self._chat_ids[key] = chat_id
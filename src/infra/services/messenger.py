@@ -3,7 +3,15 @@ from datetime import datetime
 from uuid import UUID
 
 from src.core.errors import DoesNotExistError
-from src.core.messenger import Chat, ChatSummary, Message
+from src.core.messenger import (
+    Chat,
+    InboxPage,
+    Message,
+    MessagePage,
+    MessageSearchPage,
+    OutgoingMessage,
+    ReadReceipt,
+)
 from src.infra.repositories.messenger import ChatRepository, MessageRepository
 
 
@@ -16,21 +24,28 @@ class MessengerService:
         return self.chat_repo.get_or_create(user_id, peer_id)
 
     def send_message(self, sender_id: UUID, peer_id: UUID, body: str) -> Message:
-        chat = self.chat_repo.get_or_create(sender_id, peer_id)
-        msg = self.message_repo.create(chat_id=chat.id, sender_id=sender_id, body=body)
-        self.chat_repo.update_last_message(
-            chat_id=chat.id, message_id=msg.id, created_at=msg.created_at
-        )
-        return msg
+        return self.chat_repo.append_message(sender_id, peer_id, body)
+
+    def send_messages(self, batch: list[OutgoingMessage]) -> list[Message]:
+        return self.chat_repo.append_messages(batch)
+
+    def get_chat_peers(self, user_id: UUID, among: list[UUID]) -> set[UUID]:
+        return self.chat_repo.peer_ids(user_id, among)
+
+    def get_member_chat(self, user_id: UUID, chat_id: UUID) -> Chat:
+        chat = self.chat_repo.get(chat_id)
+        if not chat or user_id not in (chat.user_a_id, chat.user_b_id):
+            raise DoesNotExistError("Chat not found.")
+        return chat
 
     def get_inbox(
         self,
         user_id: UUID,
         *,
         limit: int = 30,
-        before: datetime | None = None,
-    ) -> list[ChatSummary]:
-        return self.chat_repo.list_for_user(user_id=user_id, limit=limit, before=before)
+        after: tuple[datetime, UUID] | None = None,
+    ) -> InboxPage:
+        return self.chat_repo.list_for_user(user_id=user_id, limit=limit, after=after)
 
     def get_messages(
         self,
@@ -39,9 +54,10 @@ class MessengerService:
         chat_id: UUID | None = None,
         *,
         limit: int = 50,
-        before: datetime | None = None,
+        before: tuple[datetime, UUID] | None = None,
+        after: tuple[datetime, UUID] | None = None,
         mark_seen: bool = True,
-    ) -> list[Message]:
+    ) -> MessagePage:
         if not chat_id:
             if not peer_id:
                 raise DoesNotExistError("Provide either chat_id or peer_id.")
@@ -52,14 +68,40 @@ class MessengerService:
             if not get_chat:
                 raise DoesNotExistError("Chat not found.")
 
-        msgs = self.message_repo.list_by_chat(
-            chat_id=chat_id, limit=limit, before=before
+        page = self.message_repo.list_by_chat(
+            chat_id=chat_id, limit=limit, before=before, after=after
         )
-        if mark_seen and msgs:
+        if mark_seen and page.messages:
+            last = page.messages[-1]
             self.message_repo.mark_seen_for_user(
-                chat_id=chat_id, user_id=user_id, up_to=msgs[-1].created_at
+                chat_id=chat_id, user_id=user_id, up_to=(last.created_at, last.id)
             )
-        return msgs
+        return page
+
+    def mark_chat_seen(
+        self,
+        user_id: UUID,
+        chat_id: UUID,
+        up_to: tuple[datetime, UUID] | None = None,
+    ) -> ReadReceipt | None:
+        return self.message_repo.mark_seen_for_user(
+            chat_id=chat_id, user_id=user_id, up_to=up_to
+        )
+
+    def search_messages(
+        self,
+        user_id: UUID,
+        query: str,
+        *,
+        chat_id: UUID | None = None,
+        limit: int = 20,
+        after: tuple[float, datetime, UUID] | None = None,
+    ) -> MessageSearchPage:
+        if not query.strip():
+            return MessageSearchPage(hits=[])
+        return self.message_repo.search(
+            user_id=user_id, query=query, limit=limit, chat_id=chat_id, after=after
+        )
 
-    def mark_chat_seen(self, user_id: UUID, chat_id: UUID) -> int:
-        return self.message_repo.mark_seen_for_user(chat_id=chat_id, user_id=user_id)
+    def get_unread_total(self, user_id: UUID) -> int:
+        return self.chat_repo.total_unread(user_id)
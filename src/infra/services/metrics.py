@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+
+_Key = tuple[str, tuple[tuple[str, str], ...]]
+
+
+def _key(name: str, labels: dict[str, str]) -> _Key:
+    return name, tuple(sorted(labels.items()))
+
+
+def _series(key: _Key, suffix: str = "") -> str:
+    name, labels = key
+    if not labels:
+        return f"{name}{suffix}"
+    rendered = ",".join(f'{k}="{v}"' for k, v in labels)
+    return f"{name}{suffix}{{{rendered}}}"
+
+
+class Metrics:
+    """Process-local counters, gauges and timings in Prometheus text format.
+
+    Gauges registered with ``gauge`` are sampled when rendered, so hot paths
+    only pay for ``inc`` and ``observe``. Safe to update from worker threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[_Key, float] = {}
+        self._gauges: dict[_Key, Callable[[], float]] = {}
+        self._timings: dict[_Key, list[float]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def gauge(self, name: str, sample: Callable[[], float], **labels: str) -> None:
+        with self._lock:
+            self._gauges[_key(name, labels)] = sample
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            count, total, peak = self._timings.get(key, [0.0, 0.0, 0.0])
+            self._timings[key] = [count + 1, total + seconds, max(peak, seconds)]
+
+    def value(self, name: str, **labels: str) -> float:
+        key = _key(name, labels)
+        with self._lock:
+            if key in self._gauges:
+                return float(self._gauges[key]())
+            return self._counters.get(key, 0.0)
+
+    def render(self) -> str:
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            timings = sorted(self._timings.items())
+
+        lines = [f"{_series(k)} {v:g}" for k, v in counters]
+        lines += [f"{_series(k)} {float(sample()):g}" for k, sample in gauges]
+        for k, (count, total, peak) in timings:
+            lines += [
+                f"{_series(k, '_count')} {count:g}",
+                f"{_series(k, '_sum')} {total:g}",
+                f"{_series(k, '_max')} {peak:g}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -0,0 +1,53 @@
+import asyncio
+import functools
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar
+
+from src.core.errors import OverloadedError
+from src.runner.config import settings
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class BlockingOffload:
+    """Runs blocking repository calls off the event loop with bounded backlog.
+
+    Calls beyond ``max_pending`` are rejected with ``OverloadedError`` instead
+    of queueing without limit, so a lagging database surfaces as an error on
+    the caller rather than as a stalled event loop. Keep ``max_workers`` at 1
+    while the app shares a single Session between requests.
+    """
+
+    def __init__(self, max_workers: int = 1, max_pending: int = 64) -> None:
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="db-offload"
+        )
+        self._max_pending = max_pending
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        if self._pending >= self._max_pending:
+            raise OverloadedError("Too many pending database writes.")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._pool, functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+
+db_offload = BlockingOffload(
+    max_workers=settings.ws_db_workers, max_pending=settings.ws_db_max_pending
+)
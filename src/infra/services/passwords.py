@@ -0,0 +1,96 @@
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+import bcrypt
+
+from src.core.errors import OverloadedError
+from src.infra.services.metrics import metrics
+from src.runner.config import settings
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """bcrypt hashing and checking on a dedicated, bounded thread pool.
+
+    bcrypt releases the GIL, so ``workers`` threads hash in parallel while
+    capping how much CPU logins can take from the rest of the app. Calls
+    beyond ``max_pending`` are rejected with ``OverloadedError`` instead of
+    queueing behind a login spike. Queue wait and hashing time are recorded
+    per operation in ``metrics``.
+
+    Callers block until their hash is done, and sync endpoints call from the
+    request threadpool (40 threads by default), so ``max_pending`` is also how
+    many of those threads a login spike can hold. Keep it a small multiple of
+    ``workers``, well below the threadpool size.
+    """
+
+    def __init__(self, rounds: int = 12, workers: int = 2, max_pending: int = 8):
+        self.rounds = rounds
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hasher"
+        )
+        self._max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(self.rounds)
+        return self._run(
+            "hash", lambda: bcrypt.hashpw(password.encode(), salt)
+        ).decode()
+
+    def check(self, password: str, hashed: str) -> bool:
+        return self._run(
+            "check", lambda: bcrypt.checkpw(password.encode(), hashed.encode())
+        )
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True when ``hashed`` was made with a cost other than ``rounds``."""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def _run(self, op: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            if self._pending >= self._max_pending:
+                metrics.inc("password_rejected_total", op=op)
+                raise OverloadedError("Too many pending password checks.")
+            self._pending += 1
+
+        queued = time.perf_counter()
+
+        def timed() -> T:
+            started = time.perf_counter()
+            metrics.observe("password_queue_seconds", started - queued, op=op)
+            try:
+                return fn()
+            finally:
+                metrics.observe(
+                    "password_hash_seconds", time.perf_counter() - started, op=op
+                )
+
+        try:
+            return self._pool.submit(timed).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.bcrypt_rounds,
+    workers=settings.password_workers,
+    max_pending=settings.password_max_pending,
+)
+metrics.gauge("password_pending", lambda: password_hasher.pending)
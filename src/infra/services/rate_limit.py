@@ -0,0 +1,144 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Protocol
+
+import redis
+
+from src.core.errors import RateLimitedError
+from src.infra.services.metrics import metrics
+from src.runner.config import settings
+
+
+class RateLimitStore(Protocol):
+    """Token buckets, one per key, that refill at ``rate`` up to ``burst``.
+
+    ``take`` removes a token from every bucket in ``keys`` only when all of
+    them have one, and otherwise returns the seconds until they would.
+    """
+
+    def take(self, keys: list[str], rate: float, burst: int) -> float: ...
+
+
+class LocalRateLimitStore:
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self._max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> (tokens, updated, time the bucket is full again)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+
+    def take(self, keys: list[str], rate: float, burst: int) -> float:
+        if not keys:
+            return 0.0
+
+        now = time.monotonic()
+        with self._lock:
+            levels = {}
+            for key in keys:
+                tokens, updated, _ = self._buckets.get(key, (burst, now, now))
+                levels[key] = min(burst, tokens + (now - updated) * rate)
+
+            wait = max((1 - level) / rate for level in levels.values())
+            if wait > 0:
+                return wait
+
+            if len(self._buckets) + len(keys) > self._max_keys:
+                # full buckets hold no state worth keeping
+                self._buckets = {k: b for k, b in self._buckets.items() if b[2] > now}
+            for key, level in levels.items():
+                full_at = now + (burst - level + 1) / rate
+                self._buckets[key] = (level - 1, now, full_at)
+            return 0.0
+
+
+# KEYS: buckets; ARGV: rate per second, burst
+_TAKE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local b = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(b[1]) or burst
+    local ts = tonumber(b[2]) or now
+    levels[i] = math.min(burst, tokens + (now - ts) * rate)
+    wait = math.max(wait, (1 - levels[i]) / rate)
+end
+if wait > 0 then
+    return tostring(wait)
+end
+
+for i, key in ipairs(KEYS) do
+    local tokens = levels[i] - 1
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil((burst - tokens) / rate * 1000) + 1000)
+end
+return '0'
+"""
+
+
+class RedisRateLimitStore:
+    """Buckets as Redis hashes, updated in one script on Redis' own clock.
+
+    Keys expire once their bucket would be full again. If Redis is
+    unreachable requests are let through: the limiter guards CPU and must not
+    take logins down with it.
+    """
+
+    def __init__(self, redis_url: str, namespace: str = "swipe:rl") -> None:
+        self._redis = redis.Redis.from_url(redis_url)
+        self._take = self._redis.register_script(_TAKE)
+        self._namespace = namespace
+
+    def take(self, keys: list[str], rate: float, burst: int) -> float:
+        try:
+            wait = self._take(
+                keys=[f"{self._namespace}:{key}" for key in keys], args=[rate, burst]
+            )
+        except redis.RedisError:
+            metrics.inc("rate_limit_errors_total")
+            return 0.0
+        return float(wait)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    name: str
+    per_minute: int
+
+
+LOGIN = RateLimit("login", settings.login_attempts_per_minute)
+REFRESH = RateLimit("refresh", settings.refresh_attempts_per_minute)
+REGISTER = RateLimit("register", settings.register_attempts_per_minute)
+
+
+class RateLimiter:
+    """Checks a rule against a caller's identities, e.g. IP and account.
+
+    Every identity gets its own bucket holding ``per_minute`` tokens; a call
+    passes only when each of them has one left.
+    """
+
+    def __init__(self, store: RateLimitStore) -> None:
+        self._store = store
+
+    def check(self, rule: RateLimit, **identities: str | None) -> None:
+        keys = [
+            f"{rule.name}:{kind}:{value}" for kind, value in identities.items() if value
+        ]
+        wait = self._store.take(keys, rule.per_minute / 60, rule.per_minute)
+        if wait > 0:
+            metrics.inc("rate_limited_total", rule=rule.name)
+            raise RateLimitedError(wait)
+        metrics.inc("rate_limit_passed_total", rule=rule.name)
+
+
+def make_rate_limiter() -> RateLimiter | None:
+    if settings.rate_limit_store == "off":
+        return None
+    if settings.rate_limit_store == "local":
+        return RateLimiter(LocalRateLimitStore())
+    return RateLimiter(RedisRateLimitStore(settings.redis_url))
@@ -1,10 +1,21 @@
+import contextlib
 import math
-from dataclasses import dataclass
-from uuid import UUID
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+from uuid import UUID, uuid4
 
 from src.core.errors import DoesNotExistError, ExistsError, ForbiddenError
-from src.core.social import FriendStatus, SocialUser
+from src.core.social import (
+    FriendStatus,
+    Relationship,
+    SocialUser,
+    SuggestionDeck,
+    UserCounts,
+    UserPage,
+)
 from src.core.users import User, UserRepository
+from src.infra.repositories.counters import CounterRepository
 from src.infra.repositories.creator_post.categories import CategoryRepository
 from src.infra.repositories.creator_post.feed_preferences import (
     FeedPreferenceRepository,
@@ -14,6 +25,11 @@ from src.infra.repositories.social import (
     FriendRepository,
     SuggestionSkipRepository,
 )
+from src.infra.services.cache import Cache
+from src.runner.config import settings
+
+# Served decks are remembered for swipe validation, prefetched ones until used
+TTL_SUGGESTION_DECK = 900
 
 
 @dataclass
@@ -24,6 +40,8 @@ class SocialService:
     feed_pref_repo: FeedPreferenceRepository
     category_repo: CategoryRepository
     skip_repo: SuggestionSkipRepository
+    counter_repo: CounterRepository
+    _cache: Cache = field(default_factory=Cache)
 
     def follow(self, user_id: UUID, target_id: UUID) -> None:
         if user_id == target_id:
@@ -88,30 +106,98 @@ class SocialService:
     def skip_suggestion(
         self, user_id: UUID, target_id: UUID, ttl_days: int | None = None
     ) -> None:
-        if (
-            self.is_following(user_id, target_id)
-            or target_id in self.friend_repo.get_friend_ids(user_id)
-            or target_id in self.friend_repo.get_requests_from(user_id)
-            or target_id in self.friend_repo.get_requests_to(user_id)
-        ):
-            return
-        self.skip_repo.skip(user_id, target_id, ttl_days=ttl_days)
-
-    def get_followers(self, user_id: UUID) -> list[User]:
-        ids = self.follow_repo.get_followers(user_id)
-        return self.user_repo.read_many_by_ids(ids)
+        self.skip_repo.skip_many(user_id, [target_id], ttl_days=ttl_days)
+
+    def skip_suggestions(
+        self,
+        user_id: UUID,
+        target_ids: list[UUID],
+        *,
+        deck_token: str | None = None,
+        ttl_days: int | None = None,
+    ) -> int:
+        if deck_token:
+            deck_ids = self._cget(self._deck_cache(user_id), f"deck:{deck_token}")
+            if isinstance(deck_ids, list):
+                target_ids = [t for t in target_ids if t in set(deck_ids)]
+        return self.skip_repo.skip_many(user_id, target_ids, ttl_days=ttl_days)
+
+    def get_suggestion_deck(self, user_id: UUID, size: int) -> SuggestionDeck:
+        cache = self._deck_cache(user_id)
+        deck = self._cget(cache, "next")
+        if isinstance(deck, SuggestionDeck) and len(deck.cards) >= size:
+            with contextlib.suppress(Exception):
+                cache.delete("next")
+            deck.cards = deck.cards[:size]
+        else:
+            deck = self._build_deck(user_id, size, exclude=set())
+
+        self._cset(
+            cache,
+            f"deck:{deck.token}",
+            [card.user.id for card in deck.cards],
+            TTL_SUGGESTION_DECK,
+        )
+        return deck
 
-    def get_following(self, user_id: UUID) -> list[User]:
-        ids = self.follow_repo.get_following(user_id)
-        return self.user_repo.read_many_by_ids(ids)
+    def prefetch_suggestion_deck(
+        self, user_id: UUID, size: int, exclude: list[UUID]
+    ) -> None:
+        deck = self._build_deck(user_id, size, exclude=set(exclude))
+        self._cset(self._deck_cache(user_id), "next", deck, TTL_SUGGESTION_DECK)
+
+    def _build_deck(
+        self, user_id: UUID, size: int, exclude: set[UUID]
+    ) -> SuggestionDeck:
+        cards = self.get_friend_suggestions(user_id, limit=size, exclude=exclude)
+        return SuggestionDeck(token=uuid4().hex, cards=cards)
+
+    def _deck_cache(self, user_id: UUID) -> Cache:
+        return self._cache.user(f"{user_id}:suggestions")
+
+    def _cget(self, cache: Cache, key: str) -> Any | None:
+        try:
+            return cache.get(key)
+        except Exception:
+            return None
+
+    def _cset(self, cache: Cache, key: str, value: Any, ttl: int) -> None:
+        with contextlib.suppress(Exception):
+            cache.set(key, value, ttl)
+
+    def get_followers(
+        self,
+        user_id: UUID,
+        *,
+        limit: int = 50,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> UserPage:
+        return self.follow_repo.list_followers(user_id, limit=limit, after=after)
+
+    def get_following(
+        self,
+        user_id: UUID,
+        *,
+        limit: int = 50,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> UserPage:
+        return self.follow_repo.list_following(user_id, limit=limit, after=after)
 
     def get_incoming_friend_requests(self, user_id: UUID) -> list[User]:
         ids = self.friend_repo.get_requests_to(user_id)
         return self.user_repo.read_many_by_ids(ids)
 
-    def get_friends(self, user_id: UUID) -> list[User]:
-        ids = self.friend_repo.get_friend_ids(user_id)
-        return self.user_repo.read_many_by_ids(ids)
+    def get_friends(
+        self,
+        user_id: UUID,
+        *,
+        limit: int = 50,
+        after: tuple[datetime, UUID] | None = None,
+    ) -> UserPage:
+        return self.friend_repo.list_friends(user_id, limit=limit, after=after)
+
+    def get_counts(self, user_id: UUID) -> UserCounts:
+        return self.counter_repo.get(user_id)
 
     def get_friend_status(self, user_id: UUID, other_id: UUID) -> FriendStatus:
         if not self.user_repo.read_by(user_id=other_id):
@@ -129,6 +215,24 @@ class SocialService:
             raise DoesNotExistError("User not exist anymore.")
         return self.follow_repo.get(user_id, other_id) is not None
 
+    def get_relationships(
+        self, user_id: UUID, other_ids: list[UUID]
+    ) -> dict[UUID, Relationship]:
+        if not other_ids:
+            return {}
+
+        statuses = self.friend_repo.get_friend_statuses(user_id, other_ids)
+        following = self.follow_repo.get_following_among(user_id, other_ids)
+        mutuals = self.friend_repo.get_mutual_friend_counts(user_id, other_ids)
+        return {
+            other_id: Relationship(
+                friend_status=statuses.get(other_id, FriendStatus.NOT_FRIENDS),
+                is_following=other_id in following,
+                mutual_friend_count=mutuals.get(other_id, 0),
+            )
+            for other_id in other_ids
+        }
+
     def _cosine_0_1(self, a: dict[UUID, int], b: dict[UUID, int]) -> float:
         if not a and not b:
             return 0.0
@@ -187,39 +291,38 @@ class SocialService:
         return [category_names.get(cid, str(cid)[:8]) for cid in top_ids]
 
     def get_friend_suggestions(
-        self, user_id: UUID, limit: int = 20
+        self, user_id: UUID, limit: int = 20, exclude: set[UUID] | None = None
     ) -> list[SocialUser]:
-        my_friends = set(self.friend_repo.get_friend_ids(user_id))
-
-        fof: set[UUID] = set()
-        for f in my_friends:
-            fof.update(self.friend_repo.get_friend_ids(f))
-
-        fof.discard(user_id)
-        fof -= my_friends
-        fof -= set(self.friend_repo.get_requests_to(user_id))
-        fof -= set(self.friend_repo.get_requests_from(user_id))
-
-        fof -= self.skip_repo.get_skipped_ids(user_id)
-
-        if not fof:
+        """Friends of friends, best match rate first.
+
+        Only the ``settings.suggestion_candidate_pool`` candidates with the
+        most mutual friends are scored, so a strong match with few mutuals
+        can be left out for well-connected users; set the pool to 0 to
+        score every candidate.
+        """
+        pool = settings.suggestion_candidate_pool
+        candidates = self.friend_repo.get_suggestion_candidates(
+            user_id, limit=pool or None
+        )
+        if exclude:
+            candidates = {
+                cid: count for cid, count in candidates.items() if cid not in exclude
+            }
+        if not candidates:
             return []
 
-        results: list[SocialUser] = []
+        suggestions = self.user_repo.read_many_by_ids(list(candidates))
+        following = self.follow_repo.get_following_among(user_id, list(candidates))
 
-        for suggestion_id in fof:
-            suggestion = self.user_repo.read_by(user_id=suggestion_id)
-            if not suggestion:
-                continue
+        results: list[SocialUser] = []
+        for suggestion in suggestions:
             social_user = SocialUser(
                 user=suggestion,
-                friend_status=self.get_friend_status(user_id, suggestion_id),
-                is_following=self.is_following(user_id, suggestion_id),
-                mutual_friend_count=len(
-                    my_friends & set(self.friend_repo.get_friend_ids(suggestion_id))
-                ),
-                match_rate=self.calculate_match_rate(user_id, suggestion_id),
-                overlap_categories=self.overlap_categories(user_id, suggestion_id),
+                friend_status=FriendStatus.NOT_FRIENDS,
+                is_following=suggestion.id in following,
+                mutual_friend_count=candidates[suggestion.id],
+                match_rate=self.calculate_match_rate(user_id, suggestion.id),
+                overlap_categories=self.overlap_categories(user_id, suggestion.id),
             )
             results.append(social_user)
 
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Protocol, cast
+
+from jose import JWTError
+from jose import jwt as jose_jwt
+
+from src.core.errors import DoesNotExistError
+from src.infra.services.metrics import metrics
+from src.runner.config import settings
+
+
+class JWTBackend(Protocol):
+    """Signs and verifies compact JWTs; ``decode`` raises DoesNotExistError."""
+
+    def encode(self, claims: dict[str, Any], key: str, algorithm: str) -> str: ...
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict[str, Any]: ...
+
+
+class JoseBackend:
+    def encode(self, claims: dict[str, Any], key: str, algorithm: str) -> str:
+        return str(jose_jwt.encode(claims, key, algorithm=algorithm))
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict[str, Any]:
+        try:
+            return cast(
+                dict[str, Any], jose_jwt.decode(token, key, algorithms=[algorithm])
+            )
+        except JWTError as err:
+            raise DoesNotExistError("Invalid or expired token") from err
+
+
+class PyJWTBackend:
+    """PyJWT, a faster drop-in; install ``pyjwt`` to use it."""
+
+    def __init__(self) -> None:
+        import jwt
+
+        self._jwt = jwt
+
+    def encode(self, claims: dict[str, Any], key: str, algorithm: str) -> str:
+        return str(self._jwt.encode(claims, key, algorithm=algorithm))
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict[str, Any]:
+        try:
+            return cast(
+                dict[str, Any], self._jwt.decode(token, key, algorithms=[algorithm])
+            )
+        except self._jwt.InvalidTokenError as err:
+            raise DoesNotExistError("Invalid or expired token") from err
+
+
+def make_backend(name: str) -> JWTBackend:
+    if name == "pyjwt":
+        return PyJWTBackend()
+    return JoseBackend()
+
+
+class TokenVerifier:
+    """Verifies JWTs once and serves their claims from an LRU until ``exp``.
+
+    Entries are keyed by a SHA-256 of the token, so raw tokens are never
+    held, and only tokens that passed verification are cached. Claims are
+    copied on the way out; callers may modify what they get.
+    """
+
+    def __init__(
+        self,
+        backend: JWTBackend,
+        key: str,
+        algorithm: str = "HS256",
+        size: int = 10_000,
+    ) -> None:
+        self.backend = backend
+        self._key = key
+        self._algorithm = algorithm
+        self._size = size
+        self._lock = threading.Lock()
+        self._claims: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        return self.backend.encode(claims, self._key, self._algorithm)
+
+    def verify(self, token: str) -> dict[str, Any]:
+        digest = hashlib.sha256(token.encode()).digest()
+        now = time.time()
+        with self._lock:
+            cached = self._claims.get(digest)
+            if cached is not None:
+                if cached[0] > now:
+                    self._claims.move_to_end(digest)
+                    metrics.inc("token_cache_hits_total")
+                    return dict(cached[1])
+                del self._claims[digest]
+
+        metrics.inc("token_cache_misses_total")
+        claims = self.backend.decode(token, self._key, self._algorithm)
+        exp = claims.get("exp")
+        if isinstance(exp, int | float) and exp > now:
+            with self._lock:
+                self._claims[digest] = (float(exp), claims)
+                while len(self._claims) > self._size:
+                    self._claims.popitem(last=False)
+        return dict(claims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._claims.clear()
+
+
+token_verifier = TokenVerifier(
+    make_backend(settings.jwt_backend),
+    settings.secret_key,
+    settings.algorithm,
+    size=settings.token_cache_size,
+)
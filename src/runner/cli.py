@@ -1,10 +1,28 @@
 from __future__ import annotations
 
+import time
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
 import uvicorn
 from dotenv import load_dotenv
-from typer import Typer
+from typer import Typer, echo
 
-from src.runner.setup import init_app
+from src.infra.repositories.message_partitions import (
+    MessagePartitionRepository,
+    add_months,
+    month_start,
+)
+from src.infra.services.token_verifier import TokenVerifier, make_backend
+from src.runner.config import settings
+from src.runner.jobs import (
+    ensure_message_partitions,
+    purge_expired_skips,
+    purge_expired_tokens,
+    reconcile_counters,
+)
+from src.runner.setup import SessionLocal, init_app
 
 cli = Typer(no_args_is_help=True, add_completion=False)
 
@@ -13,3 +31,78 @@ cli = Typer(no_args_is_help=True, add_completion=False)
 def run(host: str = "127.0.0.1", port: int = 8000) -> None:
     load_dotenv()
     uvicorn.run(app=init_app(), host=host, port=port)
+
+
+@cli.command("reconcile-counters")
+def reconcile_counters_command() -> None:
+    load_dotenv()
+    fixed = reconcile_counters(SessionLocal)
+    echo(f"Reconciled {fixed} counter rows.")
+
+
+@cli.command("purge-skips")
+def purge_skips_command() -> None:
+    load_dotenv()
+    purged = purge_expired_skips(SessionLocal)
+    echo(f"Purged {purged} expired suggestion skips.")
+
+
+@cli.command("purge-tokens")
+def purge_tokens_command() -> None:
+    load_dotenv()
+    purged = purge_expired_tokens(SessionLocal)
+    echo(f"Purged {purged} expired refresh tokens.")
+
+
+@cli.command("create-partitions")
+def create_partitions_command() -> None:
+    load_dotenv()
+    created = ensure_message_partitions(SessionLocal)
+    echo(f"Created {len(created)} message partitions.")
+
+
+@cli.command("archive-partitions")
+def archive_partitions_command(
+    older_than_months: int = 12, out: Path = Path("var/archive"), keep: bool = False
+) -> None:
+    load_dotenv()
+    before = add_months(month_start(date.today()), -older_than_months)
+    db = SessionLocal()
+    try:
+        exported = MessagePartitionRepository(db).archive(before, out, drop=not keep)
+    finally:
+        db.close()
+    for path in exported:
+        echo(str(path))
+    echo(f"Archived {len(exported)} message partitions older than {before}.")
+
+
+@cli.command("bench-tokens")
+def bench_tokens_command(iterations: int = 20_000, backend: str = "") -> None:
+    """Compare a full JWT decode per call with the cached verifier."""
+    load_dotenv()
+    jwt_backend = make_backend(backend or settings.jwt_backend)
+    verifier = TokenVerifier(jwt_backend, settings.secret_key, settings.algorithm)
+    token = verifier.encode(
+        {
+            "sub": str(uuid4()),
+            "type": "access",
+            "exp": datetime.now(UTC) + timedelta(minutes=5),
+        }
+    )
+
+    def decode() -> object:
+        return jwt_backend.decode(token, settings.secret_key, settings.algorithm)
+
+    for name, verify in (
+        ("decode", decode),
+        ("cached", lambda: verifier.verify(token)),
+    ):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            verify()
+        elapsed = time.perf_counter() - started
+        echo(
+            f"{type(jwt_backend).__name__} {name}: "
+            f"{elapsed / iterations * 1e6:.1f} us/op, {iterations / elapsed:,.0f} ops/s"
+        )
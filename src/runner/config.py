@@ -14,11 +14,61 @@ class Settings:
     redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     secret_key: str = os.getenv("SECRET_KEY", "your-secret-key")
     algorithm: str = "HS256"
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    password_workers: int = int(os.getenv("PASSWORD_WORKERS", "2"))
+    # each pending check holds one of the 40 request threads while it waits,
+    # so keep this well below that or logins starve every other sync endpoint
+    password_max_pending: int = int(os.getenv("PASSWORD_MAX_PENDING", "8"))
+    rate_limit_store: str = os.getenv("RATE_LIMIT_STORE", "redis")
+    # proxies in front of the app that append to X-Forwarded-For
+    trusted_proxy_hops: int = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+    login_attempts_per_minute: int = int(os.getenv("LOGIN_ATTEMPTS_PER_MINUTE", "10"))
+    refresh_attempts_per_minute: int = int(
+        os.getenv("REFRESH_ATTEMPTS_PER_MINUTE", "30")
+    )
+    register_attempts_per_minute: int = int(
+        os.getenv("REGISTER_ATTEMPTS_PER_MINUTE", "5")
+    )
+    jwt_backend: str = os.getenv("JWT_BACKEND", "jose")
+    token_cache_size: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
     access_token_expire_minutes: int = int(
         os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
     )
     reftesh_token_expire_days: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_DAYS", "90"))
     base_url: str = os.getenv("BASE_URL", "http://localhost:8000")
+    # background jobs; with several workers enable this in exactly one process
+    run_scheduler: bool = os.getenv("RUN_SCHEDULER", "1") == "1"
+    # friends-of-friends, by mutual count, ranked per suggestion request; 0 = all
+    suggestion_candidate_pool: int = int(os.getenv("SUGGESTION_CANDIDATE_POOL", "200"))
+    counter_reconcile_minutes: int = int(os.getenv("COUNTER_RECONCILE_MINUTES", "360"))
+    skip_purge_minutes: int = int(os.getenv("SKIP_PURGE_MINUTES", "60"))
+    token_store: str = os.getenv("TOKEN_STORE", "postgres")
+    token_purge_minutes: int = int(os.getenv("TOKEN_PURGE_MINUTES", "60"))
+    message_partition_minutes: int = int(os.getenv("MESSAGE_PARTITION_MINUTES", "1440"))
+    message_partition_months_ahead: int = int(
+        os.getenv("MESSAGE_PARTITION_MONTHS_AHEAD", "3")
+    )
+    ws_broker: str = os.getenv("WS_BROKER", "redis")
+    ws_presence_ttl_seconds: int = int(os.getenv("WS_PRESENCE_TTL_SECONDS", "60"))
+    ws_replay_size: int = int(os.getenv("WS_REPLAY_SIZE", "256"))
+    ws_replay_ttl_seconds: int = int(os.getenv("WS_REPLAY_TTL_SECONDS", "3600"))
+    ws_presence_window_seconds: float = float(
+        os.getenv("WS_PRESENCE_WINDOW_SECONDS", "2")
+    )
+    ws_typing_interval_seconds: float = float(
+        os.getenv("WS_TYPING_INTERVAL_SECONDS", "3")
+    )
+    ws_ticket_ttl_seconds: int = int(os.getenv("WS_TICKET_TTL_SECONDS", "30"))
+    ws_principal_ttl_seconds: float = float(os.getenv("WS_PRINCIPAL_TTL_SECONDS", "60"))
+    ws_send_queue_size: int = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+    ws_send_timeout_seconds: float = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+    ws_slow_consumer: str = os.getenv("WS_SLOW_CONSUMER", "disconnect")
+    ws_db_workers: int = int(os.getenv("WS_DB_WORKERS", "1"))
+    ws_db_max_pending: int = int(os.getenv("WS_DB_MAX_PENDING", "64"))
+    message_buffer_enabled: bool = os.getenv("MESSAGE_BUFFER", "0") == "1"
+    message_buffer_window_ms: int = int(os.getenv("MESSAGE_BUFFER_WINDOW_MS", "10"))
+    message_buffer_max_batch: int = int(os.getenv("MESSAGE_BUFFER_MAX_BATCH", "200"))
+    message_buffer_ack: str = os.getenv("MESSAGE_BUFFER_ACK", "flushed")
 
     media_root: Path = Path(os.getenv("MEDIA_ROOT", "var/media"))
 
@@ -0,0 +1,83 @@
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.infra.repositories.counters import CounterRepository
+from src.infra.repositories.message_partitions import MessagePartitionRepository
+from src.infra.repositories.social import SuggestionSkipRepository
+from src.infra.repositories.tokens import TokenRepository
+from src.runner.config import settings
+
+
+def reconcile_counters(session_factory: sessionmaker[Session]) -> int:
+    db = session_factory()
+    try:
+        return CounterRepository(db).reconcile()
+    finally:
+        db.close()
+
+
+def purge_expired_skips(session_factory: sessionmaker[Session]) -> int:
+    db = session_factory()
+    try:
+        return SuggestionSkipRepository(db).purge_expired()
+    finally:
+        db.close()
+
+
+def purge_expired_tokens(session_factory: sessionmaker[Session]) -> int:
+    db = session_factory()
+    try:
+        return TokenRepository(db).purge_expired()
+    finally:
+        db.close()
+
+
+def ensure_message_partitions(session_factory: sessionmaker[Session]) -> list[str]:
+    db = session_factory()
+    try:
+        return MessagePartitionRepository(db).ensure_future(
+            settings.message_partition_months_ahead
+        )
+    finally:
+        db.close()
+
+
+def init_scheduler(session_factory: sessionmaker[Session]) -> BackgroundScheduler:
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(
+        reconcile_counters,
+        "interval",
+        minutes=settings.counter_reconcile_minutes,
+        args=[session_factory],
+        id="reconcile_counters",
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        purge_expired_skips,
+        "interval",
+        minutes=settings.skip_purge_minutes,
+        args=[session_factory],
+        id="purge_expired_skips",
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        purge_expired_tokens,
+        "interval",
+        minutes=settings.token_purge_minutes,
+        args=[session_factory],
+        id="purge_expired_tokens",
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.add_job(
+        ensure_message_partitions,
+        "interval",
+        minutes=settings.message_partition_minutes,
+        args=[session_factory],
+        id="ensure_message_partitions",
+        max_instances=1,
+        coalesce=True,
+    )
+    return scheduler
@@ -1,4 +1,5 @@
-from collections.abc import Generator
+from collections.abc import AsyncIterator, Generator
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -12,16 +13,20 @@ from src.infra.fastapi.creator_posts import creator_post_api
 from src.infra.fastapi.feed import feed_api
 from src.infra.fastapi.media import media_api
 from src.infra.fastapi.messenger import messenger_api
+from src.infra.fastapi.metrics import metrics_api
 from src.infra.fastapi.personal_posts import personal_post_api
 from src.infra.fastapi.references import reference_api
 from src.infra.fastapi.social import social_api
 from src.infra.fastapi.users import user_api
+from src.infra.fastapi.ws_manager import manager as ws_manager
+from src.infra.fastapi.ws_presence import presence
 from src.infra.models.creator_post.hashtag import Hashtag  # noqa: F401
 from src.infra.models.creator_post.media import Media as CreatorMedia  # noqa: F401
 from src.infra.models.friend import SuggestionSkip  # noqa F401
 from src.infra.models.personal_post.media import (
     PersonalMedia as PersonalMedia,  # noqa: F401
 )
+from src.infra.repositories.counters import CounterRepository
 from src.infra.repositories.creator_post.categories import CategoryRepository
 from src.infra.repositories.creator_post.comments import (
     CommentRepository as CreatorPostCommentRepository,
@@ -55,18 +60,22 @@ from src.infra.repositories.social import (
     FriendRepository,
     SuggestionSkipRepository,
 )
-from src.infra.repositories.tokens import TokenRepository
+from src.infra.repositories.tokens import make_token_repository
 from src.infra.repositories.users import UserRepository
 from src.infra.services.cache import Cache
 from src.infra.services.creator_post import CreatorPostService
 from src.infra.services.feed import FeedService
+from src.infra.services.message_buffer import MessageWriteBuffer
 from src.infra.services.messenger import MessengerService
+from src.infra.services.offload import db_offload
 from src.infra.services.personal_post import PersonalPostService
+from src.infra.services.rate_limit import make_rate_limiter
 from src.infra.services.reference import ReferenceService
 from src.infra.services.social import SocialService
 from src.infra.services.user import UserService
 from src.runner.config import settings
 from src.runner.db import Base
+from src.runner.jobs import init_scheduler
 
 engine = create_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -80,10 +89,28 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    scheduler = init_scheduler(SessionLocal) if settings.run_scheduler else None
+    if scheduler is not None:
+        scheduler.start()
+    await ws_manager.start()
+    await presence.start()
+    try:
+        yield
+    finally:
+        if app.state.message_buffer is not None:
+            await app.state.message_buffer.close()
+        await presence.stop()
+        await ws_manager.stop()
+        if scheduler is not None:
+            scheduler.shutdown(wait=False)
+
+
 def init_app() -> FastAPI:
     Base.metadata.create_all(bind=engine)
 
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
     app.mount("/media", StaticFiles(directory=str(settings.media_root)), name="media")
 
     app.add_middleware(
@@ -96,7 +123,6 @@ def init_app() -> FastAPI:
     db: Session = next(get_db())
 
     user_repo = UserRepository(db)
-    app.state.tokens = TokenRepository(db)
 
     personal_post_repo = PersonalPostRepository(db)
     personal_post_like_repo = PersonalPostLikeRepository(db)
@@ -104,7 +130,7 @@ def init_app() -> FastAPI:
 
     follow_repo = FollowRepository(db)
     friend_repo = FriendRepository(db)
-    token_repo = TokenRepository(db)
+    token_repo = make_token_repository(db)
 
     creator_post_repo = CreatorPostRepository(db)
     reference_repo = ReferenceRepository(db)
@@ -117,6 +143,7 @@ def init_app() -> FastAPI:
     chat_repo = ChatRepository(db)
     message_repo = MessageRepository(db)
     skip_repo = SuggestionSkipRepository(db)
+    counter_repo = CounterRepository(db)
 
     app.state.user = user_repo
     app.state.tokens = token_repo
@@ -143,6 +170,7 @@ def init_app() -> FastAPI:
         feed_pref_repo=feed_pref_repo,
         category_repo=category_repo,
         skip_repo=skip_repo,
+        counter_repo=counter_repo,
     )
     app.state.feed = FeedService(
         personal_post_repo=personal_post_repo,
@@ -166,10 +194,23 @@ def init_app() -> FastAPI:
         feed_pref_repo=feed_pref_repo,
         post_decorator=post_decorator,
     )
+    app.state.session_factory = SessionLocal
+    app.state.rate_limiter = make_rate_limiter()
     app.state.messenger = MessengerService(
         chat_repo=chat_repo,
         message_repo=message_repo,
     )
+    app.state.message_buffer = (
+        MessageWriteBuffer(
+            app.state.messenger.send_messages,
+            db_offload,
+            window_ms=settings.message_buffer_window_ms,
+            max_batch=settings.message_buffer_max_batch,
+            ack="queued" if settings.message_buffer_ack == "queued" else "flushed",
+        )
+        if settings.message_buffer_enabled
+        else None
+    )
 
     app.include_router(user_api)
     app.include_router(auth_api)
@@ -180,5 +221,6 @@ def init_app() -> FastAPI:
     app.include_router(reference_api)
     app.include_router(media_api)
     app.include_router(messenger_api)
+    app.include_router(metrics_api)
 
     return app
@@ -13,6 +13,7 @@ from src.infra.fastapi.auth import auth_api
 from src.infra.fastapi.creator_posts import creator_post_api
 from src.infra.fastapi.feed import feed_api
 from src.infra.fastapi.messenger import messenger_api
+from src.infra.fastapi.metrics import metrics_api
 from src.infra.fastapi.personal_posts import personal_post_api
 from src.infra.fastapi.references import reference_api
 from src.infra.fastapi.social import social_api
@@ -22,6 +23,7 @@ from src.infra.models.creator_post.media import Media as CreatorMedia  # noqa: F
 from src.infra.models.personal_post.media import (
     PersonalMedia as PersonalMedia,  # noqa: F401
 )
+from src.infra.repositories.counters import CounterRepository
 from src.infra.repositories.creator_post.categories import CategoryRepository
 from src.infra.repositories.creator_post.comments import (
     CommentRepository as CreatorPostCommentRepository,
@@ -109,6 +111,7 @@ def client(db_session: Session) -> TestClient:
     follow_repo = FollowRepository(db_session)
     friend_repo = FriendRepository(db_session)
     skip_repo = SuggestionSkipRepository(db_session)
+    counter_repo = CounterRepository(db_session)
     token_repo = TokenRepository(db_session)
 
     creator_post_repo = CreatorPostRepository(db_session)
@@ -147,6 +150,7 @@ def client(db_session: Session) -> TestClient:
         feed_pref_repo=feed_pref_repo,
         category_repo=category_repo,
         skip_repo=skip_repo,
+        counter_repo=counter_repo,
     )
     app.state.feed = FeedService(
         personal_post_repo=personal_post_repo,
@@ -169,6 +173,7 @@ def client(db_session: Session) -> TestClient:
         feed_pref_repo=feed_pref_repo,
         post_decorator=post_decorator,
     )
+    app.state.session_factory = lambda: db_session
     app.state.messenger = MessengerService(
         chat_repo=chat_repo,
         message_repo=message_repo,
@@ -182,4 +187,5 @@ def client(db_session: Session) -> TestClient:
     app.include_router(feed_api)
     app.include_router(reference_api)
     app.include_router(messenger_api)
+    app.include_router(metrics_api)
     return TestClient(app)
@@ -1,5 +1,10 @@
+from typing import cast
+
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from src.infra.services.rate_limit import LocalRateLimitStore, RateLimiter
+from src.runner.config import settings
 from tests.fake import FakeUser
 
 
@@ -86,6 +91,9 @@ def test_should_refresh_token(client: TestClient) -> None:
 
     assert refresh_response.status_code == 200
     assert "access_token" in refresh_response.json()
+    rotated = refresh_response.cookies.get("refresh_token")
+    assert rotated
+    assert rotated != refresh_token
 
 
 def test_should_not_refresh_invalid_token(client: TestClient) -> None:
@@ -166,3 +174,20 @@ def test_should_logout_and_clear_cookie(client: TestClient) -> None:
 
     assert refresh_attempt.status_code == 401
     assert refresh_attempt.json() == {"message": "Refresh token not recognized"}
+
+
+def test_should_rate_limit_login_attempts(client: TestClient) -> None:
+    cast(FastAPI, client.app).state.rate_limiter = RateLimiter(LocalRateLimitStore())
+    fake = FakeUser()
+    response = client.post("/users", json=fake.as_create_dict())
+    username = response.json()["user"]["username"]
+
+    for _ in range(settings.login_attempts_per_minute):
+        wrong = client.post("/auth", data={"username": username, "password": "x"})
+        assert wrong.status_code == 401
+
+    limited = client.post(
+        "/auth", data={"username": username.upper(), "password": fake.password}
+    )
+    assert limited.status_code == 429
+    assert int(limited.headers["retry-after"]) >= 1
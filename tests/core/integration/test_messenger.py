@@ -0,0 +1,185 @@
+import json
+from dataclasses import replace
+from datetime import datetime
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.infra.fastapi.utils import encode_cursor
+from tests.fake import FakeUser
+
+
+@pytest.fixture
+def user_a(client: TestClient) -> FakeUser:
+    user = FakeUser()
+    r = client.post("/users", json=user.as_create_dict())
+    assert r.status_code == 201
+    data = r.json()["user"]
+    return replace(user, id=data["id"], username=data["username"])
+
+
+@pytest.fixture
+def user_b(client: TestClient) -> FakeUser:
+    user = FakeUser()
+    r = client.post("/users", json=user.as_create_dict())
+    assert r.status_code == 201
+    data = r.json()["user"]
+    return replace(user, id=data["id"], username=data["username"])
+
+
+@pytest.fixture
+def authed_client(client: TestClient, user_a: FakeUser) -> TestClient:
+    r = client.post(
+        "/auth", data={"username": user_a.username, "password": user_a.password}
+    )
+    assert r.status_code == 200
+    token = r.json()["access_token"]
+    client.headers.update({"Authorization": f"Bearer {token}"})
+    return client
+
+
+def test_should_report_unread_badge(
+    authed_client: TestClient, user_b: FakeUser
+) -> None:
+    r = authed_client.post(
+        "/auth", data={"username": user_b.username, "password": user_b.password}
+    )
+    peer_auth = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    for body in ("hi", "there"):
+        sent = authed_client.post(
+            "/messages/send", params={"peer_id": str(user_b.id), "body": body}
+        )
+        assert sent.status_code == 201
+
+    badge = authed_client.get("/inbox/unread", headers=peer_auth)
+    assert badge.status_code == 200
+    assert badge.json() == {"unread": 2}
+
+    chat_id = sent.json()["message"]["chat_id"]
+    authed_client.post(f"/chats/{chat_id}/seen", headers=peer_auth)
+
+    assert authed_client.get("/inbox/unread", headers=peer_auth).json() == {"unread": 0}
+    assert authed_client.get("/inbox/unread").json() == {"unread": 0}
+
+
+def test_should_page_inbox_with_cursor(
+    authed_client: TestClient, user_b: FakeUser
+) -> None:
+    sent = authed_client.post(
+        "/messages/send", params={"peer_id": str(user_b.id), "body": "hi"}
+    )
+    assert sent.status_code == 201
+
+    first = authed_client.get("/inbox", params={"limit": 1})
+    assert first.status_code == 200
+    [chat] = first.json()["chats"]
+    assert chat["peer_id"] == user_b.id
+    assert chat["last_body"] == "hi"
+    assert chat["muted"] is False
+    assert first.json()["next_cursor"] is None
+
+    # the legacy timestamp parameter still pages
+    older = authed_client.get(
+        "/inbox", params={"before": chat["last_message_at"]}
+    ).json()
+    assert older["chats"] == []
+    newer = authed_client.get("/inbox", params={"before": "2999-01-01T00:00:00"})
+    assert [c["chat_id"] for c in newer.json()["chats"]] == [chat["chat_id"]]
+
+    bad = authed_client.get("/inbox", params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+
+
+def test_should_page_messages_with_cursor(
+    authed_client: TestClient, user_b: FakeUser
+) -> None:
+    for body in ("one", "two", "three"):
+        sent = authed_client.post(
+            "/messages/send", params={"peer_id": str(user_b.id), "body": body}
+        )
+        assert sent.status_code == 201
+
+    newest = authed_client.get(
+        "/messages", params={"peer_id": str(user_b.id), "limit": 2}
+    ).json()
+    assert [m["body"] for m in newest["messages"]] == ["two", "three"]
+    assert newest["next_cursor"] is not None
+
+    older = authed_client.get(
+        "/messages",
+        params={"peer_id": str(user_b.id), "cursor": newest["next_cursor"]},
+    ).json()
+    assert [m["body"] for m in older["messages"]] == ["one"]
+    assert older["next_cursor"] is None
+
+
+def test_should_search_own_messages_with_snippets(
+    authed_client: TestClient, user_b: FakeUser
+) -> None:
+    for body in ("lunch on friday?", "the friday report", "see you later"):
+        authed_client.post(
+            "/messages/send", params={"peer_id": str(user_b.id), "body": body}
+        )
+
+    first = authed_client.get(
+        "/messages/search", params={"query": "friday", "limit": 1}
+    ).json()
+    assert len(first["hits"]) == 1
+    assert "<mark>friday</mark>" in first["hits"][0]["snippet"]
+    assert first["next_cursor"] is not None
+
+    rest = authed_client.get(
+        "/messages/search", params={"query": "friday", "cursor": first["next_cursor"]}
+    ).json()
+    bodies = {h["message"]["body"] for h in first["hits"] + rest["hits"]}
+    assert bodies == {"lunch on friday?", "the friday report"}
+    assert rest["next_cursor"] is None
+
+
+def test_should_escape_markup_in_search_snippets(
+    authed_client: TestClient, user_b: FakeUser
+) -> None:
+    body = '<img src=x onerror="alert(1)"> friday & more'
+    authed_client.post(
+        "/messages/send", params={"peer_id": str(user_b.id), "body": body}
+    )
+
+    hits = authed_client.get("/messages/search", params={"query": "friday"}).json()[
+        "hits"
+    ]
+
+    assert hits[0]["message"]["body"] == body
+    snippet = hits[0]["snippet"]
+    assert "<mark>friday</mark>" in snippet
+    assert "<" not in snippet.replace("<mark>", "").replace("</mark>", "")
+    assert "&gt;" in snippet
+
+
+def test_should_export_chat_history_as_ndjson(
+    authed_client: TestClient, user_b: FakeUser
+) -> None:
+    for body in ("one", "two", "три"):
+        authed_client.post(
+            "/messages/send", params={"peer_id": str(user_b.id), "body": body}
+        )
+    page = authed_client.get(
+        "/messages", params={"peer_id": str(user_b.id), "limit": 1}
+    ).json()
+    chat_id = page["messages"][0]["chat_id"]
+
+    r = authed_client.get(f"/chats/{chat_id}/export")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["body"] for row in rows] == ["one", "two", "три"]
+    assert all(row["chat_id"] == chat_id for row in rows)
+
+    # a client holding everything up to "two" asks only for what came after
+    held = next(row for row in rows if row["body"] == "two")
+    after = encode_cursor(datetime.fromisoformat(held["created_at"]), UUID(held["id"]))
+    rest = authed_client.get(f"/chats/{chat_id}/export", params={"after": after})
+    assert [json.loads(line)["body"] for line in rest.text.splitlines()] == ["три"]
+
+    assert authed_client.get(f"/chats/{uuid4()}/export").status_code == 404
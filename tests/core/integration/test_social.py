@@ -79,3 +79,90 @@ def test_decline_friend_request(
 
     res = authed_client.post("/friend-requests/decline", json={"to_user_id": user_a.id})
     assert res.status_code == 200
+
+
+def test_should_page_followers(
+    client: TestClient, authed_client: TestClient, user_b: FakeUser
+) -> None:
+    followers = []
+    for _ in range(3):
+        user = FakeUser()
+        r = client.post("/users", json=user.as_create_dict())
+        followers.append(replace(user, username=r.json()["user"]["username"]))
+
+    for follower in followers:
+        login = client.post(
+            "/auth",
+            data={"username": follower.username, "password": follower.password},
+        )
+        token = login.json()["access_token"]
+        res = client.post(
+            "/follow",
+            json={"target_id": user_b.id},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert res.status_code == 200
+
+    login = client.post(
+        "/auth", data={"username": user_b.username, "password": user_b.password}
+    )
+    authed_client.headers.update(
+        {"Authorization": f"Bearer {login.json()['access_token']}"}
+    )
+
+    first = authed_client.get("/followers", params={"limit": 2}).json()
+    assert first["total"] == 3
+    assert len(first["users"]) == 2
+    assert first["next_cursor"]
+
+    second = authed_client.get(
+        "/followers", params={"limit": 2, "cursor": first["next_cursor"]}
+    ).json()
+    assert len(second["users"]) == 1
+    assert second["next_cursor"] is None
+
+
+def test_should_reject_invalid_cursor(authed_client: TestClient) -> None:
+    res = authed_client.get("/followers", params={"cursor": "not-a-cursor"})
+    assert res.status_code == 400
+
+
+def _register_and_login(client: TestClient) -> tuple[str, dict[str, str]]:
+    fake = FakeUser()
+    user = client.post("/users", json=fake.as_create_dict()).json()["user"]
+    r = client.post(
+        "/auth", data={"username": user["username"], "password": fake.password}
+    )
+    return user["id"], {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_should_serve_deck_and_accept_swipe_batch(
+    authed_client: TestClient, user_a: FakeUser
+) -> None:
+    friend_id, friend_auth = _register_and_login(authed_client)
+    candidate_id, candidate_auth = _register_and_login(authed_client)
+
+    authed_client.post("/friend-requests/send", json={"to_user_id": friend_id})
+    authed_client.post(
+        "/friend-requests/accept", json={"to_user_id": user_a.id}, headers=friend_auth
+    )
+    authed_client.post(
+        "/friend-requests/send", json={"to_user_id": candidate_id}, headers=friend_auth
+    )
+    authed_client.post(
+        "/friend-requests/accept",
+        json={"to_user_id": friend_id},
+        headers=candidate_auth,
+    )
+
+    deck = authed_client.get("/suggestions/deck", params={"size": 5})
+    assert deck.status_code == 200
+    body = deck.json()
+    assert [card["id"] for card in body["cards"]] == [candidate_id]
+
+    swipes = authed_client.post(
+        "/suggestions/swipes",
+        json={"deck_token": body["token"], "skipped": [candidate_id, friend_id]},
+    )
+    assert swipes.status_code == 200
+    assert swipes.json() == {"skipped": 1}
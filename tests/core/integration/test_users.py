@@ -47,6 +47,12 @@ def test_should_get_user(client: TestClient) -> None:
     assert user["username"] == username
     assert "mail" not in user
     assert "password" not in user
+    assert get_response.json()["counts"] == {
+        "followers": 0,
+        "following": 0,
+        "friends": 0,
+        "posts": 0,
+    }
 
 
 def test_should_not_get_unknown_user(client: TestClient) -> None:
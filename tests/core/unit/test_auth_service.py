@@ -44,6 +44,17 @@ def test_should_fail_on_token_type_mismatch() -> None:
         service.decode_token(token, expected_type="access")
 
 
+def test_should_issue_ws_ticket_usable_only_as_ticket() -> None:
+    service = AuthService(FakeUserRepo([]), FakeTokenRepo())
+    user = FakeUser()
+
+    ticket = service.create_ws_ticket(str(user.id))
+
+    assert service.decode_token(ticket, expected_type="ws")["sub"] == str(user.id)
+    with pytest.raises(DoesNotExistError):
+        service.decode_token(ticket)
+
+
 def test_should_authenticate_and_generate_tokens() -> None:
     fake = FakeUser()
     raw_password = fake.password
@@ -61,6 +72,19 @@ def test_should_authenticate_and_generate_tokens() -> None:
     assert isinstance(refresh, str)
 
 
+def test_should_rehash_password_made_at_an_older_cost_on_login() -> None:
+    fake = FakeUser()
+    user = fake.as_user()
+    user.password = bcrypt.hashpw(fake.password.encode(), bcrypt.gensalt(4)).decode()
+    service = AuthService(FakeUserRepo([user]), FakeTokenRepo())
+
+    service.authenticate(user.mail, fake.password)
+
+    assert user.password.startswith(f"$2b${service.hasher.rounds:02d}$")
+    assert not service.hasher.needs_rehash(user.password)
+    assert bcrypt.checkpw(fake.password.encode(), user.password.encode())
+
+
 def test_should_fail_auth_on_wrong_password() -> None:
     user = FakeUser().as_user()
     user.password = bcrypt.hashpw(user.password.encode(), bcrypt.gensalt()).decode()
@@ -103,9 +127,13 @@ def test_should_refresh_access_token() -> None:
     service = AuthService(repo, tokens)
 
     refresh = service.create_refresh_token(str(user.id))
-    access = service.refresh_access_token(refresh)
+    access, rotated = service.refresh_access_token(refresh)
 
     assert isinstance(access, str)
+    assert rotated != refresh
+    with pytest.raises(DoesNotExistError):
+        service.refresh_access_token(refresh)
+    assert service.refresh_access_token(rotated)
 
 
 def test_should_not_validate_logged_out_refresh_token() -> None:
@@ -143,6 +171,12 @@ class FakeUserRepo:
                 return u
         return None
 
+    def read_by_login(self, login: str) -> User | None:
+        for u in self.users:
+            if login in (u.username, u.mail):
+                return u
+        return None
+
     def find_by_username(self, username: str) -> User | None:
         for u in self.users:
             if u.username == username:
@@ -152,8 +186,10 @@ class FakeUserRepo:
     def create(self, user: User) -> User:
         return user
 
-    def update(self, user_id: UUID, updates: dict[str, Any]) -> None:  # noqa: ARG002
-        pass
+    def update(self, user_id: UUID, updates: dict[str, Any]) -> None:
+        for u in self.users:
+            if u.id == user_id and "hashed_password" in updates:
+                u.password = updates["hashed_password"]
 
     def read_many_by_ids(self, ids: list[UUID]) -> list[User]:  # noqa: ARG002
         return []
@@ -171,3 +207,6 @@ class FakeTokenRepo:
 
     def delete(self, jti: UUID) -> None:
         self.db.pop(jti, None)
+
+    def consume(self, jti: UUID) -> bool:
+        return self.db.pop(jti, None) is not None
@@ -0,0 +1,50 @@
+from dataclasses import replace
+from typing import Any
+
+from src.core.social import UserCounts
+from src.infra.models.counter import UserCounter
+from src.infra.repositories.counters import CounterRepository
+from src.infra.repositories.personal_post.posts import PostRepository
+from src.infra.repositories.social import FollowRepository
+from src.infra.repositories.users import UserRepository
+from tests.fake import FakePersonalPost, FakeUser
+
+
+def test_should_count_posts_on_create_and_delete(db_session: Any) -> None:
+    user = UserRepository(db_session).create(FakeUser().as_user())
+    posts = PostRepository(db_session)
+    counters = CounterRepository(db_session)
+
+    first = posts.create(replace(FakePersonalPost(), user_id=user.id).as_post())
+    posts.create(replace(FakePersonalPost(), user_id=user.id).as_post())
+    assert counters.get(user.id).posts == 2
+
+    posts.delete(first.id)
+    assert counters.get(user.id).posts == 1
+
+
+def test_should_return_zero_counts_for_user_without_row(db_session: Any) -> None:
+    user = UserRepository(db_session).create(FakeUser().as_user())
+
+    assert CounterRepository(db_session).get(user.id) == UserCounts()
+
+
+def test_should_reconcile_drifted_counters(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    follower = user_repo.create(FakeUser().as_user())
+    FollowRepository(db_session).follow(follower.id, user.id)
+    PostRepository(db_session).create(
+        replace(FakePersonalPost(), user_id=user.id).as_post()
+    )
+
+    db_session.get(UserCounter, user.id).followers = 42
+    db_session.commit()
+
+    counters = CounterRepository(db_session)
+    fixed = counters.reconcile(batch_size=1)
+
+    assert fixed >= 1
+    assert counters.get(user.id) == UserCounts(followers=1, posts=1)
+    assert counters.get(follower.id) == UserCounts(following=1)
+    assert counters.reconcile() == 0
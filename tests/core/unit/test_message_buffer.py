@@ -0,0 +1,116 @@
+import asyncio
+from uuid import uuid4
+
+from src.core.messenger import Message, OutgoingMessage
+from src.infra.services.message_buffer import MessageWriteBuffer
+from src.infra.services.offload import BlockingOffload
+
+
+class _WriterStub:
+    def __init__(self) -> None:
+        self.batches: list[list[OutgoingMessage]] = []
+        self.chat_id = uuid4()
+
+    def __call__(self, batch: list[OutgoingMessage]) -> list[Message]:
+        self.batches.append(batch)
+        return [
+            Message(
+                id=m.id,
+                chat_id=self.chat_id,
+                sender_id=m.sender_id,
+                body=m.body,
+                created_at=m.created_at,
+            )
+            for m in batch
+        ]
+
+
+def test_should_group_messages_into_one_flush() -> None:
+    writer = _WriterStub()
+    buffer = MessageWriteBuffer(writer, BlockingOffload(), window_ms=20)
+    sender, peer = uuid4(), uuid4()
+
+    async def scenario() -> list[Message]:
+        sent = await asyncio.gather(
+            *(buffer.submit(sender, peer, str(i)) for i in range(5))
+        )
+        await buffer.close()
+        return list(sent)
+
+    sent = asyncio.run(scenario())
+
+    assert len(writer.batches) == 1
+    assert [m.body for m in writer.batches[0]] == ["0", "1", "2", "3", "4"]
+    assert all(m.chat_id == writer.chat_id for m in sent)
+
+
+def test_should_ack_queued_messages_once_chat_is_known() -> None:
+    writer = _WriterStub()
+    buffer = MessageWriteBuffer(writer, BlockingOffload(), window_ms=20, ack="queued")
+    sender, peer = uuid4(), uuid4()
+
+    async def scenario() -> None:
+        await buffer.submit(sender, peer, "first")
+        queued = await buffer.submit(peer, sender, "second")
+
+        assert queued.chat_id == writer.chat_id
+        assert len(writer.batches) == 1
+
+        await buffer.close()
+
+    asyncio.run(scenario())
+
+    assert [m.body for batch in writer.batches for m in batch] == ["first", "second"]
+
+
+class _FailingPeerWriter(_WriterStub):
+    def __init__(self) -> None:
+        super().__init__()
+        self.bad_peer = uuid4()
+
+    def __call__(self, batch: list[OutgoingMessage]) -> list[Message]:
+        if any(m.peer_id == self.bad_peer for m in batch):
+            raise ValueError("unknown peer")
+        return super().__call__(batch)
+
+
+def test_should_fail_only_the_bad_message_of_a_batch() -> None:
+    writer = _FailingPeerWriter()
+    buffer = MessageWriteBuffer(writer, BlockingOffload(), window_ms=20)
+    sender, peer = uuid4(), uuid4()
+
+    async def scenario() -> list[Message | BaseException]:
+        sent = await asyncio.gather(
+            buffer.submit(sender, peer, "ok"),
+            buffer.submit(sender, writer.bad_peer, "bad"),
+            buffer.submit(peer, sender, "also ok"),
+            return_exceptions=True,
+        )
+        await buffer.close()
+        return list(sent)
+
+    ok, bad, also_ok = asyncio.run(scenario())
+
+    assert isinstance(bad, ValueError)
+    assert isinstance(ok, Message)
+    assert isinstance(also_ok, Message)
+    assert [m.body for batch in writer.batches for m in batch] == ["ok", "also ok"]
+
+
+def test_should_keep_queued_messages_when_a_neighbour_fails() -> None:
+    writer = _FailingPeerWriter()
+    buffer = MessageWriteBuffer(writer, BlockingOffload(), window_ms=20, ack="queued")
+    sender, peer = uuid4(), uuid4()
+
+    async def scenario() -> None:
+        await buffer.submit(sender, peer, "first")
+        await asyncio.gather(
+            buffer.submit(peer, sender, "queued"),
+            buffer.submit(sender, writer.bad_peer, "bad"),
+            return_exceptions=True,
+        )
+        await buffer.close()
+
+    asyncio.run(scenario())
+
+    assert [m.body for batch in writer.batches for m in batch] == ["first", "queued"]
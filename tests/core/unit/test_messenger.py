@@ -0,0 +1,363 @@
+import gzip
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import text
+
+from src.core.messenger import OutgoingMessage
+from src.infra.models.messenger import ChatMember
+from src.infra.repositories.message_partitions import MessagePartitionRepository
+from src.infra.repositories.messenger import ChatRepository, MessageRepository
+from src.infra.repositories.users import UserRepository
+from tests.fake import FakeUser
+
+
+def test_should_append_message_creating_chat_once(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    peer = user_repo.create(FakeUser().as_user())
+
+    chats = ChatRepository(db_session)
+    first = chats.append_message(user.id, peer.id, "hi")
+    second = chats.append_message(peer.id, user.id, "hey")
+
+    assert first.chat_id == second.chat_id
+    chat = chats.get(first.chat_id)
+    assert chat is not None
+    assert chat.last_message_id == second.id
+    assert chat.last_message_at == second.created_at
+
+    messages = (
+        MessageRepository(db_session).list_by_chat(first.chat_id, limit=10).messages
+    )
+    assert [m.body for m in messages] == ["hi", "hey"]
+    assert [m.sender_id for m in messages] == [user.id, peer.id]
+
+
+def test_should_keep_a_single_member_for_self_chats(db_session: Any) -> None:
+    user = UserRepository(db_session).create(FakeUser().as_user())
+    chats = ChatRepository(db_session)
+
+    created = chats.get_or_create(user.id, user.id)
+    sent = chats.append_message(user.id, user.id, "note to self")
+    [batched] = chats.append_messages(
+        [OutgoingMessage(sender_id=user.id, peer_id=user.id, body="another")]
+    )
+
+    assert sent.chat_id == batched.chat_id == created.id
+    [member] = db_session.query(ChatMember).filter_by(chat_id=created.id).all()
+    assert member.user_id == user.id
+    assert member.unread == 0
+
+
+def test_should_group_commit_messages_across_chats(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    peer = user_repo.create(FakeUser().as_user())
+    other = user_repo.create(FakeUser().as_user())
+
+    chats = ChatRepository(db_session)
+    existing = chats.append_message(user.id, peer.id, "first")
+    batch = [
+        OutgoingMessage(sender_id=peer.id, peer_id=user.id, body="a"),
+        OutgoingMessage(sender_id=user.id, peer_id=other.id, body="b"),
+        OutgoingMessage(sender_id=user.id, peer_id=peer.id, body="c"),
+    ]
+
+    written = chats.append_messages(batch)
+
+    assert [m.id for m in written] == [m.id for m in batch]
+    assert written[0].chat_id == written[2].chat_id == existing.chat_id
+    assert written[1].chat_id != existing.chat_id
+    chat = chats.get(existing.chat_id)
+    assert chat is not None
+    assert chat.last_message_id == batch[2].id
+
+    messages = (
+        MessageRepository(db_session).list_by_chat(existing.chat_id, limit=10).messages
+    )
+    assert [m.body for m in messages] == ["first", "a", "c"]
+
+
+def test_should_track_unread_counters_per_participant(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    peer = user_repo.create(FakeUser().as_user())
+    other = user_repo.create(FakeUser().as_user())
+
+    chats = ChatRepository(db_session)
+    messages = MessageRepository(db_session)
+    first = chats.append_message(peer.id, user.id, "one")
+    chats.append_messages(
+        [
+            OutgoingMessage(sender_id=peer.id, peer_id=user.id, body="two"),
+            OutgoingMessage(sender_id=other.id, peer_id=user.id, body="three"),
+            OutgoingMessage(sender_id=user.id, peer_id=peer.id, body="reply"),
+        ]
+    )
+
+    assert messages.unread_count(first.chat_id, user.id) == 2
+    assert messages.unread_count(first.chat_id, peer.id) == 1
+    assert chats.total_unread(user.id) == 3
+
+    [summary] = [
+        s for s in chats.list_for_user(user.id, limit=10).chats if s.peer_id == peer.id
+    ]
+    assert summary.unread_count == 2
+
+    receipt = messages.mark_seen_for_user(first.chat_id, user.id)
+    assert receipt is not None
+    assert receipt.updated == 2
+    assert receipt.peer_id == peer.id
+    assert messages.unread_count(first.chat_id, user.id) == 0
+    assert chats.total_unread(user.id) == 1
+
+
+def test_should_move_read_watermark_forward_only(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    peer = user_repo.create(FakeUser().as_user())
+
+    chats = ChatRepository(db_session)
+    messages = MessageRepository(db_session)
+    sent = [chats.append_message(peer.id, user.id, str(i)) for i in range(3)]
+    chat_id = sent[0].chat_id
+
+    receipt = messages.mark_seen_for_user(
+        chat_id, user.id, up_to=(sent[1].created_at, sent[1].id)
+    )
+    assert receipt is not None
+    assert receipt.updated == 2
+    assert receipt.last_read_message_id == sent[1].id
+    assert messages.unread_count(chat_id, user.id) == 1
+    assert (
+        messages.mark_seen_for_user(
+            chat_id, user.id, up_to=(sent[0].created_at, sent[0].id)
+        )
+        is None
+    )
+
+    is_a = chats.get(chat_id).user_a_id == user.id  # type: ignore[union-attr]
+    history = messages.list_by_chat(chat_id, limit=10).messages
+    seen = [m.seen_at_user_a if is_a else m.seen_at_user_b for m in history]
+    assert seen == [receipt.read_at, receipt.read_at, None]
+    assert all(
+        (m.seen_at_user_b if is_a else m.seen_at_user_a) is None for m in history
+    )
+
+
+def test_should_list_inbox_newest_first_with_preview(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    peers = [user_repo.create(FakeUser().as_user()) for _ in range(3)]
+
+    chats = ChatRepository(db_session)
+    for peer in peers:
+        chats.append_message(peer.id, user.id, "x" * 500)
+    latest = chats.append_message(user.id, peers[0].id, "latest")
+
+    page = chats.list_for_user(user.id, limit=2)
+    inbox = page.chats
+
+    assert [s.peer_id for s in inbox] == [peers[0].id, peers[2].id]
+    assert inbox[0].last_body == "latest"
+    assert inbox[0].chat.last_message_sender_id == user.id
+    assert inbox[1].last_body == "x" * 120
+    assert page.next_cursor is not None
+
+    older = chats.list_for_user(user.id, limit=5, after=page.next_cursor)
+    assert [s.peer_id for s in older.chats] == [peers[1].id]
+    assert older.next_cursor is None
+    assert latest.chat_id == inbox[0].chat.id
+
+
+def test_should_skip_muted_chats_in_unread_total(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    peer = user_repo.create(FakeUser().as_user())
+    other = user_repo.create(FakeUser().as_user())
+
+    chats = ChatRepository(db_session)
+    muted = chats.append_message(peer.id, user.id, "noise")
+    chats.append_message(other.id, user.id, "hello")
+    db_session.get(ChatMember, (muted.chat_id, user.id)).muted = True
+    db_session.commit()
+
+    assert chats.total_unread(user.id) == 1
+    [summary] = [s for s in chats.list_for_user(user.id, limit=10).chats if s.muted]
+    assert summary.peer_id == peer.id
+
+
+def test_should_find_chat_peers_among_users(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    peer = user_repo.create(FakeUser().as_user())
+    other = user_repo.create(FakeUser().as_user())
+    stranger = user_repo.create(FakeUser().as_user())
+
+    chats = ChatRepository(db_session)
+    chats.append_message(user.id, peer.id, "hi")
+    chats.append_message(other.id, user.id, "hello")
+    chats.append_message(peer.id, stranger.id, "psst")
+
+    among = [peer.id, other.id, stranger.id, user.id]
+    assert chats.peer_ids(user.id, among) == {peer.id, other.id}
+    assert chats.peer_ids(stranger.id, [user.id]) == set()
+
+
+def test_should_page_history_by_keyset_in_both_directions(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    peer = user_repo.create(FakeUser().as_user())
+
+    chats = ChatRepository(db_session)
+    same_instant = datetime(2026, 1, 1, 12, 0)
+    written = chats.append_messages(
+        [
+            OutgoingMessage(
+                sender_id=user.id, peer_id=peer.id, body=str(n), created_at=same_instant
+            )
+            for n in range(5)
+        ]
+    )
+    order = sorted(written, key=lambda m: m.id)
+    chat_id = written[0].chat_id
+    messages = MessageRepository(db_session)
+
+    newest = messages.list_by_chat(chat_id, limit=2)
+    assert [m.id for m in newest.messages] == [m.id for m in order[3:]]
+    assert newest.next_cursor == (same_instant, order[3].id)
+
+    older = messages.list_by_chat(chat_id, limit=10, before=newest.next_cursor)
+    assert [m.id for m in older.messages] == [m.id for m in order[:3]]
+    assert older.next_cursor is None
+
+    newer = messages.list_by_chat(chat_id, limit=2, after=(same_instant, order[0].id))
+    assert [m.id for m in newer.messages] == [m.id for m in order[1:3]]
+    assert newer.next_cursor == (same_instant, order[2].id)
+
+
+def test_should_search_only_chats_the_user_belongs_to(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    peer = user_repo.create(FakeUser().as_user())
+    stranger = user_repo.create(FakeUser().as_user())
+
+    chats = ChatRepository(db_session)
+    chats.append_message(user.id, peer.id, "deploy the release tonight")
+    chats.append_message(peer.id, user.id, "release release release notes")
+    chats.append_message(peer.id, user.id, "nothing relevant")
+    chats.append_message(stranger.id, peer.id, "secret release plans")
+    messages = MessageRepository(db_session)
+
+    page = messages.search(user.id, "release", limit=1)
+    assert [h.message.body for h in page.hits] == ["release release release notes"]
+    assert page.hits[0].snippet.startswith("<mark>release</mark>")
+    assert page.next_cursor is not None
+
+    rest = messages.search(user.id, "release", limit=5, after=page.next_cursor)
+    assert [h.message.body for h in rest.hits] == ["deploy the release tonight"]
+    assert rest.next_cursor is None
+
+    assert messages.search(user.id, '"release plans"', limit=5).hits == []
+    assert len(messages.search(peer.id, '"release plans"', limit=5).hits) == 1
+
+
+def test_should_skip_partition_maintenance_on_plain_table(db_session: Any) -> None:
+    partitions = MessagePartitionRepository(db_session)
+
+    assert not partitions.is_partitioned()
+    assert partitions.ensure_future(3) == []
+
+
+def test_should_create_and_archive_monthly_partitions(
+    db_session: Any, tmp_path: Path
+) -> None:
+    db_session.execute(
+        text(
+            "CREATE TABLE partitioned_messages (id int, created_at timestamp)"
+            " PARTITION BY RANGE (created_at)"
+        )
+    )
+    partitions = MessagePartitionRepository(db_session, table="partitioned_messages")
+
+    created = partitions.ensure_future(2, today=date(2025, 12, 15))
+    assert created == [
+        "partitioned_messages_y2025m12",
+        "partitioned_messages_y2026m01",
+        "partitioned_messages_y2026m02",
+    ]
+    assert partitions.ensure_future(2, today=date(2026, 1, 2)) == [
+        "partitioned_messages_y2026m03"
+    ]
+
+    db_session.execute(
+        text(
+            "INSERT INTO partitioned_messages VALUES"
+            " (1, '2025-12-31 23:59'), (2, '2026-01-01 00:00')"
+        )
+    )
+    [archived] = partitions.archive(date(2026, 1, 20), tmp_path)
+
+    assert archived.name == "partitioned_messages_y2025m12.csv.gz"
+    with gzip.open(archived, "rt") as f:
+        assert f.read().splitlines() == ["id,created_at", "1,2025-12-31 23:59:00"]
+    assert partitions.list_months() == [
+        date(2026, 1, 1),
+        date(2026, 2, 1),
+        date(2026, 3, 1),
+    ]
+    assert db_session.scalar(text("SELECT count(*) FROM partitioned_messages")) == 1
+
+
+def test_should_move_default_partition_rows_into_new_month(db_session: Any) -> None:
+    db_session.execute(
+        text(
+            "CREATE TABLE partitioned_messages (id int, created_at timestamp,"
+            " doubled int GENERATED ALWAYS AS (id * 2) STORED)"
+            " PARTITION BY RANGE (created_at)"
+        )
+    )
+    db_session.execute(
+        text(
+            "CREATE TABLE partitioned_messages_default"
+            " PARTITION OF partitioned_messages DEFAULT"
+        )
+    )
+    db_session.execute(
+        text(
+            "INSERT INTO partitioned_messages (id, created_at) VALUES"
+            " (1, '2026-02-03 10:00'), (2, '2027-01-01 00:00')"
+        )
+    )
+    partitions = MessagePartitionRepository(db_session, table="partitioned_messages")
+
+    assert partitions.ensure_future(1, today=date(2026, 1, 10)) == [
+        "partitioned_messages_y2026m01",
+        "partitioned_messages_y2026m02",
+    ]
+    assert db_session.execute(
+        text("SELECT id, doubled FROM partitioned_messages_y2026m02")
+    ).all() == [(1, 2)]
+    assert db_session.scalars(
+        text("SELECT id FROM partitioned_messages_default")
+    ).all() == [2]
+
+
+def test_should_create_later_months_when_one_fails(db_session: Any) -> None:
+    db_session.execute(
+        text(
+            "CREATE TABLE partitioned_messages (id int, created_at timestamp)"
+            " PARTITION BY RANGE (created_at)"
+        )
+    )
+    # a stray table squatting on January's partition name
+    db_session.execute(text("CREATE TABLE partitioned_messages_y2026m01 (id int)"))
+    partitions = MessagePartitionRepository(db_session, table="partitioned_messages")
+
+    assert partitions.ensure_future(2, today=date(2025, 12, 1)) == [
+        "partitioned_messages_y2025m12",
+        "partitioned_messages_y2026m02",
+    ]
+    assert partitions.list_months() == [date(2025, 12, 1), date(2026, 2, 1)]
@@ -0,0 +1,24 @@
+from src.infra.services.metrics import Metrics
+
+
+def test_should_render_counters_gauges_and_timings() -> None:
+    registry = Metrics()
+    depth = [3]
+    registry.inc("ws_frames_sent_total")
+    registry.inc("ws_frames_sent_total", 2)
+    registry.inc("ws_events_dropped_total", policy="drop")
+    registry.gauge("ws_send_queue_depth", lambda: depth[0])
+    registry.observe("hash_seconds", 0.25, op="verify")
+    registry.observe("hash_seconds", 0.75, op="verify")
+    depth[0] = 5
+
+    assert registry.value("ws_frames_sent_total") == 3
+    assert registry.value("ws_send_queue_depth") == 5
+    assert registry.render().splitlines() == [
+        'ws_events_dropped_total{policy="drop"} 1',
+        "ws_frames_sent_total 3",
+        "ws_send_queue_depth 5",
+        'hash_seconds_count{op="verify"} 2',
+        'hash_seconds_sum{op="verify"} 1',
+        'hash_seconds_max{op="verify"} 0.75',
+    ]
@@ -0,0 +1,36 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.core.errors import OverloadedError
+from src.infra.services.offload import BlockingOffload
+
+
+def test_should_run_blocking_call_off_the_event_loop() -> None:
+    offload = BlockingOffload(max_workers=1, max_pending=4)
+
+    async def scenario() -> str:
+        return await offload.run(lambda: threading.current_thread().name)
+
+    assert asyncio.run(scenario()).startswith("db-offload")
+    offload.shutdown()
+
+
+def test_should_reject_calls_beyond_pending_limit() -> None:
+    offload = BlockingOffload(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario() -> None:
+        first = asyncio.create_task(offload.run(release.wait, 5))
+        await asyncio.sleep(0)
+
+        with pytest.raises(OverloadedError):
+            await offload.run(lambda: None)
+
+        release.set()
+        assert await first is True
+        assert offload.pending == 0
+
+    asyncio.run(scenario())
+    offload.shutdown()
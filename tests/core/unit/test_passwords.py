@@ -0,0 +1,41 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.core.errors import OverloadedError
+from src.infra.services.metrics import metrics
+from src.infra.services.passwords import PasswordHasher
+
+
+def test_should_hash_and_check_on_the_pool() -> None:
+    hasher = PasswordHasher(rounds=4, workers=1)
+
+    hashed = hasher.hash("secret")
+
+    assert hashed.startswith("$2b$04$")
+    assert hasher.check("secret", hashed)
+    assert not hasher.check("wrong", hashed)
+    assert not hasher.needs_rehash(hashed)
+    assert PasswordHasher(rounds=5).needs_rehash(hashed)
+    assert 'password_queue_seconds_count{op="check"}' in metrics.render()
+    hasher.shutdown()
+
+
+def test_should_reject_checks_beyond_pending_limit() -> None:
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=1)
+    release = threading.Event()
+    hashed = hasher.hash("secret")
+
+    with ThreadPoolExecutor(max_workers=1) as caller:
+        blocked = caller.submit(hasher._run, "check", release.wait)
+        while hasher.pending == 0:
+            pass
+
+        with pytest.raises(OverloadedError):
+            hasher.check("secret", hashed)
+
+        release.set()
+        assert blocked.result() is True
+    assert hasher.pending == 0
+    hasher.shutdown()
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+from fastapi import Request
+
+from src.core.errors import RateLimitedError
+from src.infra.fastapi.utils import client_ip
+from src.infra.services.metrics import metrics
+from src.infra.services.rate_limit import LocalRateLimitStore, RateLimit, RateLimiter
+
+
+def test_should_allow_burst_then_refill() -> None:
+    store = LocalRateLimitStore()
+
+    assert [store.take(["k"], rate=20, burst=3) for _ in range(3)] == [0.0] * 3
+    wait = store.take(["k"], rate=20, burst=3)
+    assert 0 < wait <= 0.05
+
+    time.sleep(wait)
+    assert store.take(["k"], rate=20, burst=3) == 0.0
+
+
+def test_should_take_from_every_key_or_none() -> None:
+    store = LocalRateLimitStore()
+    store.take(["ip"], rate=1, burst=1)
+
+    assert store.take(["ip", "account"], rate=1, burst=1) > 0
+    assert store.take(["account"], rate=1, burst=1) == 0.0
+
+
+def test_should_reject_with_retry_after_and_count_it() -> None:
+    limiter = RateLimiter(LocalRateLimitStore())
+    rule = RateLimit("test-login", per_minute=2)
+
+    limiter.check(rule, ip="1.2.3.4", account="alice")
+    limiter.check(rule, ip="1.2.3.4", account="bob")
+    with pytest.raises(RateLimitedError) as err:
+        limiter.check(rule, ip="1.2.3.4", account="carol")
+
+    assert 0 < err.value.retry_after <= 30
+    assert metrics.value("rate_limited_total", rule="test-login") == 1
+    limiter.check(rule, ip="5.6.7.8", account="carol")
+
+
+def _request(forwarded_for: str | None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.2", 50000)})
+
+
+def test_should_take_client_ip_from_trusted_proxy_hops() -> None:
+    # the client sent "6.6.6.6" itself; the proxy appended what it saw
+    request = _request("6.6.6.6, 1.2.3.4")
+
+    assert client_ip(request, proxy_hops=0) == "10.0.0.2"
+    assert client_ip(request, proxy_hops=1) == "1.2.3.4"
+    assert client_ip(request, proxy_hops=2) == "6.6.6.6"
+
+
+def test_should_ignore_forwarded_for_shorter_than_the_proxy_chain() -> None:
+    assert client_ip(_request("6.6.6.6"), proxy_hops=2) == "10.0.0.2"
+    assert client_ip(_request(None), proxy_hops=1) == "10.0.0.2"
@@ -1,6 +1,14 @@
+from datetime import datetime, timedelta
 from typing import Any
 
-from src.infra.repositories.social import FollowRepository, FriendRepository
+from src.core.social import FriendStatus, UserCounts
+from src.infra.models.friend import SuggestionSkip
+from src.infra.repositories.counters import CounterRepository
+from src.infra.repositories.social import (
+    FollowRepository,
+    FriendRepository,
+    SuggestionSkipRepository,
+)
 from src.infra.repositories.users import UserRepository
 from tests.fake import FakeUser
 
@@ -94,3 +102,170 @@ def test_should_return_incoming_friend_requests(db_session: Any) -> None:
     requests = repo.get_requests_to(receiver.id)
 
     assert sender.id in requests
+
+
+def test_should_resolve_friend_statuses_in_bulk(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    friend = user_repo.create(FakeUser().as_user())
+    outgoing = user_repo.create(FakeUser().as_user())
+    incoming = user_repo.create(FakeUser().as_user())
+    stranger = user_repo.create(FakeUser().as_user())
+
+    repo = FriendRepository(db_session)
+    repo.send_request(user.id, friend.id)
+    repo.accept_request(user.id, friend.id)
+    repo.send_request(user.id, outgoing.id)
+    repo.send_request(incoming.id, user.id)
+
+    statuses = repo.get_friend_statuses(
+        user.id, [friend.id, outgoing.id, incoming.id, stranger.id]
+    )
+
+    assert statuses == {
+        friend.id: FriendStatus.FRIENDS,
+        outgoing.id: FriendStatus.PENDING_OUTGOING,
+        incoming.id: FriendStatus.PENDING_INCOMING,
+    }
+
+
+def test_should_count_mutual_friends_in_bulk(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    mutual = user_repo.create(FakeUser().as_user())
+    other = user_repo.create(FakeUser().as_user())
+    stranger = user_repo.create(FakeUser().as_user())
+
+    repo = FriendRepository(db_session)
+    for a, b in [(user, mutual), (other, mutual)]:
+        repo.send_request(a.id, b.id)
+        repo.accept_request(a.id, b.id)
+
+    counts = repo.get_mutual_friend_counts(user.id, [other.id, stranger.id])
+
+    assert counts == {other.id: 1}
+
+
+def test_should_return_following_among_ids(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    followed = user_repo.create(FakeUser().as_user())
+    not_followed = user_repo.create(FakeUser().as_user())
+
+    repo = FollowRepository(db_session)
+    repo.follow(user.id, followed.id)
+
+    assert repo.get_following_among(user.id, [followed.id, not_followed.id]) == {
+        followed.id
+    }
+
+
+def test_should_page_followers_with_cursor(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    followers = [user_repo.create(FakeUser().as_user()) for _ in range(3)]
+
+    repo = FollowRepository(db_session)
+    for follower in followers:
+        repo.follow(follower.id, user.id)
+
+    first = repo.list_followers(user.id, limit=2)
+    second = repo.list_followers(user.id, limit=2, after=first.next_cursor)
+
+    assert len(first.users) == 2
+    assert first.next_cursor is not None
+    assert len(second.users) == 1
+    assert second.next_cursor is None
+    assert {u.id for u in first.users + second.users} == {f.id for f in followers}
+    assert all(u.mail == "" and u.password == "" for u in first.users)
+
+
+def test_should_keep_counters_in_sync_with_edges(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    other = user_repo.create(FakeUser().as_user())
+
+    follow_repo = FollowRepository(db_session)
+    friend_repo = FriendRepository(db_session)
+    counters = CounterRepository(db_session)
+
+    follow_repo.follow(user.id, other.id)
+    friend_repo.send_request(user.id, other.id)
+    friend_repo.accept_request(user.id, other.id)
+
+    assert counters.get(user.id) == UserCounts(following=1, friends=1)
+    assert counters.get(other.id) == UserCounts(followers=1, friends=1)
+
+    follow_repo.unfollow(user.id, other.id)
+    follow_repo.unfollow(user.id, other.id)
+
+    assert counters.get(user.id).following == 0
+    assert counters.get(other.id).followers == 0
+
+
+def test_should_suggest_friends_of_friends_excluding_skips(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    friend = user_repo.create(FakeUser().as_user())
+    candidate = user_repo.create(FakeUser().as_user())
+    skipped = user_repo.create(FakeUser().as_user())
+    expired = user_repo.create(FakeUser().as_user())
+    requested = user_repo.create(FakeUser().as_user())
+
+    repo = FriendRepository(db_session)
+    repo.send_request(user.id, friend.id)
+    repo.accept_request(user.id, friend.id)
+    for other in [candidate, skipped, expired, requested]:
+        repo.send_request(friend.id, other.id)
+        repo.accept_request(friend.id, other.id)
+    repo.send_request(requested.id, user.id)
+
+    SuggestionSkipRepository(db_session).skip(user.id, skipped.id)
+    db_session.add(
+        SuggestionSkip(user.id, expired.id, datetime.now() - timedelta(days=1))
+    )
+    db_session.commit()
+
+    candidates = repo.get_suggestion_candidates(user.id, limit=10)
+
+    assert candidates == {candidate.id: 1, expired.id: 1}
+    assert len(repo.get_suggestion_candidates(user.id, limit=1)) == 1
+    assert repo.get_suggestion_candidates(user.id, limit=None) == candidates
+
+
+def test_should_purge_only_expired_skips(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    active = user_repo.create(FakeUser().as_user())
+    stale = user_repo.create(FakeUser().as_user())
+
+    repo = SuggestionSkipRepository(db_session)
+    repo.skip(user.id, active.id)
+    db_session.add(
+        SuggestionSkip(user.id, stale.id, datetime.now() - timedelta(days=1))
+    )
+    db_session.commit()
+
+    assert repo.get_skipped_ids(user.id) == {active.id}
+    assert repo.purge_expired(batch_size=1) == 1
+    assert db_session.query(SuggestionSkip).count() == 1
+
+
+def test_should_skip_only_valid_targets_in_batch(db_session: Any) -> None:
+    user_repo = UserRepository(db_session)
+    user = user_repo.create(FakeUser().as_user())
+    stranger = user_repo.create(FakeUser().as_user())
+    followed = user_repo.create(FakeUser().as_user())
+    friend = user_repo.create(FakeUser().as_user())
+
+    FollowRepository(db_session).follow(user.id, followed.id)
+    friend_repo = FriendRepository(db_session)
+    friend_repo.send_request(user.id, friend.id)
+    friend_repo.accept_request(user.id, friend.id)
+
+    repo = SuggestionSkipRepository(db_session)
+    targets = [stranger.id, followed.id, friend.id, user.id]
+
+    assert repo.skip_many(user.id, targets, ttl_days=30) == 1
+    assert repo.skip_many(user.id, targets, ttl_days=30) == 1
+    assert repo.get_skipped_ids(user.id) == {stranger.id}
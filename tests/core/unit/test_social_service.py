@@ -1,10 +1,11 @@
+from typing import Any
 from unittest.mock import Mock
 from uuid import UUID, uuid4
 
 import pytest
 
 from src.core.errors import DoesNotExistError, ExistsError, ForbiddenError
-from src.core.social import FriendStatus
+from src.core.social import FriendStatus, SocialUser
 from src.infra.services.social import SocialService
 from tests.fake import FakeUser
 
@@ -22,14 +23,16 @@ def test_should_follow_user() -> None:
     )
     follow_repo.get.return_value = None
 
-    service = SocialService(follow_repo, friend_repo, user_repo, Mock(), Mock(), Mock())
+    service = SocialService(
+        follow_repo, friend_repo, user_repo, Mock(), Mock(), Mock(), Mock()
+    )
     service.follow(user.id, target.id)
 
     follow_repo.follow.assert_called_once_with(user.id, target.id)
 
 
 def test_should_fail_follow_self() -> None:
-    service = SocialService(Mock(), Mock(), Mock(), Mock(), Mock(), Mock())
+    service = SocialService(Mock(), Mock(), Mock(), Mock(), Mock(), Mock(), Mock())
     user = FakeUser().as_user()
 
     with pytest.raises(ForbiddenError):
@@ -41,7 +44,9 @@ def test_should_fail_follow_if_user_not_found() -> None:
     user_repo = Mock()
     user_repo.read_by.return_value = None
 
-    service = SocialService(follow_repo, Mock(), user_repo, Mock(), Mock(), Mock())
+    service = SocialService(
+        follow_repo, Mock(), user_repo, Mock(), Mock(), Mock(), Mock()
+    )
 
     with pytest.raises(DoesNotExistError):
         service.follow(uuid4(), uuid4())
@@ -58,7 +63,9 @@ def test_should_fail_follow_if_already_following() -> None:
     user_repo.read_by.return_value = target
     follow_repo.get.return_value = True
 
-    service = SocialService(follow_repo, friend_repo, user_repo, Mock(), Mock(), Mock())
+    service = SocialService(
+        follow_repo, friend_repo, user_repo, Mock(), Mock(), Mock(), Mock()
+    )
 
     with pytest.raises(ExistsError):
         service.follow(user.id, target.id)
@@ -76,14 +83,16 @@ def test_should_send_friend_request() -> None:
     friend_repo.get_friend.return_value = None
     friend_repo.get_request.return_value = None
 
-    service = SocialService(follow_repo, friend_repo, user_repo, Mock(), Mock(), Mock())
+    service = SocialService(
+        follow_repo, friend_repo, user_repo, Mock(), Mock(), Mock(), Mock()
+    )
     service.send_friend_request(sender.id, receiver.id)
 
     friend_repo.send_request.assert_called_once_with(sender.id, receiver.id)
 
 
 def test_should_fail_send_friend_request_to_self() -> None:
-    service = SocialService(Mock(), Mock(), Mock(), Mock(), Mock(), Mock())
+    service = SocialService(Mock(), Mock(), Mock(), Mock(), Mock(), Mock(), Mock())
     user = FakeUser().as_user()
 
     with pytest.raises(ForbiddenError):
@@ -95,7 +104,7 @@ def test_should_fail_send_friend_request_if_user_not_found() -> None:
     user_repo = Mock()
     user_repo.read_by.return_value = None
 
-    service = SocialService(Mock(), Mock(), user_repo, Mock(), Mock(), Mock())
+    service = SocialService(Mock(), Mock(), user_repo, Mock(), Mock(), Mock(), Mock())
 
     with pytest.raises(DoesNotExistError):
         service.send_friend_request(user.id, uuid4())
@@ -110,7 +119,9 @@ def test_should_fail_send_friend_request_if_already_friends() -> None:
     user_repo = Mock()
     user_repo.read_by.return_value = receiver
 
-    service = SocialService(Mock(), friend_repo, user_repo, Mock(), Mock(), Mock())
+    service = SocialService(
+        Mock(), friend_repo, user_repo, Mock(), Mock(), Mock(), Mock()
+    )
 
     with pytest.raises(ExistsError):
         service.send_friend_request(sender.id, receiver.id)
@@ -126,7 +137,9 @@ def test_should_fail_send_friend_request_if_already_requested() -> None:
     user_repo = Mock()
     user_repo.read_by.return_value = receiver
 
-    service = SocialService(Mock(), friend_repo, user_repo, Mock(), Mock(), Mock())
+    service = SocialService(
+        Mock(), friend_repo, user_repo, Mock(), Mock(), Mock(), Mock()
+    )
 
     with pytest.raises(ExistsError):
         service.send_friend_request(sender.id, receiver.id)
@@ -142,7 +155,9 @@ def test_should_accept_friend_request() -> None:
     user_repo = Mock()
     user_repo.read_by.return_value = sender
 
-    service = SocialService(Mock(), friend_repo, user_repo, Mock(), Mock(), Mock())
+    service = SocialService(
+        Mock(), friend_repo, user_repo, Mock(), Mock(), Mock(), Mock()
+    )
     service.accept_friend_request(sender.id, receiver.id)
 
     friend_repo.accept_request.assert_called_once_with(sender.id, receiver.id)
@@ -150,7 +165,7 @@ def test_should_accept_friend_request() -> None:
 
 def test_should_fail_accept_own_friend_request() -> None:
     user = FakeUser().as_user()
-    service = SocialService(Mock(), Mock(), Mock(), Mock(), Mock(), Mock())
+    service = SocialService(Mock(), Mock(), Mock(), Mock(), Mock(), Mock(), Mock())
 
     with pytest.raises(ForbiddenError):
         service.accept_friend_request(user.id, user.id)
@@ -160,7 +175,7 @@ def test_should_fail_accept_if_user_missing() -> None:
     user_repo = Mock()
     user_repo.read_by.return_value = None
 
-    service = SocialService(Mock(), Mock(), user_repo, Mock(), Mock(), Mock())
+    service = SocialService(Mock(), Mock(), user_repo, Mock(), Mock(), Mock(), Mock())
 
     with pytest.raises(DoesNotExistError):
         service.accept_friend_request(uuid4(), uuid4())
@@ -175,7 +190,9 @@ def test_should_fail_accept_if_already_friends() -> None:
     user_repo = Mock()
     user_repo.read_by.return_value = sender
 
-    service = SocialService(Mock(), friend_repo, user_repo, Mock(), Mock(), Mock())
+    service = SocialService(
+        Mock(), friend_repo, user_repo, Mock(), Mock(), Mock(), Mock()
+    )
 
     with pytest.raises(ExistsError):
         service.accept_friend_request(sender.id, receiver.id)
@@ -191,7 +208,9 @@ def test_should_fail_accept_if_request_missing() -> None:
     user_repo = Mock()
     user_repo.read_by.return_value = sender
 
-    service = SocialService(Mock(), friend_repo, user_repo, Mock(), Mock(), Mock())
+    service = SocialService(
+        Mock(), friend_repo, user_repo, Mock(), Mock(), Mock(), Mock()
+    )
 
     with pytest.raises(DoesNotExistError):
         service.accept_friend_request(sender.id, receiver.id)
@@ -206,7 +225,9 @@ def test_should_get_friend_status_all_cases() -> None:
     user_repo = Mock()
     user_repo.read_by.return_value = other
 
-    service = SocialService(follow_repo, friend_repo, user_repo, Mock(), Mock(), Mock())
+    service = SocialService(
+        follow_repo, friend_repo, user_repo, Mock(), Mock(), Mock(), Mock()
+    )
 
     friend_repo.get_friend.return_value = True
     assert service.get_friend_status(user.id, other.id) == FriendStatus.FRIENDS
@@ -231,7 +252,7 @@ def test_should_fail_friend_status_if_user_missing() -> None:
     user_repo = Mock()
     user_repo.read_by.return_value = None
 
-    service = SocialService(Mock(), Mock(), user_repo, Mock(), Mock(), Mock())
+    service = SocialService(Mock(), Mock(), user_repo, Mock(), Mock(), Mock(), Mock())
     with pytest.raises(DoesNotExistError):
         service.get_friend_status(user.id, uuid4())
 
@@ -245,7 +266,9 @@ def test_should_get_follow_status() -> None:
     user_repo = Mock()
     user_repo.read_by.return_value = other
 
-    service = SocialService(follow_repo, Mock(), user_repo, Mock(), Mock(), Mock())
+    service = SocialService(
+        follow_repo, Mock(), user_repo, Mock(), Mock(), Mock(), Mock()
+    )
     assert service.is_following(user.id, other.id) is True
 
     follow_repo.get.return_value = None
@@ -257,7 +280,7 @@ def test_should_fail_follow_status_if_user_missing() -> None:
     user_repo = Mock()
     user_repo.read_by.return_value = None
 
-    service = SocialService(Mock(), Mock(), user_repo, Mock(), Mock(), Mock())
+    service = SocialService(Mock(), Mock(), user_repo, Mock(), Mock(), Mock(), Mock())
     with pytest.raises(DoesNotExistError):
         service.is_following(user.id, uuid4())
 
@@ -302,7 +325,98 @@ def test_calculate_match_rate_combines_similarity_and_mutuals() -> None:
         feed_pref_repo=feed_pref_repo,
         category_repo=category_repo,
         skip_repo=Mock(),
+        counter_repo=Mock(),
     )
 
     rate = svc.calculate_match_rate(u1, u2)
     assert rate == 60
+
+
+def test_should_get_relationships_in_bulk() -> None:
+    user = FakeUser().as_user()
+    friend = FakeUser().as_user()
+    followed = FakeUser().as_user()
+
+    follow_repo = Mock()
+    friend_repo = Mock()
+    follow_repo.get_following_among.return_value = {followed.id}
+    friend_repo.get_friend_statuses.return_value = {friend.id: FriendStatus.FRIENDS}
+    friend_repo.get_mutual_friend_counts.return_value = {followed.id: 2}
+
+    service = SocialService(
+        follow_repo, friend_repo, Mock(), Mock(), Mock(), Mock(), Mock()
+    )
+    relationships = service.get_relationships(user.id, [friend.id, followed.id])
+
+    assert relationships[friend.id].friend_status == FriendStatus.FRIENDS
+    assert relationships[friend.id].is_following is False
+    assert relationships[followed.id].friend_status == FriendStatus.NOT_FRIENDS
+    assert relationships[followed.id].is_following is True
+    assert relationships[followed.id].mutual_friend_count == 2
+    friend_repo.get_friend_statuses.assert_called_once_with(
+        user.id, [friend.id, followed.id]
+    )
+
+
+class _DeckCacheStub:
+    def __init__(self) -> None:
+        self.store: dict[str, Any] = {}
+
+    def get(self, key: str) -> Any | None:
+        return self.store.get(key)
+
+    def set(self, key: str, value: Any, ttl_sec: int) -> None:  # noqa: ARG002
+        self.store[key] = value
+
+    def delete(self, key: str) -> None:
+        self.store.pop(key, None)
+
+    def user(self, user_id: str) -> "_DeckCacheStub":  # noqa: ARG002
+        return self
+
+
+def _card() -> SocialUser:
+    return SocialUser(
+        user=FakeUser().as_user(),
+        friend_status=FriendStatus.NOT_FRIENDS,
+        is_following=False,
+        mutual_friend_count=0,
+        match_rate=0,
+        overlap_categories=[],
+    )
+
+
+def test_should_serve_prefetched_deck_and_filter_swipes_by_token() -> None:
+    cache: Any = _DeckCacheStub()
+    skip_repo = Mock()
+    skip_repo.skip_many.side_effect = lambda _u, ids, **_: len(ids)
+    service = SocialService(
+        Mock(), Mock(), Mock(), Mock(), Mock(), skip_repo, Mock(), cache
+    )
+    user_id = uuid4()
+    first = [_card() for _ in range(2)]
+    second = [_card() for _ in range(2)]
+    suggest = Mock(side_effect=[first, second])
+    service.get_friend_suggestions = suggest  # type: ignore[method-assign]
+
+    deck = service.get_suggestion_deck(user_id, size=2)
+    service.prefetch_suggestion_deck(user_id, 2, [c.user.id for c in deck.cards])
+    next_deck = service.get_suggestion_deck(user_id, size=2)
+
+    assert deck.cards == first
+    assert next_deck.cards == second
+    assert "next" not in cache.store
+    _, kwargs = suggest.call_args
+    assert kwargs["exclude"] == {c.user.id for c in first}
+
+    skipped = service.skip_suggestions(
+        user_id,
+        [first[0].user.id, second[0].user.id],
+        deck_token=deck.token,
+        ttl_days=30,
+    )
+
+    assert skipped == 1
+    skip_repo.skip_many.assert_called_once_with(
+        user_id, [first[0].user.id], ttl_days=30
+    )
@@ -0,0 +1,65 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import pytest
+
+from src.core.errors import DoesNotExistError
+from src.infra.services.token_verifier import JoseBackend, TokenVerifier
+
+
+@dataclass
+class CountingBackend:
+    decoded: list[str] = field(default_factory=list)
+    inner: JoseBackend = field(default_factory=JoseBackend)
+
+    def encode(self, claims: dict[str, Any], key: str, algorithm: str) -> str:
+        return self.inner.encode(claims, key, algorithm)
+
+    def decode(self, token: str, key: str, algorithm: str) -> dict[str, Any]:
+        self.decoded.append(token)
+        return self.inner.decode(token, key, algorithm)
+
+
+def test_should_decode_each_token_once_until_it_expires() -> None:
+    backend = CountingBackend()
+    verifier = TokenVerifier(backend, "secret")
+    token = verifier.encode({"sub": "a", "exp": int(time.time()) + 60})
+
+    first = verifier.verify(token)
+    first["sub"] = "changed"
+
+    assert verifier.verify(token)["sub"] == "a"
+    assert backend.decoded == [token]
+
+
+def test_should_verify_again_after_expiry() -> None:
+    decoded = []
+
+    class ShortLivedBackend(CountingBackend):
+        def decode(self, token: str, _key: str, _algorithm: str) -> dict[str, Any]:
+            decoded.append(token)
+            return {"sub": "a", "exp": time.time() + 0.05}
+
+    verifier = TokenVerifier(ShortLivedBackend(), "secret")
+
+    verifier.verify("token")
+    verifier.verify("token")
+    time.sleep(0.06)
+    verifier.verify("token")
+
+    assert decoded == ["token", "token"]
+
+
+def test_should_evict_least_recently_used_and_skip_invalid_tokens() -> None:
+    backend = CountingBackend()
+    verifier = TokenVerifier(backend, "secret", size=2)
+    exp = int(time.time()) + 60
+    a, b, c = (verifier.encode({"sub": s, "exp": exp}) for s in "abc")
+
+    for token in (a, b, a, c, a, b):
+        verifier.verify(token)
+    with pytest.raises(DoesNotExistError):
+        verifier.verify(a[:-2])
+
+    assert backend.decoded == [a, b, c, b, a[:-2]]
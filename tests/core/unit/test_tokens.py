@@ -0,0 +1,103 @@
+import time
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+from src.infra.repositories.tokens import RedisTokenRepository, TokenRepository
+from src.infra.repositories.users import UserRepository
+from tests.fake import FakeUser
+
+
+def test_should_consume_refresh_token_once(db_session: Any) -> None:
+    user = UserRepository(db_session).create(FakeUser().as_user())
+    tokens = TokenRepository(db_session)
+    jti = uuid4()
+    tokens.save(jti, user.id, datetime.now() + timedelta(days=1))
+
+    assert tokens.consume(jti)
+    assert not tokens.consume(jti)
+    assert not tokens.exists(jti)
+
+
+def test_should_purge_only_expired_tokens(db_session: Any) -> None:
+    user = UserRepository(db_session).create(FakeUser().as_user())
+    tokens = TokenRepository(db_session)
+    expired, live = uuid4(), uuid4()
+    tokens.save(expired, user.id, datetime.now() - timedelta(seconds=1))
+    tokens.save(live, user.id, datetime.now() + timedelta(days=1))
+
+    assert not tokens.consume(expired)
+    assert tokens.purge_expired(batch_size=1) >= 1
+    assert not tokens.exists(expired)
+    assert tokens.exists(live)
+
+
+class _RedisStub:
+    """The handful of Redis string commands the token store uses."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, tuple[str, float]] = {}
+        self.ttls: dict[str, int] = {}
+
+    def set(self, key: str, value: str, px: int) -> None:
+        self.values[key] = (value, time.monotonic() + px / 1000)
+        self.ttls[key] = px
+
+    def getdel(self, key: str) -> str | None:
+        value, expires_at = self.values.pop(key, (None, 0.0))
+        return value if expires_at > time.monotonic() else None
+
+    def exists(self, key: str) -> int:
+        return int(self.values.get(key, ("", 0.0))[1] > time.monotonic())
+
+    def delete(self, key: str) -> None:
+        self.values.pop(key, None)
+
+
+def _redis_tokens(fallback: Any = None) -> tuple[RedisTokenRepository, _RedisStub]:
+    client = _RedisStub()
+    tokens = RedisTokenRepository(
+        "redis://unused",
+        fallback=fallback,
+        client=client,  # type: ignore[arg-type]
+    )
+    return tokens, client
+
+
+def test_should_consume_redis_refresh_token_once() -> None:
+    tokens, client = _redis_tokens()
+    jti = uuid4()
+    tokens.save(jti, uuid4(), datetime.now() + timedelta(days=1))
+
+    [ttl] = client.ttls.values()
+    assert timedelta(hours=23) < timedelta(milliseconds=ttl) <= timedelta(days=1)
+    assert tokens.exists(jti)
+    assert tokens.consume(jti)
+    assert not tokens.consume(jti)
+    assert not tokens.exists(jti)
+
+
+def test_should_refuse_to_save_an_already_expired_token() -> None:
+    tokens, client = _redis_tokens()
+
+    with pytest.raises(ValueError, match="expires"):
+        tokens.save(uuid4(), uuid4(), datetime.now() - timedelta(seconds=1))
+    assert client.values == {}
+
+
+def test_should_consume_tokens_issued_before_redis_from_postgres(
+    db_session: Any,
+) -> None:
+    user = UserRepository(db_session).create(FakeUser().as_user())
+    postgres = TokenRepository(db_session)
+    legacy = uuid4()
+    postgres.save(legacy, user.id, datetime.now() + timedelta(days=1))
+    tokens, client = _redis_tokens(fallback=postgres)
+
+    assert tokens.exists(legacy)
+    assert tokens.consume(legacy)
+    assert not tokens.consume(legacy)
+    assert not postgres.exists(legacy)
+    assert client.values == {}
@@ -40,6 +40,20 @@ def test_should_read_user_by_username(db_session: Any) -> None:
     assert found.username == created.username
 
 
+def test_should_read_user_by_username_or_mail_in_one_lookup(db_session: Any) -> None:
+    repo = UserRepository(db_session)
+    created = repo.create(FakeUser().as_user())
+
+    by_username = repo.read_by_login(created.username)
+    by_mail = repo.read_by_login(created.mail.upper())
+
+    assert by_username
+    assert by_username.id == created.id
+    assert by_mail
+    assert by_mail.id == created.id
+    assert repo.read_by_login(FakeUser().username) is None
+
+
 def test_should_not_read_unknown_user(db_session: Any) -> None:
     repo = UserRepository(db_session)
 
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from src.core.users import User
+from src.infra.fastapi.ws_auth import PrincipalCache
+from tests.fake import FakeUser
+
+
+def test_should_share_one_lookup_between_concurrent_handshakes() -> None:
+    cache = PrincipalCache(ttl=60)
+    user = FakeUser().as_user()
+    calls = 0
+
+    async def load() -> User | None:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return user
+
+    async def scenario() -> list[User | None]:
+        found = await asyncio.gather(*(cache.get(user.id, load) for _ in range(20)))
+        found.append(await cache.get(user.id, load))
+        return found
+
+    assert asyncio.run(scenario()) == [user] * 21
+    assert calls == 1
+
+
+def test_should_reload_after_ttl_and_not_cache_misses() -> None:
+    cache = PrincipalCache(ttl=0)
+    user = FakeUser().as_user()
+    results: list[User | None] = [None, user, user]
+
+    async def load() -> User | None:
+        return results.pop(0)
+
+    async def scenario() -> list[User | None]:
+        return [await cache.get(user.id, load) for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [None, user, user]
+    assert results == []
+
+
+def test_should_fail_every_waiter_when_lookup_fails() -> None:
+    cache = PrincipalCache()
+    user = FakeUser().as_user()
+
+    async def load() -> User | None:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    async def scenario() -> list[BaseException | User | None]:
+        return await asyncio.gather(
+            *(cache.get(user.id, load) for _ in range(3)), return_exceptions=True
+        )
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(scenario()))
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get(user.id, load))
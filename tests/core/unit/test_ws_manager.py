@@ -0,0 +1,219 @@
+import asyncio
+from typing import Any
+from uuid import UUID, uuid4
+
+from fastapi import status
+
+from src.infra.fastapi.ws_broker import LocalBroker, LocalHub
+from src.infra.fastapi.ws_manager import WSManager
+from src.infra.fastapi.ws_replay import LocalReplayLog
+from src.infra.services.metrics import metrics
+
+
+class _SocketStub:
+    def __init__(self) -> None:
+        self.sent: list[dict[str, Any]] = []
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_json(self, payload: dict[str, Any]) -> None:
+        self.sent.append(payload)
+
+
+class _StuckSocketStub(_SocketStub):
+    def __init__(self) -> None:
+        super().__init__()
+        self.closed_with: int | None = None
+
+    async def send_json(self, _payload: dict[str, Any]) -> None:
+        await asyncio.Event().wait()
+
+    async def close(self, code: int) -> None:
+        self.closed_with = code
+
+
+def test_should_fan_out_across_workers_and_track_presence() -> None:
+    async def scenario() -> None:
+        hub = LocalHub()
+        worker_a = WSManager(LocalBroker(hub))
+        worker_b = WSManager(LocalBroker(hub))
+        await worker_a.start()
+        await worker_b.start()
+
+        sender, peer = uuid4(), uuid4()
+        sender_ws, peer_ws = _SocketStub(), _SocketStub()
+        await worker_a.connect(sender, sender_ws)  # type: ignore[arg-type]
+        await worker_b.connect(peer, peer_ws)  # type: ignore[arg-type]
+
+        await worker_a.send_to_users([sender, peer], {"type": "message.new"})
+        await asyncio.sleep(0.01)
+
+        assert sender_ws.sent == [{"type": "message.new"}]
+        assert peer_ws.sent == [{"type": "message.new"}]
+        assert await worker_a.online([sender, peer]) == {sender, peer}
+
+        await worker_b.disconnect(peer, peer_ws)  # type: ignore[arg-type]
+        await worker_a.send_to_user(peer, {"type": "message.new"})
+
+        assert len(peer_ws.sent) == 1
+        assert await worker_a.online([sender, peer]) == {sender}
+
+        await worker_a.stop()
+        await worker_b.stop()
+
+    asyncio.run(scenario())
+
+
+def test_should_batch_bursts_and_resume_from_sequence() -> None:
+    async def scenario() -> None:
+        replay = LocalReplayLog(size=2)
+        worker = WSManager(LocalBroker(LocalHub()), replay=replay)
+        await worker.start()
+        user = uuid4()
+
+        live_ws = _SocketStub()
+        await worker.connect(user, live_ws, version=2)  # type: ignore[arg-type]
+        for n in range(3):
+            await worker.send_to_user(user, {"type": "message.new", "n": n})
+        await asyncio.sleep(0.01)
+
+        assert live_ws.sent == [
+            {
+                "type": "batch",
+                "events": [
+                    {"type": "message.new", "n": n, "seq": n + 1} for n in range(3)
+                ],
+            }
+        ]
+
+        resumed_ws = _SocketStub()
+        session = await worker.connect(
+            user,
+            resumed_ws,  # type: ignore[arg-type]
+            version=2,
+            resuming=True,
+        )
+        await worker.send_to_user(user, {"type": "message.new", "n": 3})
+        await worker.resume(user, session, since=2)
+        await asyncio.sleep(0.01)
+
+        # the live event held during replay is not delivered twice
+        [frame] = resumed_ws.sent
+        assert [event["seq"] for event in frame["events"]] == [3, 4]
+
+        stale_ws = _SocketStub()
+        stale = await worker.connect(
+            user,
+            stale_ws,  # type: ignore[arg-type]
+            version=2,
+            resuming=True,
+        )
+        await worker.resume(user, stale, since=1)
+
+        assert stale_ws.sent == [{"type": "resync", "seq": 4}]
+        await worker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_should_disconnect_slow_consumer_without_delaying_others() -> None:
+    async def scenario() -> None:
+        worker = WSManager(LocalBroker(LocalHub()), queue_size=2)
+        await worker.start()
+        sender, peer = uuid4(), uuid4()
+        sender_ws, peer_ws = _SocketStub(), _StuckSocketStub()
+        await worker.connect(sender, sender_ws)  # type: ignore[arg-type]
+        await worker.connect(peer, peer_ws)  # type: ignore[arg-type]
+        slow_before = metrics.value("ws_slow_consumers_total")
+
+        for n in range(4):
+            await worker.send_to_users([peer, sender], {"type": "message.new", "n": n})
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.01)
+
+        assert [frame["n"] for frame in sender_ws.sent] == [0, 1, 2, 3]
+        assert peer_ws.closed_with == status.WS_1013_TRY_AGAIN_LATER
+        assert metrics.value("ws_slow_consumers_total") == slow_before + 1
+        assert worker.queue_depth() == 0
+
+        await worker.stop()
+
+    asyncio.run(scenario())
+
+
+class _LaggingBroker(LocalBroker):
+    """Takes longer to publish the first event than the ones after it."""
+
+    async def publish(self, user_id: UUID, payload: dict[str, Any]) -> None:
+        if payload.get("seq") == 1:
+            await asyncio.sleep(0.02)
+        await super().publish(user_id, payload)
+
+
+def test_should_publish_concurrent_sends_in_sequence_order() -> None:
+    async def scenario() -> None:
+        worker = WSManager(_LaggingBroker(LocalHub()))
+        await worker.start()
+        user = uuid4()
+        ws = _SocketStub()
+        await worker.connect(user, ws, version=2)  # type: ignore[arg-type]
+
+        await asyncio.gather(
+            *(worker.send_to_user(user, {"type": "message.new"}) for _ in range(3))
+        )
+        await asyncio.sleep(0.01)
+
+        seqs = [
+            event["seq"] for frame in ws.sent for event in frame.get("events", [frame])
+        ]
+        assert seqs == [1, 2, 3]
+        await worker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_should_evict_least_recent_tails_but_keep_counters() -> None:
+    async def scenario() -> None:
+        replay = LocalReplayLog(max_users=2)
+        first, second, third = uuid4(), uuid4(), uuid4()
+        await replay.append(first, {"n": 1})
+        await replay.append(second, {"n": 1})
+        await replay.append(first, {"n": 2})
+        await replay.append(third, {"n": 1})
+
+        assert await replay.since(first, 1) == [{"n": 2, "seq": 2}]
+        # the evicted tail forces a resync, but the counter carries on
+        assert await replay.since(second, 0) is None
+        assert await replay.head(second) == 1
+        assert await replay.append(second, {"n": 2}) == 2
+
+    asyncio.run(scenario())
+
+
+def test_should_track_ack_lag_per_session() -> None:
+    async def scenario() -> None:
+        worker = WSManager(LocalBroker(LocalHub()), replay=LocalReplayLog())
+        await worker.start()
+        user = uuid4()
+
+        ws = _SocketStub()
+        session = await worker.connect(user, ws, version=2)  # type: ignore[arg-type]
+        for n in range(3):
+            await worker.send_to_user(user, {"type": "message.new", "n": n})
+        await asyncio.sleep(0.01)
+
+        assert session.delivered == 3
+        assert worker.max_ack_lag() == 3
+
+        worker.ack(user, ws, 2)  # type: ignore[arg-type]
+        assert worker.max_ack_lag() == 1
+
+        # stale or unwritten seqs don't move the ack point past the truth
+        worker.ack(user, ws, 1)  # type: ignore[arg-type]
+        worker.ack(user, ws, 99)  # type: ignore[arg-type]
+        assert session.acked == 3
+        assert worker.max_ack_lag() == 0
+        await worker.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,112 @@
+import asyncio
+from typing import Any
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.infra.fastapi.messenger import handle_ws_event
+from src.infra.fastapi.ws_broker import LocalBroker, LocalHub
+from src.infra.fastapi.ws_manager import WSManager
+from src.infra.fastapi.ws_presence import PresenceService
+
+
+class _SocketStub:
+    def __init__(self) -> None:
+        self.sent: list[dict[str, Any]] = []
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_json(self, payload: dict[str, Any]) -> None:
+        self.sent.append(payload)
+
+
+def test_should_coalesce_presence_changes_across_workers() -> None:
+    async def scenario() -> None:
+        hub = LocalHub()
+        worker_a = WSManager(LocalBroker(hub))
+        worker_b = WSManager(LocalBroker(hub))
+        await worker_a.start()
+        await worker_b.start()
+        presence_a = PresenceService(worker_a)
+        presence_b = PresenceService(worker_b)
+
+        watcher, friend = uuid4(), uuid4()
+        watcher_ws = _SocketStub()
+        await worker_b.connect(watcher, watcher_ws)  # type: ignore[arg-type]
+        [state] = await presence_b.watch(watcher, [friend])
+        assert state.online is False
+
+        first_ws = _SocketStub()
+        await worker_a.connect(friend, first_ws)  # type: ignore[arg-type]
+        await presence_a.flush()
+        await asyncio.sleep(0.01)
+
+        [frame] = watcher_ws.sent
+        assert frame["type"] == "presence"
+        assert frame["users"][0]["online"] is True
+
+        # a reconnect inside the window is not announced
+        await worker_a.disconnect(friend, first_ws)  # type: ignore[arg-type]
+        await worker_a.connect(friend, _SocketStub())  # type: ignore[arg-type]
+        await presence_a.flush()
+        await asyncio.sleep(0.01)
+        assert len(watcher_ws.sent) == 1
+
+        [state] = await presence_b.snapshot([friend])
+        assert state.online is True
+        assert state.last_seen is not None
+
+        await worker_a.stop()
+        await worker_b.stop()
+
+    asyncio.run(scenario())
+
+
+def test_should_rate_limit_typing_indicators() -> None:
+    async def scenario() -> None:
+        worker = WSManager(LocalBroker(LocalHub()))
+        await worker.start()
+        presence = PresenceService(worker, typing_interval=60)
+        sender, peer = uuid4(), uuid4()
+        peer_ws = _SocketStub()
+        await worker.connect(peer, peer_ws, version=2)  # type: ignore[arg-type]
+
+        assert await presence.typing(sender, peer) is True
+        assert await presence.typing(sender, peer) is False
+        await asyncio.sleep(0.01)
+
+        assert peer_ws.sent == [{"type": "typing", "user_id": str(sender)}]
+        await worker.stop()
+
+    asyncio.run(scenario())
+
+
+class _PeersStub:
+    def __init__(self, peers: set[UUID]) -> None:
+        self.peers = peers
+        self.lookups: list[list[UUID]] = []
+
+    def get_chat_peers(self, _user_id: UUID, among: list[UUID]) -> set[UUID]:
+        self.lookups.append(among)
+        return self.peers & set(among)
+
+
+def test_should_drop_typing_to_users_outside_the_senders_chats() -> None:
+    user, stranger = uuid4(), uuid4()
+    service = _PeersStub(peers=set())
+    ws = _SocketStub()
+    contacts: set[UUID] = set()
+    typing = {"type": "typing", "peer_id": str(stranger)}
+    malformed = {"type": "typing", "peer_id": "x"}
+
+    async def scenario() -> None:
+        await handle_ws_event(ws, service, None, user, typing, contacts)  # type: ignore[arg-type]
+        with pytest.raises(ValueError, match="badly formed"):
+            await handle_ws_event(ws, service, None, user, malformed, contacts)  # type: ignore[arg-type]
+
+    asyncio.run(scenario())
+
+    assert ws.sent == []
+    assert service.lookups == [[stranger]]
+    assert contacts == set()